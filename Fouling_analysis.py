@@ -12,6 +12,9 @@ Key features:
  - Optional irradiance → power regression model for expected clean performance.
  - Computes fouling index, fouling classification, and energy loss.
  - Detects likely cleaning events via PR jumps.
+ - Serialisable clean-baseline models (clean days, POA-bin medians,
+   regression coefficients, data hash) for reuse across runs.
+ - Per-day fouling state for incremental (daily) index updates.
 
 Requirements:
     Python 3.11+
@@ -22,11 +25,15 @@ Optional:
 
 from __future__ import annotations
 
+import hashlib
+
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 from typing import Optional, Dict
 
+from table_io import read_table, table_columns
+
 try:
     from sklearn.linear_model import LinearRegression
 except ImportError:  # degrade gracefully if sklearn isn't available
@@ -121,7 +128,7 @@ def _guess_column(cols: list[str], candidates: list[str]) -> Optional[str]:
     return None
 
 
-def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
+def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig, copy: bool = True) -> pd.DataFrame:
     """
     Map arbitrary input column names to internal standard names using:
       1) explicit cfg.column_map (if provided), then
@@ -129,19 +136,26 @@ def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
 
     The function does NOT fail if some columns are missing; downstream
     computations will simply skip features that are not available.
-    """
-    df = df.copy()
 
+    All renames are applied in one go.  With copy=False the result is a new
+    frame sharing the column data of ``df`` (``df`` itself is not renamed);
+    only assign whole columns to it, never modify values in place.
+    """
     # 1) Apply explicit mapping
+    rename_map = {}
     if cfg.column_map:
         rename_map = {k: v for k, v in cfg.column_map.items() if k in df.columns}
-        df = df.rename(columns=rename_map)
 
-    # 2) Auto-guess missing core fields
-    cols = list(df.columns)
+    # 2) Auto-guess missing core fields (on the names after step 1)
+    cols = [rename_map.get(c, c) for c in df.columns]
+    names = list(cols)
 
     def has_std(name: str) -> bool:
-        return name in df.columns
+        return name in names
+
+    def rename(cand: Optional[str], std: str) -> None:
+        if cand is not None and cand != std:
+            names[:] = [std if n == cand else n for n in names]
 
     # --- timestamp ---
     if not has_std(cfg.timestamp):
@@ -149,8 +163,7 @@ def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
             cols,
             candidates=["timestamp", "time", "date", "datetime"]
         )
-        if cand is not None and cand != cfg.timestamp:
-            df = df.rename(columns={cand: cfg.timestamp})
+        rename(cand, cfg.timestamp)
 
     # --- ac_power ---
     if not has_std(cfg.ac_power):
@@ -162,8 +175,7 @@ def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
                 "power_kw", "kw", "power"
             ],
         )
-        if cand is not None and cand != cfg.ac_power:
-            df = df.rename(columns={cand: cfg.ac_power})
+        rename(cand, cfg.ac_power)
 
     # --- poa (plane-of-array irradiance) ---
     if not has_std(cfg.poa):
@@ -171,8 +183,7 @@ def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
             cols,
             candidates=["poa", "plane", "tilt", "irr", "irradiance", "w/m2", "wm2"]
         )
-        if cand is not None and cand != cfg.poa:
-            df = df.rename(columns={cand: cfg.poa})
+        rename(cand, cfg.poa)
 
     # --- dc_power (optional) ---
     if cfg.dc_power and not has_std(cfg.dc_power):
@@ -180,8 +191,7 @@ def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
             cols,
             candidates=["dc ", "dc_", "dc power", "dc kw", "p_dc", "pdc"]
         )
-        if cand is not None and cand != cfg.dc_power:
-            df = df.rename(columns={cand: cfg.dc_power})
+        rename(cand, cfg.dc_power)
 
     # --- module_temp (optional) ---
     if cfg.module_temp and not has_std(cfg.module_temp):
@@ -189,17 +199,28 @@ def standardise_columns(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
             cols,
             candidates=["module temp", "mod temp", "cell temp", "pv temp", "temperature"]
         )
-        if cand is not None and cand != cfg.module_temp:
-            df = df.rename(columns={cand: cfg.module_temp})
+        rename(cand, cfg.module_temp)
 
-    return df
+    out = df.set_axis(names, axis=1)
+    return out.copy() if copy else out
 
 
 # ===============================================================
 # --- PR CALCULATION ---
 # ===============================================================
 
-def calculate_pr(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
+def fouling_input_columns(columns: list[str], cfg: FoulingConfig) -> list[str]:
+    """
+    The input columns ``standardise_columns`` maps to the standard names
+    (timestamp, ac_power, poa, dc_power, module_temp), for reading only
+    those from a file.
+    """
+    wanted = {cfg.timestamp, cfg.ac_power, cfg.poa, cfg.dc_power, cfg.module_temp} - {None}
+    names = standardise_columns(pd.DataFrame(columns=columns), cfg).columns
+    return [col for col, name in zip(columns, names) if name in wanted]
+
+
+def calculate_pr(df: pd.DataFrame, cfg: FoulingConfig, copy: bool = True) -> pd.DataFrame:
     """
     Compute Performance Ratio and append column 'pr'.
 
@@ -209,18 +230,22 @@ def calculate_pr(df: pd.DataFrame, cfg: FoulingConfig) -> pd.DataFrame:
       - DC_size is cfg.dc_size_kw (kW DC)
 
     Low-light periods (POA < POA_MIN) are set to NaN.
+    With copy=False the column is added to ``df`` itself.
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
 
     if cfg.ac_power not in df.columns or cfg.poa not in df.columns:
         df["pr"] = np.nan
         return df
 
-    irr_factor = df[cfg.poa] / 1000.0  # W/m² → kW/m²
+    poa = df[cfg.poa].to_numpy(dtype=float)
+    irr_factor = poa / 1000.0  # W/m² → kW/m²
     with np.errstate(divide="ignore", invalid="ignore"):
-        df["pr"] = df[cfg.ac_power] / (irr_factor * cfg.dc_size_kw)
+        pr = df[cfg.ac_power].to_numpy(dtype=float) / (irr_factor * cfg.dc_size_kw)
 
-    df.loc[df[cfg.poa] < POA_MIN, "pr"] = np.nan
+    pr[poa < POA_MIN] = np.nan
+    df["pr"] = pr
     return df
 
 
@@ -262,25 +287,65 @@ def identify_clean_reference_periods(df: pd.DataFrame,
 # --- DATE FILTERING & AUTO CLEAN PERIOD SELECTION ---------------
 # ===============================================================
 
+def _bound_in_tz(bound: pd.Timestamp, ts: pd.Series) -> pd.Timestamp:
+    """Read a naive window bound in the timezone of tz-aware timestamps (e.g. UTC frames from the DB)."""
+    bound = pd.Timestamp(bound)
+    tz = getattr(ts.dt, "tz", None) if pd.api.types.is_datetime64_any_dtype(ts) else None
+    if tz is not None and bound.tzinfo is None:
+        return bound.tz_localize(tz)
+    return bound
+
+
 def filter_by_date_range(df: pd.DataFrame,
                          cfg: FoulingConfig,
                          start: Optional[pd.Timestamp] = None,
-                         end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+                         end: Optional[pd.Timestamp] = None,
+                         copy: bool = True) -> pd.DataFrame:
     """
     Restrict dataframe to a timestamp window.
+
+    The timestamp column is parsed to datetimes.  With copy=False and no
+    rows dropped, ``df`` itself is updated and returned.
     """
     if cfg.timestamp not in df.columns:
         return df
 
-    out = df.copy()
-    out[cfg.timestamp] = pd.to_datetime(out[cfg.timestamp], errors="coerce")
+    ts = pd.to_datetime(df[cfg.timestamp], errors="coerce")
+    keep = np.ones(len(df), dtype=bool)
     if start is not None:
-        out = out[out[cfg.timestamp] >= start]
+        keep &= (ts >= _bound_in_tz(start, ts)).to_numpy()
     if end is not None:
-        out = out[out[cfg.timestamp] <= end]
+        keep &= (ts <= _bound_in_tz(end, ts)).to_numpy()
+
+    if keep.all():
+        out = df.copy() if copy else df
+    else:
+        rows = np.flatnonzero(keep)
+        out, ts = df.take(rows), ts.take(rows)
+    out[cfg.timestamp] = ts.array
     return out
 
 
+def _daylight_pr_rows(df: pd.DataFrame, cfg: FoulingConfig) -> Optional[pd.DataFrame]:
+    """
+    Standardised rows with POA >= POA_MIN and a valid PR, plus 'date_only'.
+
+    Returns None without a timestamp column.  Shares df's columns; only
+    whole columns are assigned.
+    """
+    work = standardise_columns(df, cfg, copy=False)
+
+    if cfg.timestamp not in work.columns:
+        return None
+
+    work[cfg.timestamp] = pd.to_datetime(work[cfg.timestamp], errors="coerce")
+    calculate_pr(work, cfg, copy=False)
+
+    work = work.take(np.flatnonzero((work[cfg.poa] >= POA_MIN) & work["pr"].notna()))
+    work["date_only"] = work[cfg.timestamp].dt.date
+    return work
+
+
 def auto_select_clean_period(df: pd.DataFrame,
                              cfg: FoulingConfig,
                              days: int = 3,
@@ -292,20 +357,10 @@ def auto_select_clean_period(df: pd.DataFrame,
       - clean_df: rows belonging to the best 'days' days
       - daily_stats: per-day median/count used for selection
     """
-    work = df.copy()
-    work = standardise_columns(work, cfg)
-
-    if cfg.timestamp not in work.columns:
-        return pd.DataFrame(), pd.DataFrame()
-
-    work[cfg.timestamp] = pd.to_datetime(work[cfg.timestamp], errors="coerce")
-    work = calculate_pr(work, cfg)
-
-    work = work[(work[cfg.poa] >= POA_MIN) & work["pr"].notna()].copy()
-    if work.empty:
+    work = _daylight_pr_rows(df, cfg)
+    if work is None or work.empty:
         return pd.DataFrame(), pd.DataFrame()
 
-    work["date_only"] = work[cfg.timestamp].dt.date
     daily = (
         work.groupby("date_only")["pr"]
         .agg(["median", "count"])
@@ -317,8 +372,7 @@ def auto_select_clean_period(df: pd.DataFrame,
 
     top = daily.sort_values("median", ascending=False).head(days)
     selected_dates = set(top["date_only"])
-    clean_df = work[work["date_only"].isin(selected_dates)].copy()
-    clean_df = clean_df.sort_values(cfg.timestamp)
+    clean_df = work[work["date_only"].isin(selected_dates)].sort_values(cfg.timestamp)
 
     return clean_df, top
 
@@ -327,10 +381,91 @@ def auto_select_clean_period(df: pd.DataFrame,
 # --- POA-MATCHED CLEAN BASELINE ---
 # ===============================================================
 
+@dataclass
+class PoaBaseline:
+    """
+    POA-binned expected clean performance as fixed-width arrays.
+
+    Entry i covers POA in [i * bin_width, (i + 1) * bin_width) W/m²; bins
+    without clean data hold NaN.  With 100 W/m² bins this is ~15 values per
+    array, so a plant's baseline can be stored (``to_dict``) and reused
+    without the clean dataset.
+    """
+    bin_width: float
+    expected_power: np.ndarray
+    expected_pr: np.ndarray
+
+    def lookup(self, poa) -> tuple[np.ndarray, np.ndarray]:
+        """Expected (power, pr) per POA value; NaN outside the fitted bins."""
+        idx = np.floor_divide(np.asarray(poa, dtype=float), self.bin_width)
+        valid = np.isfinite(idx) & (idx >= 0) & (idx < len(self.expected_power))
+        rows = idx[valid].astype(np.intp)
+        power = np.full(idx.shape, np.nan)
+        pr = np.full(idx.shape, np.nan)
+        power[valid] = self.expected_power[rows]
+        pr[valid] = self.expected_pr[rows]
+        return power, pr
+
+    def to_dict(self) -> dict:
+        """JSON-compatible form (NaN bins become None)."""
+        def values(arr: np.ndarray) -> list:
+            return [None if np.isnan(v) else float(v) for v in arr]
+
+        return {
+            "bin_width": float(self.bin_width),
+            "expected_power": values(self.expected_power),
+            "expected_pr": values(self.expected_pr),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PoaBaseline":
+        return cls(
+            bin_width=float(data["bin_width"]),
+            expected_power=np.array(data["expected_power"], dtype=float),
+            expected_pr=np.array(data["expected_pr"], dtype=float),
+        )
+
+
+def _bin_medians(bins: np.ndarray, values: np.ndarray, n_bins: int) -> np.ndarray:
+    medians = pd.Series(values).groupby(bins).median()
+    out = np.full(n_bins, np.nan)
+    out[medians.index.to_numpy()] = medians.to_numpy()
+    return out
+
+
+def fit_poa_baseline(clean_df: pd.DataFrame,
+                     cfg: FoulingConfig,
+                     bin_width: float = POA_BIN_WIDTH) -> Optional[PoaBaseline]:
+    """
+    Median clean AC power (and PR, if clean_df has a 'pr' column) per POA bin.
+
+    Returns None if clean_df lacks the POA/AC columns or has no rows with
+    POA >= POA_MIN.
+    """
+    if cfg.poa not in clean_df.columns or cfg.ac_power not in clean_df.columns:
+        return None
+
+    poa = clean_df[cfg.poa].to_numpy(dtype=float)
+    clean_mask = poa >= POA_MIN
+    if not clean_mask.any():
+        return None
+
+    bins = (poa[clean_mask] // bin_width).astype(np.intp)
+    n_bins = int(bins.max()) + 1
+    power = _bin_medians(bins, clean_df[cfg.ac_power].to_numpy(dtype=float)[clean_mask], n_bins)
+    if "pr" in clean_df.columns:
+        pr = _bin_medians(bins, clean_df["pr"].to_numpy(dtype=float)[clean_mask], n_bins)
+    else:
+        pr = np.full(n_bins, np.nan)
+    return PoaBaseline(float(bin_width), power, pr)
+
+
 def estimate_clean_baseline_poa_matched(
     df: pd.DataFrame,
     cfg: FoulingConfig,
-    clean_df: pd.DataFrame
+    clean_df: Optional[pd.DataFrame] = None,
+    copy: bool = True,
+    baseline: Optional[PoaBaseline] = None,
 ) -> pd.DataFrame:
     """
     Build a POA-binned expected clean baseline.
@@ -338,51 +473,29 @@ def estimate_clean_baseline_poa_matched(
     clean_df:
         A dataset from a period when the modules are known to be clean.
         All rows of clean_df are treated as "clean" by this function.
+    baseline:
+        A previously fitted PoaBaseline; clean_df is not needed when given.
 
     For each POA bin:
         expected_clean_power = median(clean_ac_power)
         expected_clean_pr    = median(clean_pr) (if PR is available in clean_df)
-    """
-    df = df.copy()
-    clean_src = clean_df.copy()
 
-    # Ensure required columns exist
-    if cfg.poa not in clean_src.columns or cfg.ac_power not in clean_src.columns:
-        df["expected_clean_power"] = np.nan
-        df["expected_clean_pr"] = np.nan
-        return df
+    The values are attached with one array lookup per row.  With copy=False
+    the columns are added to ``df`` itself.
+    """
+    if copy:
+        df = df.copy()
 
-    clean_src = clean_src[clean_src[cfg.poa] >= POA_MIN]
-    if clean_src.empty:
+    if baseline is None and clean_df is not None:
+        baseline = fit_poa_baseline(clean_df, cfg)
+    if baseline is None:
         df["expected_clean_power"] = np.nan
         df["expected_clean_pr"] = np.nan
         return df
 
-    # POA bins
-    df["poa_bin"] = (df[cfg.poa] // POA_BIN_WIDTH) * POA_BIN_WIDTH
-    clean_src["poa_bin"] = (clean_src[cfg.poa] // POA_BIN_WIDTH) * POA_BIN_WIDTH
-
-    # Expected AC by bin
-    expected_power_by_bin = (
-        clean_src.groupby("poa_bin")[cfg.ac_power]
-        .median()
-        .rename("expected_clean_power")
-    )
-    df = df.merge(expected_power_by_bin, how="left",
-                  left_on="poa_bin", right_index=True)
-
-    # Expected PR by bin
-    if "pr" in clean_src.columns:
-        expected_pr_by_bin = (
-            clean_src.groupby("poa_bin")["pr"]
-            .median()
-            .rename("expected_clean_pr")
-        )
-        df = df.merge(expected_pr_by_bin, how="left",
-                      left_on="poa_bin", right_index=True)
-    else:
-        df["expected_clean_pr"] = np.nan
-
+    poa = df[cfg.poa].to_numpy(dtype=float)
+    df["poa_bin"] = (poa // baseline.bin_width) * baseline.bin_width
+    df["expected_clean_power"], df["expected_clean_pr"] = baseline.lookup(poa)
     return df
 
 
@@ -405,16 +518,15 @@ def fit_clean_regression_model(
     if LinearRegression is None:
         return None
 
-    clean_src = clean_df.copy()
-    if cfg.poa not in clean_src.columns or cfg.ac_power not in clean_src.columns:
+    if cfg.poa not in clean_df.columns or cfg.ac_power not in clean_df.columns:
         return None
 
-    clean_src = clean_src[clean_src[cfg.poa] >= POA_MIN]
-    if clean_src.empty:
+    clean_mask = (clean_df[cfg.poa] >= POA_MIN).to_numpy()
+    if not clean_mask.any():
         return None
 
-    X = clean_src[[cfg.poa]].values
-    y = clean_src[cfg.ac_power].values
+    X = clean_df[cfg.poa].to_numpy()[clean_mask].reshape(-1, 1)
+    y = clean_df[cfg.ac_power].to_numpy()[clean_mask]
 
     model = LinearRegression()
     model.fit(X, y)
@@ -423,27 +535,169 @@ def fit_clean_regression_model(
 
 def apply_clean_model(df: pd.DataFrame,
                       model: Optional[LinearRegression],
-                      cfg: FoulingConfig) -> pd.DataFrame:
+                      cfg: FoulingConfig,
+                      copy: bool = True) -> pd.DataFrame:
     """
     Apply regression model to estimate expected clean power per row.
 
-    Adds column:
+    Adds column (to ``df`` itself when copy=False):
         - expected_clean_model
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
     if model is None or cfg.poa not in df.columns:
         df["expected_clean_model"] = np.nan
         return df
 
-    X = df[[cfg.poa]].values
+    X = df[cfg.poa].to_numpy().reshape(-1, 1)
     df["expected_clean_model"] = model.predict(X)
     return df
 
 
+# ===============================================================
+# --- PERSISTABLE CLEAN BASELINE MODEL ---
+# ===============================================================
+
+@dataclass
+class LinearCleanModel:
+    """Fitted irradiance → AC power line; usable wherever a LinearRegression is."""
+    coef: float
+    intercept: float
+
+    def predict(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=float)[:, 0] * self.coef + self.intercept
+
+
+@dataclass
+class CleanBaselineModel:
+    """
+    Everything a fouling run derives from the clean period, in a form that
+    can be stored (``to_dict``) and reused:
+
+      - clean_dates: ISO dates of the clean days
+      - baseline: POA-binned expected power / PR
+      - regression: optional irradiance → power line
+      - data_hash: clean_data_hash of the clean rows it was fitted on
+    """
+    clean_dates: list[str]
+    baseline: PoaBaseline
+    regression: Optional[LinearCleanModel]
+    data_hash: str
+    dc_size_kw: float
+
+    def to_dict(self) -> dict:
+        return {
+            "clean_dates": list(self.clean_dates),
+            "baseline": self.baseline.to_dict(),
+            "regression": (
+                {"coef": self.regression.coef, "intercept": self.regression.intercept}
+                if self.regression is not None else None
+            ),
+            "data_hash": self.data_hash,
+            "dc_size_kw": self.dc_size_kw,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CleanBaselineModel":
+        regression = data.get("regression")
+        return cls(
+            clean_dates=list(data["clean_dates"]),
+            baseline=PoaBaseline.from_dict(data["baseline"]),
+            regression=LinearCleanModel(**regression) if regression else None,
+            data_hash=data["data_hash"],
+            dc_size_kw=float(data["dc_size_kw"]),
+        )
+
+
+def parse_clean_model(data) -> Optional[CleanBaselineModel]:
+    """
+    ``CleanBaselineModel.from_dict`` for stored records, or None if ``data``
+    is not a complete model dict (e.g. a bare ``PoaBaseline.to_dict()``), so
+    callers treat it as "no baseline" and refit.
+    """
+    try:
+        model = CleanBaselineModel.from_dict(data)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return model if model.clean_dates else None
+
+
+def clean_data_hash(clean_df: pd.DataFrame, cfg: FoulingConfig) -> str:
+    """
+    SHA-1 over the timestamp / AC power / POA values of clean rows and the
+    DC size, i.e. everything a clean-baseline fit depends on.  Rows are
+    hashed in sorted order, so the input row order does not matter.
+    """
+    ts = pd.to_datetime(clean_df[cfg.timestamp], errors="coerce", utc=True)
+    ts = ts.to_numpy(dtype="datetime64[ns]").view("int64")
+    ac = clean_df[cfg.ac_power].to_numpy(dtype="float64")
+    poa = clean_df[cfg.poa].to_numpy(dtype="float64")
+    order = np.lexsort((poa, ac, ts))
+    digest = hashlib.sha1(repr(float(cfg.dc_size_kw)).encode("ascii"))
+    for values in (ts, ac, poa):
+        digest.update(values[order].tobytes())
+    return digest.hexdigest()
+
+
+def fit_clean_baseline_model(clean_df: pd.DataFrame, cfg: FoulingConfig) -> Optional[CleanBaselineModel]:
+    """
+    Fit the POA-bin baseline and regression line on a clean period
+    (as returned by auto_select_clean_period).  None if no baseline can be
+    fitted.
+    """
+    baseline = fit_poa_baseline(clean_df, cfg)
+    if baseline is None:
+        return None
+    regression = fit_clean_regression_model(clean_df, cfg)
+    if regression is not None:
+        regression = LinearCleanModel(float(regression.coef_[0]), float(regression.intercept_))
+    dates = pd.to_datetime(clean_df[cfg.timestamp], errors="coerce").dt.date.dropna().unique()
+    return CleanBaselineModel(
+        clean_dates=sorted(d.isoformat() for d in dates),
+        baseline=baseline,
+        regression=regression,
+        data_hash=clean_data_hash(clean_df, cfg),
+        dc_size_kw=float(cfg.dc_size_kw),
+    )
+
+
+def clean_model_is_current(model: CleanBaselineModel, df: pd.DataFrame, cfg: FoulingConfig) -> bool:
+    """
+    True if ``df`` still holds exactly the clean rows ``model`` was fitted
+    on (same days, same values, same DC size), so it can be reused without
+    re-ranking days or refitting.
+    """
+    if float(cfg.dc_size_kw) != model.dc_size_kw:
+        return False
+    work = _daylight_pr_rows(df, cfg)
+    if work is None or work.empty:
+        return False
+    dates = set(pd.to_datetime(model.clean_dates).date)
+    clean_df = work.take(np.flatnonzero(work["date_only"].isin(dates)))
+    return not clean_df.empty and clean_data_hash(clean_df, cfg) == model.data_hash
+
+
 # ===============================================================
 # --- FOULING INDEX ---
 # ===============================================================
 
+def _recent_rows(df: pd.DataFrame, cfg: FoulingConfig, days: int) -> pd.DataFrame:
+    """
+    Rows in the last ``days`` days before the latest timestamp (the same rows
+    as ``set_index(timestamp).sort_index().last(f"{days}D")``, without
+    re-indexing and sorting a copy of the whole frame).
+
+    Fallback without a timestamp column: last days*48 rows (~30-min data).
+    """
+    if cfg.timestamp not in df.columns:
+        return df.tail(days * 48)
+    ts = pd.to_datetime(df[cfg.timestamp], errors="coerce")
+    latest = ts.max()
+    if pd.isna(latest):
+        return df.iloc[:0]
+    return df.take(np.flatnonzero(ts > latest - pd.Timedelta(days=days)))
+
+
 def calculate_fouling_index(df: pd.DataFrame,
                             cfg: FoulingConfig,
                             expected_col: str = "expected_clean_power",
@@ -466,17 +720,11 @@ def calculate_fouling_index(df: pd.DataFrame,
     window_days : int
         Look-back window size in days.
     """
-    df = df.copy()
-
     if expected_col not in df.columns or cfg.ac_power not in df.columns:
         return np.nan
 
     # Use last N days based on timestamp if available
-    if cfg.timestamp in df.columns:
-        recent = df.set_index(cfg.timestamp).sort_index().last(f"{window_days}D")
-    else:
-        # Fallback: last N*48 rows (~7 days at 30-min)
-        recent = df.tail(window_days * 48)
+    recent = _recent_rows(df, cfg, window_days)
 
     valid = recent[(recent[expected_col] > 0) & (recent[cfg.ac_power] >= 0)]
     if valid.empty:
@@ -531,13 +779,9 @@ def estimate_energy_loss(df: pd.DataFrame,
     if expected_col not in df.columns or cfg.ac_power not in df.columns:
         return np.nan
 
-    if cfg.timestamp in df.columns:
-        recent = df.set_index(cfg.timestamp).sort_index().last(f"{period_days}D").copy()
-    else:
-        recent = df.tail(period_days * 48).copy()
-
-    recent["loss"] = (recent[expected_col] - recent[cfg.ac_power]).clip(lower=0)
-    energy_loss = recent["loss"].sum()
+    recent = _recent_rows(df, cfg, period_days)
+    loss = (recent[expected_col] - recent[cfg.ac_power]).clip(lower=0)
+    energy_loss = loss.sum()
 
     if period_days <= 0:
         return float(energy_loss)
@@ -550,14 +794,18 @@ def estimate_energy_loss(df: pd.DataFrame,
 # ===============================================================
 
 def detect_cleaning_events(df: pd.DataFrame,
-                           threshold: float = 0.10) -> pd.DataFrame:
+                           threshold: float = 0.10,
+                           copy: bool = True) -> pd.DataFrame:
     """
     Detect likely cleaning events as sudden jumps in rolling PR.
 
     threshold:
         Fractional increase vs global median PR, e.g. 0.10 = +10%.
+    copy:
+        False adds pr_roll / pr_change / cleaning_event to ``df`` itself.
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
     if "pr" not in df.columns:
         df["cleaning_event"] = False
         return df
@@ -570,14 +818,96 @@ def detect_cleaning_events(df: pd.DataFrame,
     return df
 
 
+# ===============================================================
+# --- INCREMENTAL DAILY STATE ---
+# ===============================================================
+
+@dataclass
+class FoulingDay:
+    """
+    Per-day state for incremental fouling updates: the day's
+    actual/expected ratios and its summed clipped loss, i.e. the day's
+    share of calculate_fouling_index / estimate_energy_loss.
+    """
+    day: str
+    ratios: np.ndarray
+    loss_kwh: float
+    points: int
+
+
+def daily_fouling_stats(df: pd.DataFrame,
+                        cfg: FoulingConfig,
+                        expected_col: str = "expected_clean_power") -> list[FoulingDay]:
+    """
+    Split an enriched frame (with ``expected_col``) into FoulingDay records,
+    one per calendar day of ``cfg.timestamp``, in date order.
+    """
+    if expected_col not in df.columns or cfg.ac_power not in df.columns:
+        return []
+    ts = pd.to_datetime(df[cfg.timestamp], errors="coerce")
+    actual = df[cfg.ac_power].to_numpy(dtype="float64")
+    expected = df[expected_col].to_numpy(dtype="float64")
+    valid = (expected > 0) & (actual >= 0)
+    ratio = np.divide(actual, expected, out=np.full_like(actual, np.nan), where=valid)
+    loss = np.clip(expected - actual, 0, None)
+
+    days = []
+    for day, rows in pd.Series(np.arange(len(df)), index=ts.dt.date.to_numpy()).groupby(level=0):
+        idx = rows.to_numpy()
+        day_valid = idx[valid[idx]]
+        days.append(FoulingDay(
+            day=day.isoformat(),
+            ratios=ratio[day_valid],
+            loss_kwh=float(np.nansum(loss[idx])),
+            points=len(day_valid),
+        ))
+    return days
+
+
+def roll_fouling_days(previous: list[FoulingDay],
+                      new_days: list[FoulingDay],
+                      window_days: int = 7) -> list[dict]:
+    """
+    Rolling fouling index / energy loss for each of ``new_days``, using
+    ``previous`` (at least the window_days - 1 days before them) as state.
+
+    Each window is the calendar days (D - window_days, D], so for a day
+    whose data ends at its last interval this matches calculate_fouling_index
+    and estimate_energy_loss on the full dataset.
+    """
+    by_day = {d.day: d for d in previous}
+    by_day.update((d.day, d) for d in new_days)
+    out = []
+    for current in new_days:
+        end = pd.Timestamp(current.day)
+        window = [
+            d for d in by_day.values()
+            if end - pd.Timedelta(days=window_days) < pd.Timestamp(d.day) <= end
+        ]
+        ratios = np.concatenate([d.ratios for d in window]) if window else np.array([])
+        fouling_index = np.nan
+        if ratios.size:
+            fouling_index = float(max(0.0, min(1.0, 1.0 - np.nanmedian(ratios))))
+        energy_loss = sum(d.loss_kwh for d in window)
+        out.append({
+            "day": current.day,
+            "fouling_index": fouling_index,
+            "fouling_level": classify_fouling_level(fouling_index),
+            "energy_loss_kwh_per_day": energy_loss / window_days if window_days > 0 else energy_loss,
+        })
+    return out
+
+
 # ===============================================================
 # --- HIGH-LEVEL PIPELINE (CLEAN DATASET REQUIRED) ---
 # ===============================================================
 
 def run_fouling_analysis(
     df: pd.DataFrame,
-    clean_df: pd.DataFrame,
+    clean_df: Optional[pd.DataFrame],
     cfg: Optional[FoulingConfig] = None,
+    baseline: Optional[PoaBaseline] = None,
+    clean_model: Optional[CleanBaselineModel] = None,
 ) -> dict:
     """
     High-level fouling analysis pipeline.
@@ -593,9 +923,17 @@ def run_fouling_analysis(
           - POA-matched expected clean power & PR
           - Optional irradiance→power regression model
 
-        This parameter is mandatory; if missing or empty, a ValueError is raised.
+        This parameter is mandatory unless ``baseline`` is given; if missing
+        or empty, a ValueError is raised.
     cfg : FoulingConfig, optional
         Configuration for column names, DC size, etc.
+    baseline : PoaBaseline, optional
+        Previously fitted POA-binned baseline (e.g. loaded with
+        PlantStore.load_clean_baseline) used instead of fitting one from
+        clean_df.  Without clean_df the regression model is skipped.
+    clean_model : CleanBaselineModel, optional
+        Stored clean-baseline model; supplies both the POA-bin baseline and
+        the regression line, so clean_df is not needed.
 
     Returns
     -------
@@ -605,41 +943,53 @@ def run_fouling_analysis(
         - energy_loss_kwh_per_day
         - cleaning_events_detected
         - df (enriched dataframe with expected values and cleaning event flags)
+        - baseline (the PoaBaseline used, or None)
     """
     if cfg is None:
         cfg = FoulingConfig()
 
-    if clean_df is None or len(clean_df) == 0:
+    if clean_model is not None:
+        baseline = clean_model.baseline
+    has_clean = clean_df is not None and len(clean_df) > 0
+    if not has_clean and baseline is None:
         raise ValueError(
             "A clean-period dataset (clean_df) is required.\n"
             "Provide data from a known clean period (modules recently washed, "
             "no heavy soiling or major faults) so the baseline can be established."
         )
 
-    # 1 — Standardise column names on both datasets
+    # 1 — Standardise column names on both datasets.  This is the only copy
+    # of df: every later step adds its derived columns to this working frame.
+    # clean_df only shares the caller's data and just gains whole columns.
     df = standardise_columns(df, cfg)
-    clean_df = standardise_columns(clean_df, cfg)
+    if has_clean:
+        clean_df = standardise_columns(clean_df, cfg, copy=False)
 
     # 2 — Ensure timestamps are parsed
     if cfg.timestamp in df.columns:
         df[cfg.timestamp] = pd.to_datetime(df[cfg.timestamp], errors="coerce")
-    if cfg.timestamp in clean_df.columns:
+    if has_clean and cfg.timestamp in clean_df.columns:
         clean_df[cfg.timestamp] = pd.to_datetime(clean_df[cfg.timestamp], errors="coerce")
 
     # 3 — Compute PR for both datasets
-    df = calculate_pr(df, cfg)
-    clean_df = calculate_pr(clean_df, cfg)
+    calculate_pr(df, cfg, copy=False)
+    if has_clean:
+        calculate_pr(clean_df, cfg, copy=False)
 
-    # 4 — Treat all rows in clean_df as 'is_clean'
-    clean_df = clean_df.copy()
-    clean_df["is_clean"] = True
+        # 4 — Treat all rows in clean_df as 'is_clean'
+        clean_df["is_clean"] = True
 
-    # 5 — Build POA-matched expected clean baseline from clean_df
-    df = estimate_clean_baseline_poa_matched(df, cfg, clean_df=clean_df)
+    # 5 — POA-matched expected clean baseline (fitted from clean_df unless given)
+    if baseline is None:
+        baseline = fit_poa_baseline(clean_df, cfg)
+    estimate_clean_baseline_poa_matched(df, cfg, copy=False, baseline=baseline)
 
     # 6 — Fit and apply optional clean regression model
-    model = fit_clean_regression_model(clean_df, cfg)
-    df = apply_clean_model(df, model, cfg)
+    if clean_model is not None:
+        model = clean_model.regression
+    else:
+        model = fit_clean_regression_model(clean_df, cfg) if has_clean else None
+    apply_clean_model(df, model, cfg, copy=False)
 
     # 7 — Fouling index (actual vs POA-matched expected)
     fouling_index = calculate_fouling_index(df, cfg)
@@ -651,7 +1001,7 @@ def run_fouling_analysis(
     energy_loss = estimate_energy_loss(df, cfg)
 
     # 10 — Cleaning events (on full df)
-    df = detect_cleaning_events(df)
+    detect_cleaning_events(df, copy=False)
 
     return {
         "fouling_index": fouling_index,
@@ -659,6 +1009,7 @@ def run_fouling_analysis(
         "energy_loss_kwh_per_day": energy_loss,
         "cleaning_events_detected": int(df["cleaning_event"].sum()),
         "df": df,
+        "baseline": baseline,
     }
 
 
@@ -677,11 +1028,11 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "full_data_csv",
-        help="CSV file with full operational data (any period).",
+        help="CSV or Parquet file with full operational data (any period).",
     )
     parser.add_argument(
         "clean_data_csv",
-        help="CSV file from a known clean period (modules clean).",
+        help="CSV or Parquet file from a known clean period (modules clean).",
     )
     parser.add_argument(
         "--dc-size-kw",
@@ -691,9 +1042,6 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    full_df = pd.read_csv(args.full_data_csv)
-    clean_df = pd.read_csv(args.clean_data_csv)
-
     cfg = FoulingConfig(
         dc_size_kw=args.dc_size_kw,
         # column_map can be left None and the auto-guessing logic
@@ -701,5 +1049,8 @@ if __name__ == "__main__":
         column_map=None,
     )
 
+    full_df = read_table(args.full_data_csv, fouling_input_columns(table_columns(args.full_data_csv), cfg))
+    clean_df = read_table(args.clean_data_csv, fouling_input_columns(table_columns(args.clean_data_csv), cfg))
+
     results = run_fouling_analysis(full_df, clean_df=clean_df, cfg=cfg)
     print(results)
@@ -19,6 +19,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 
+from table_io import read_table, table_columns
+
 # --- Configuration ---
 @dataclass
 class Settings:
@@ -73,10 +75,16 @@ def determine_power_col(df: pd.DataFrame, cfg: Settings) -> str:
     raise ValueError(f"Could not find a valid power column. Checked: {cfg.current_col_preferences}")
 
 def load_and_prepare(path: str, cfg: Settings) -> Tuple[pd.DataFrame, pd.DataFrame, str, str]:
-    """Load CSV, split weather/inverter, and auto-detect settings."""
+    """Load CSV or Parquet, split weather/inverter, and auto-detect settings."""
     print(f"Loading {path}...")
     try:
-        df = pd.read_csv(path)
+        # Only the timestamp candidates, irradiance, device ID and power columns are used
+        columns = [
+            c for c in table_columns(path)
+            if c in (cfg.timestamp_col, cfg.irradiance_col, cfg.emigid_col, *cfg.current_col_preferences)
+            or 'time' in c.lower() or 'date' in c.lower()
+        ]
+        df = read_table(path, columns)
     except Exception as e:
         sys.exit(f"Error reading {path}: {e}")
 
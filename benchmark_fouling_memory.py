@@ -0,0 +1,113 @@
+"""Peak-memory benchmark for the fouling pipeline.
+
+Builds a synthetic multi-inverter dataset (half-hourly, one row per inverter
+and timestamp) and measures the tracemalloc peak of:
+
+    copying   every step returns a fresh copy of the frame (the previous
+              behaviour of run_fouling_analysis, reproduced with copy=True)
+    in-place  run_fouling_analysis: one working frame, derived columns
+              added once
+
+Example:
+    python benchmark_fouling_memory.py --inverters 20 --days 365
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Fouling_analysis import (
+    FoulingConfig,
+    apply_clean_model,
+    calculate_fouling_index,
+    calculate_pr,
+    classify_fouling_level,
+    detect_cleaning_events,
+    estimate_clean_baseline_poa_matched,
+    estimate_energy_loss,
+    fit_clean_regression_model,
+    run_fouling_analysis,
+    standardise_columns,
+)
+
+MB = 1024 * 1024
+
+
+def synthetic_dataset(inverters: int, days: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2025-01-01", periods=days * 48, freq="30min", tz="UTC")
+    hours = ts.hour + ts.minute / 60
+    poa = np.clip(1000 * np.sin((hours - 6) / 12 * np.pi), 0, None)
+    soiling = np.tile(np.linspace(1.0, 0.85, len(ts)), inverters)
+    n = len(ts) * inverters
+    poa_rows = np.tile(poa, inverters) * rng.uniform(0.6, 1.0, n)
+    return pd.DataFrame(
+        {
+            "timestamp": np.tile(ts, inverters),
+            "emigId": pd.Categorical(np.repeat([f"INVERT:{i:03d}" for i in range(inverters)], len(ts))),
+            "ac_power": poa_rows / 1000 * 80 * soiling * rng.uniform(0.95, 1.0, n),
+            "poa": poa_rows,
+        }
+    )
+
+
+def _copying_pipeline(df: pd.DataFrame, clean_df: pd.DataFrame, cfg: FoulingConfig) -> dict:
+    df = standardise_columns(df, cfg)
+    clean_df = calculate_pr(standardise_columns(clean_df, cfg), cfg)
+    df = calculate_pr(df, cfg)
+    df = estimate_clean_baseline_poa_matched(df, cfg, clean_df=clean_df)
+    df = apply_clean_model(df, fit_clean_regression_model(clean_df, cfg), cfg)
+    fouling_index = calculate_fouling_index(df, cfg)
+    df = detect_cleaning_events(df)
+    return {
+        "fouling_index": fouling_index,
+        "fouling_level": classify_fouling_level(fouling_index),
+        "energy_loss_kwh_per_day": estimate_energy_loss(df, cfg),
+        "df": df,
+    }
+
+
+def measure(fn: Callable[[], dict]) -> Tuple[float, float, dict]:
+    """Return (peak MB allocated during fn, seconds, result)."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / MB, elapsed, result
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inverters", type=int, default=20, help="Inverters in the synthetic dataset.")
+    parser.add_argument("--days", type=int, default=365, help="Days of half-hourly data per inverter.")
+    args = parser.parse_args(argv)
+
+    df = synthetic_dataset(args.inverters, args.days)
+    clean_df = df[df["timestamp"] < df["timestamp"].iloc[0] + pd.Timedelta(days=3)]
+    cfg = FoulingConfig(dc_size_kw=100.0)
+    input_mb = df.memory_usage(deep=True).sum() / MB
+    print(f"Dataset: {len(df):,} rows, {input_mb:.1f} MB")
+
+    runs = [
+        ("copying", lambda: _copying_pipeline(df, clean_df, cfg)),
+        ("in-place", lambda: run_fouling_analysis(df, clean_df=clean_df, cfg=cfg)),
+    ]
+    for name, fn in runs:
+        peak_mb, elapsed, result = measure(fn)
+        print(
+            f"  {name:<9} peak {peak_mb:8.1f} MB ({peak_mb / input_mb:4.1f}x input), "
+            f"{elapsed:5.2f}s, fouling index {result['fouling_index']:.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,6 @@
 """Export a fouling-ready dataset (timestamp, ac_power, poa) from the plant registry.
 
-The output CSV contains:
+The output (CSV, or Parquet when the path ends in .parquet) contains:
     timestamp  ISO8601 UTC string (30-minute cadence)
     ac_power   Total plant AC power in kW (sum of selected inverters)
     poa        Plane-of-array irradiance in W/m² (converted from SolarGIS kWh/m²)
@@ -20,7 +20,8 @@ from typing import Iterable, List
 import pandas as pd
 
 from plant_store import PlantStore
-from inverter_pipeline import load_db_dataframe
+from inverter_pipeline import load_db_frame
+from table_io import write_table
 
 
 def _sanitize_date(date_str: str) -> str:
@@ -48,28 +49,32 @@ def _select_inverters(store: PlantStore, plant_uid: str, override: Iterable[str]
     return [emig for emig in store.list_emig_ids(plant_uid) if emig.startswith("INVERT:")]
 
 
-def build_dataset(
+def fouling_frame(
+    store: PlantStore,
     plant_alias: str,
     start_date: str,
     end_date: str,
-    output: str,
     inverter_ids: Iterable[str] | None = None,
     poa_id: str = "POA:SOLARGIS:WEIGHTED",
-) -> str:
-    store = PlantStore()
+) -> pd.DataFrame:
+    """Plant-level (timestamp, ac_power, poa) frame for the fouling analysis.
+
+    ``timestamp`` is a UTC datetime column.  Raises ValueError when the
+    plant has no inverters or no inverter/POA data in the range.
+    """
     saved = store.load(plant_alias)
     if not saved:
-        raise SystemExit(f"Plant alias '{plant_alias}' not found in registry.")
+        raise ValueError(f"Plant alias '{plant_alias}' not found in registry.")
     plant_uid = saved["plant_uid"]
 
     inverter_ids = _select_inverters(store, plant_uid, inverter_ids)
     if not inverter_ids:
-        raise SystemExit(f"No inverter IDs found for plant {plant_alias} ({plant_uid}).")
+        raise ValueError(f"No inverter IDs found for plant {plant_alias} ({plant_uid}).")
 
     # Load inverter readings and aggregate to plant-level AC power (kW)
-    inv_df = load_db_dataframe(store, plant_alias, start_date, end_date, inverter_ids)
+    inv_df = load_db_frame(store, plant_alias, start_date, end_date, inverter_ids, ["importEnergy"]).reset_index()
     if inv_df.empty:
-        raise SystemExit("No inverter data returned for the requested range.")
+        raise ValueError("No inverter data returned for the requested range.")
 
     inv_df = inv_df.rename(columns={"emigId": "emig_id"})
     inv_df["timestamp"] = _ensure_timestamp_column(inv_df)
@@ -77,8 +82,8 @@ def build_dataset(
     inv_df = inv_df.sort_values(["emig_id", "timestamp"])
     
     # Compute average power from energy deltas (Wh difference between readings)
-    inv_df["energy_delta_wh"] = inv_df.groupby("emig_id")["importEnergy"].diff()
-    inv_df["interval_hours"] = inv_df.groupby("emig_id")["timestamp"].diff().dt.total_seconds() / 3600
+    inv_df["energy_delta_wh"] = inv_df.groupby("emig_id", observed=True)["importEnergy"].diff()
+    inv_df["interval_hours"] = inv_df.groupby("emig_id", observed=True)["timestamp"].diff().dt.total_seconds() / 3600
     inv_df["interval_hours"] = inv_df["interval_hours"].fillna(0.5)
     inv_df["ac_power_kw"] = inv_df["energy_delta_wh"] / inv_df["interval_hours"] / 1000.0
     inv_df = inv_df.dropna(subset=["ac_power_kw"])
@@ -90,9 +95,9 @@ def build_dataset(
     )
 
     # Load POA data (kWh/m² per interval) and convert to W/m²
-    poa_df = load_db_dataframe(store, plant_alias, start_date, end_date, [poa_id])
+    poa_df = load_db_frame(store, plant_alias, start_date, end_date, [poa_id], ["poaIrradiance"]).reset_index()
     if poa_df.empty:
-        raise SystemExit(f"No POA data found for {poa_id} in the requested range.")
+        raise ValueError(f"No POA data found for {poa_id} in the requested range.")
 
     poa_df["timestamp"] = _ensure_timestamp_column(poa_df)
     poa_df = poa_df.dropna(subset=["timestamp", "poaIrradiance"])
@@ -110,11 +115,25 @@ def build_dataset(
     poa = poa_df[["timestamp", "poa"]]
 
     merged = ac_power.merge(poa, on="timestamp", how="inner")
-    merged = merged.sort_values("timestamp")
+    return merged.sort_values("timestamp", ignore_index=True)
+
+
+def build_dataset(
+    plant_alias: str,
+    start_date: str,
+    end_date: str,
+    output: str,
+    inverter_ids: Iterable[str] | None = None,
+    poa_id: str = "POA:SOLARGIS:WEIGHTED",
+) -> str:
+    store = PlantStore()
+    try:
+        merged = fouling_frame(store, plant_alias, start_date, end_date, inverter_ids, poa_id)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
     merged["timestamp"] = merged["timestamp"].dt.tz_convert("UTC").dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    merged.to_csv(output, index=False)
-    return output
+    return write_table(merged, output)
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -122,7 +141,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--plant-alias", required=True, help="Plant alias stored in registry.")
     parser.add_argument("--start", required=True, help="Start date YYYYMMDD.")
     parser.add_argument("--end", required=True, help="End date YYYYMMDD.")
-    parser.add_argument("--output", required=True, help="Output CSV path.")
+    parser.add_argument("--output", required=True, help="Output CSV or .parquet path.")
     parser.add_argument(
         "--inverters",
         help="Comma-separated inverter EMIG IDs (defaults to all INVERT:* devices for plant).",
@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from plant_store import PlantStore
+
 conn = sqlite3.connect('plant_registry.sqlite')
 
 # =============================================================================
@@ -24,6 +26,13 @@ print("COMPREHENSIVE PR ANALYSIS - Multiple Time Resolutions")
 print("=" * 100)
 print()
 
+# The queries below read readings_typed; fill it for plants not yet migrated
+with PlantStore('plant_registry.sqlite') as store:
+    for plant_uid in plants_df['plant_uid']:
+        written = store.ensure_typed_readings(plant_uid)
+        if written:
+            print(f"Backfilled {written} typed readings for {plant_uid}")
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
@@ -32,13 +41,13 @@ def get_inverter_power(plant_uid, start_date, end_date):
     """Get inverter power data with timestamp alignment"""
     query = """
         SELECT ts, 
-               SUM(CAST(json_extract(payload, '$.apparentPower.value') AS REAL)) as power_w,
+               SUM(apparentPower) as power_w,
                COUNT(DISTINCT emig_id) as inverter_count
-        FROM readings 
+        FROM readings_typed 
         WHERE plant_uid = ? 
           AND emig_id LIKE 'INVERT:%'
           AND ts >= ? AND ts < ?
-          AND json_extract(payload, '$.apparentPower.value') IS NOT NULL
+          AND apparentPower IS NOT NULL
         GROUP BY ts
     """
     df = pd.read_sql_query(query, conn, params=(plant_uid, start_date, end_date))
@@ -57,8 +66,8 @@ def get_poa_data(plant_uid, start_date, end_date):
     """Get POA irradiance data - convert from kWh/m² per HH to W/m²"""
     query = """
         SELECT ts, 
-               CAST(json_extract(payload, '$.poaIrradiance.value') AS REAL) as poa_kwhm2
-        FROM readings 
+               poaIrradiance as poa_kwhm2
+        FROM readings_typed 
         WHERE plant_uid = ? 
           AND emig_id = 'POA:SOLARGIS:WEIGHTED'
           AND ts >= ? AND ts < ?
@@ -34,6 +34,12 @@ store = PlantStore('plant_registry.sqlite')
 conn = sqlite3.connect('plant_registry.sqlite')
 cur = conn.cursor()
 
+# Sections below read readings_typed; fill it for plants not yet migrated
+for plant in store.list_all():
+    written = store.ensure_typed_readings(plant['plant_uid'])
+    if written:
+        print(f"Backfilled {written} typed readings for {plant['alias']}")
+
 # ============================================================================
 # 1. LIST ALL PLANTS AND DATA AVAILABILITY
 # ============================================================================
@@ -159,8 +165,8 @@ for plant_name, plant_uid in test_plants:
     # Get weighted POA readings
     cur.execute("""
         SELECT DATE(ts) as date, 
-               SUM(CAST(json_extract(payload, '$.poaIrradiance.value') AS REAL)) * 0.5 / 1000 as daily_kwh_m2
-        FROM readings 
+               SUM(poaIrradiance) * 0.5 / 1000 as daily_kwh_m2
+        FROM readings_typed 
         WHERE plant_uid = ? AND emig_id = 'POA:SOLARGIS:WEIGHTED'
         GROUP BY DATE(ts)
         ORDER BY date
@@ -208,8 +214,8 @@ def calculate_pr_for_plant(plant_uid, alias, dc_size_kw, start_date, end_date):
     # Get inverter power data
     cur.execute("""
         SELECT ts, 
-               SUM(CAST(json_extract(payload, '$.apparentPower.value') AS REAL)) as total_power_va
-        FROM readings 
+               SUM(apparentPower) as total_power_va
+        FROM readings_typed 
         WHERE plant_uid = ? 
           AND emig_id LIKE 'INVERT:%'
           AND ts >= ? AND ts < ?
@@ -230,8 +236,8 @@ def calculate_pr_for_plant(plant_uid, alias, dc_size_kw, start_date, end_date):
     # Get POA data
     cur.execute("""
         SELECT ts, 
-               CAST(json_extract(payload, '$.poaIrradiance.value') AS REAL) as poa
-        FROM readings 
+               poaIrradiance as poa
+        FROM readings_typed 
         WHERE plant_uid = ? 
           AND emig_id = 'POA:SOLARGIS:WEIGHTED'
           AND ts >= ? AND ts < ?
@@ -341,10 +347,10 @@ try:
     # Build dataset
     cur.execute("""
         SELECT r1.ts, 
-               SUM(CAST(json_extract(r1.payload, '$.apparentPower.value') AS REAL)) / 1000 as ac_power,
-               AVG(CAST(json_extract(r2.payload, '$.poaIrradiance.value') AS REAL)) as poa
-        FROM readings r1
-        LEFT JOIN readings r2 ON r1.ts = r2.ts AND r2.plant_uid = ? AND r2.emig_id = 'POA:SOLARGIS:WEIGHTED'
+               SUM(r1.apparentPower) / 1000 as ac_power,
+               AVG(r2.poaIrradiance) as poa
+        FROM readings_typed r1
+        LEFT JOIN readings_typed r2 ON r1.ts = r2.ts AND r2.plant_uid = ? AND r2.emig_id = 'POA:SOLARGIS:WEIGHTED'
         WHERE r1.plant_uid = ? 
           AND r1.emig_id LIKE 'INVERT:%'
           AND r1.ts >= '2025-06-01' AND r1.ts < '2025-11-01'
@@ -1,84 +1,68 @@
 """Delete all POA data and reimport for all plants"""
 import os
-import sys
-import io
 from plant_store import PlantStore
+from solargis_poa_import import reimport_poa_parallel
 
-store = PlantStore('plant_registry.sqlite')
 
-# Get all plants
-all_plants = store.list_all()
-print(f"Found {len(all_plants)} plants in database")
+def main():
+    store = PlantStore('plant_registry.sqlite')
 
-# Count and delete all POA records
-total_deleted = 0
-for plant in all_plants:
-    plant_uid = plant.get('plant_uid')
-    plant_name = plant.get('name', 'Unknown')
-    
-    deleted = store.delete_devices_by_pattern(plant_uid, 'POA:%')
-    if deleted > 0:
-        total_deleted += deleted
-        print(f"  {plant_name}: deleted {deleted} POA records")
+    # Get all plants
+    all_plants = store.list_all()
+    print(f"Found {len(all_plants)} plants in database")
 
-print(f"\nTotal POA records deleted: {total_deleted}")
-print("="*80)
+    # Count and delete all POA records
+    total_deleted = 0
+    for plant in all_plants:
+        plant_uid = plant.get('plant_uid')
+        plant_name = plant.get('alias', 'Unknown')
 
-# Now reimport all POA data
-from solargis_poa_import import import_poa_for_plant_multi_folder, store_poa_in_db
+        deleted = store.delete_devices_by_pattern(plant_uid, 'POA:%')
+        if deleted > 0:
+            total_deleted += deleted
+            print(f"  {plant_name}: deleted {deleted} POA records")
 
-base_dir = os.path.expanduser("~/OneDrive - AMPYR IDEA UK Ltd/Monthly Excom/Monthly SolarGIS data")
-all_items = os.listdir(base_dir)
-solargis_folders = [os.path.join(base_dir, item) for item in all_items if os.path.isdir(os.path.join(base_dir, item))]
+    print(f"\nTotal POA records deleted: {total_deleted}")
+    print("="*80)
 
-print(f"\nReimporting POA data for all plants...")
-print(f"Date range: June 2025 - November 2025")
-print("="*80)
+    # Now reimport all POA data
+    base_dir = os.path.expanduser("~/OneDrive - AMPYR IDEA UK Ltd/Monthly Excom/Monthly SolarGIS data")
+    all_items = os.listdir(base_dir)
+    solargis_folders = [os.path.join(base_dir, item) for item in all_items if os.path.isdir(os.path.join(base_dir, item))]
 
-# Track progress
-imported_count = 0
-failed_count = 0
+    print(f"\nReimporting POA data for all plants...")
+    print(f"Date range: June 2025 - November 2025")
+    print("="*80)
 
-for plant in all_plants:
-    plant_name = plant.get('name', 'Unknown')
-    plant_uid = plant.get('plant_uid')
-    
-    print(f"\n[{imported_count + failed_count + 1}/{len(all_plants)}] {plant_name}...")
-    
-    # Suppress verbose output
-    old_stdout = sys.stdout
-    sys.stdout = io.StringIO()
-    
-    try:
-        poa_df = import_poa_for_plant_multi_folder(
-            plant_name=plant_name,
-            plant_uid=plant_uid,
-            solargis_folders=solargis_folders,
-            start_date="20250601",
-            end_date="20251130",
-            store=store,
-            fuzzy_threshold=0.5
-        )
-        
-        if poa_df is not None and not poa_df.empty:
-            store_poa_in_db(store, plant_uid, poa_df)
-            sys.stdout = old_stdout
-            
-            # Get updated capacity
-            updated_plant = store.load(plant_name)
-            dc = updated_plant.get('dc_size_kw', 0)
-            orientations = len(poa_df[['azimuth', 'slope']].drop_duplicates())
-            print(f"  ✓ Imported {len(poa_df)} records, {orientations} orientations, DC: {dc:.1f} kW")
+    # Plants are read/processed in parallel; this process is the only DB writer
+    results = reimport_poa_parallel(
+        store,
+        [(plant.get('alias', 'Unknown'), plant.get('plant_uid')) for plant in all_plants],
+        solargis_folders,
+        start_date="20250601",
+        end_date="20251130",
+        fuzzy_threshold=0.5,
+        delete_existing=False,
+    )
+
+    imported_count = 0
+    failed_count = 0
+    for r in results:
+        if r['status'] == 'ok':
+            dc = store.load(r['alias']) or {}
+            print(f"  ✓ {r['alias']}: {r['records']} records, {r['orientations']} orientations, DC: {dc.get('dc_size_kw') or 0:.1f} kW")
             imported_count += 1
+        elif r['status'] == 'no_data':
+            print(f"  ⚠ {r['alias']}: No POA data found")
+            failed_count += 1
         else:
-            sys.stdout = old_stdout
-            print(f"  ⚠ No POA data found")
+            print(f"  ✗ {r['alias']}: Error: {r['error']}")
             failed_count += 1
-            
-    except Exception as e:
-        sys.stdout = old_stdout
-        print(f"  ✗ Error: {str(e)}")
-        failed_count += 1
 
-print("\n" + "="*80)
-print(f"Import complete: {imported_count} succeeded, {failed_count} failed/no data")
+    print("\n" + "="*80)
+    print(f"Import complete: {imported_count} succeeded, {failed_count} failed/no data")
+
+
+# The guard matters: worker processes re-import this module on spawn platforms
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import os
 import sys
 import time
 from plant_store import PlantStore
-from solargis_poa_import import import_poa_for_plant_multi_folder, store_poa_in_db
+from solargis_poa_import import reimport_poa_parallel
 
 def main():
     print("="*80)
@@ -23,44 +23,18 @@ def main():
     all_plants = store.list_all()
     print(f"Processing {len(all_plants)} plants\n")
     
-    success = []
-    failed = []
-    no_data = []
-    
-    for i, plant_rec in enumerate(all_plants, 1):
-        plant_alias = plant_rec['alias']
-        plant_uid = plant_rec['plant_uid']
-        
-        print(f"\n[{i}/{len(all_plants)}] {plant_alias}...", end=" ", flush=True)
-        
-        try:
-            # Delete old POA
-            deleted = store.delete_devices_by_pattern(plant_uid, 'POA:%')
-            
-            # Import
-            poa_df = import_poa_for_plant_multi_folder(
-                plant_name=plant_alias,
-                plant_uid=plant_uid,
-                solargis_folders=solargis_folders,
-                start_date="20250601",
-                end_date="20251130",
-                store=store,
-                fuzzy_threshold=0.5
-            )
-            
-            if poa_df is not None and not poa_df.empty:
-                store_poa_in_db(store, plant_uid, poa_df)
-                updated_plant = store.load(plant_alias)
-                dc = updated_plant.get('dc_size_kw', 0)
-                print(f"OK ({dc:.1f} kW)")
-                success.append(plant_alias)
-            else:
-                print("No data")
-                no_data.append(plant_alias)
-                
-        except Exception as e:
-            print(f"ERROR: {e}")
-            failed.append((plant_alias, str(e)))
+    # Plants are read/processed in parallel; this process is the only DB writer
+    results = reimport_poa_parallel(
+        store,
+        [(p['alias'], p['plant_uid']) for p in all_plants],
+        solargis_folders,
+        start_date="20250601",
+        end_date="20251130",
+        fuzzy_threshold=0.5,
+    )
+    success = [r['alias'] for r in results if r['status'] == 'ok']
+    no_data = [r['alias'] for r in results if r['status'] == 'no_data']
+    failed = [(r['alias'], r['error']) for r in results if r['status'] == 'error']
     
     elapsed = time.time() - start_time
     
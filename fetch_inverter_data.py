@@ -40,19 +40,32 @@ Usage example:
 
 import csv
 import os
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 import tkinter as tk
 from tkinter import filedialog
 
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+
+from plant_store import METRIC_COLUMNS
 
 # Base URL for the Juggle API (read‑only).  You shouldn't need to change
 # this unless Juggle update their service.
 BASE_URL = "https://www.emig.co.uk/p/api"
 
+# The API enforces a minimum interval of 1.2 s between requests【155652860288747†L60-L61】.
+REQUEST_INTERVAL_S = 1.2
+
+# HTTP status codes worth retrying (throttling and transient server errors).
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 @dataclass
 class Config:
@@ -63,9 +76,100 @@ class Config:
     start_date: str
     end_date: str
     min_interval_s: int = 1800  # default to half‑hourly
+    max_retries: int = 3  # retries for 429/5xx responses and connection errors/timeouts
+    backoff_s: float = 0.5  # first retry delay, doubled on each attempt
+
 
+class RateLimiter:
+    """Thread-safe token bucket shared by every request in the process.
 
-def get_plant_devices(cfg: Config) -> List[str]:
+    ``rate`` tokens are added per second up to ``burst``; ``acquire`` blocks
+    until a token is available.  Unlike a fixed sleep after each request, time
+    spent waiting on the network counts towards the interval.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Fleet-wide limiter used when callers do not pass their own.
+DEFAULT_LIMITER = RateLimiter(1 / REQUEST_INTERVAL_S)
+
+
+class JuggleClient:
+    """Juggle API client owning a pooled, keep-alive ``requests.Session``.
+
+    Reusing one client across calls avoids a new TCP+TLS handshake per
+    request.  The session sends the auth header and asks for gzip/deflate
+    responses; ``timeout`` is a ``(connect, read)`` tuple or a single number
+    applied to every request unless overridden.  Extra transport adapters
+    (e.g. with urllib3 retries or a proxy) can be attached with ``mount``.
+    The session is safe to share between the fetch worker threads.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: Union[float, Tuple[float, float]] = (10.0, 60.0),
+        pool_maxsize: int = 10,
+        base_url: str = BASE_URL,
+    ) -> None:
+        self.api_key = api_key
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers.update(
+            {
+                "Authorization": f"token {api_key}",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            }
+        )
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def mount(self, prefix: str, adapter: HTTPAdapter) -> None:
+        """Attach a transport adapter for URLs starting with ``prefix``."""
+        self.session.mount(prefix, adapter)
+
+    def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Optional[str]]] = None,
+        timeout: Union[float, Tuple[float, float], None] = None,
+    ) -> requests.Response:
+        """GET ``path`` (relative to the API base URL, or absolute)."""
+        url = path if path.startswith("http") else f"{self.base_url}/{path.lstrip('/')}"
+        return self.session.get(url, params=params, timeout=timeout or self.timeout)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "JuggleClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def get_plant_devices(cfg: Config, client: Optional[JuggleClient] = None) -> List[str]:
     """Retrieve the list of device EMIG IDs for the given plant.
 
     The Juggle API plant endpoint returns a JSON document containing
@@ -76,15 +180,18 @@ def get_plant_devices(cfg: Config) -> List[str]:
     ----------
     cfg : Config
         Configuration containing API key and plant UID.
+    client : JuggleClient, optional
+        Shared API client; a temporary one is created if omitted.
 
     Returns
     -------
     List[str]
         A list of EMIG IDs for all devices of type ``INVERTER``.
     """
-    url = f"{BASE_URL}/plant/{cfg.plant_uid}"
-    headers = {"Authorization": f"token {cfg.api_key}"}
-    response = requests.get(url, headers=headers)
+    if client is None:
+        with JuggleClient(cfg.api_key) as client:
+            return get_plant_devices(cfg, client)
+    response = client.get(f"plant/{cfg.plant_uid}")
     response.raise_for_status()
     data = response.json()
     devices = data.get("meters", [])
@@ -93,13 +200,16 @@ def get_plant_devices(cfg: Config) -> List[str]:
     return inverter_ids
 
 
-def discover_plants(api_key: str) -> List[Dict[str, str]]:
+def discover_plants(api_key: str, client: Optional[JuggleClient] = None) -> List[Dict[str, str]]:
     """
     Try to list plants available to the API key.
 
     Attempts a few possible endpoints; returns an empty list on failure.
+    All probes share one keep-alive ``client`` (created if omitted).
     """
-    headers = {"Authorization": f"token {api_key}"}
+    if client is None:
+        with JuggleClient(api_key) as client:
+            return discover_plants(api_key, client)
     urls = [
         f"{BASE_URL}/plants",
         f"{BASE_URL}/plants/list",
@@ -110,7 +220,7 @@ def discover_plants(api_key: str) -> List[Dict[str, str]]:
     ]
     for url in urls:
         try:
-            resp = requests.get(url, headers=headers, timeout=30)
+            resp = client.get(url, timeout=30)
             if resp.status_code == 404:
                 continue
             resp.raise_for_status()
@@ -136,7 +246,7 @@ def discover_plants(api_key: str) -> List[Dict[str, str]]:
         for i in range(1, 101):
             uid = f"{prefix}:{i:05d}"
             try:
-                resp = requests.get(f"{BASE_URL}/plant/{uid}", headers=headers, timeout=10)
+                resp = client.get(f"plant/{uid}", timeout=10)
                 if resp.status_code == 404:
                     continue
                 resp.raise_for_status()
@@ -187,7 +297,14 @@ NEWFOLD_INVERTER_IDS: List[str] = [
 # Weather station for Newfold Farm
 NEWFOLD_WEATHER_ID = "WETH:000274"
 
-def fetch_readings_for_period(cfg: Config, emig_id: str, start_date: str, end_date: str) -> List[Dict]:
+def fetch_readings_for_period(
+    cfg: Config,
+    emig_id: str,
+    start_date: str,
+    end_date: str,
+    limiter: Optional[RateLimiter] = None,
+    client: Optional[JuggleClient] = None,
+) -> List[Dict]:
     """Fetch readings for a specific inverter and date range.
 
     This helper handles a single call to the readings endpoint and returns
@@ -195,6 +312,11 @@ def fetch_readings_for_period(cfg: Config, emig_id: str, start_date: str, end_da
     per request【155652860288747†L62-L78】, so you should split large date ranges before
     calling this function.
 
+    Every attempt first takes a token from ``limiter`` (``DEFAULT_LIMITER``
+    if omitted).  429 and 5xx responses, connection errors and timeouts are
+    retried up to ``cfg.max_retries`` times with exponential backoff,
+    honouring ``Retry-After`` when present.
+
     Parameters
     ----------
     cfg : Config
@@ -205,26 +327,95 @@ def fetch_readings_for_period(cfg: Config, emig_id: str, start_date: str, end_da
         Start date in ``YYYYMMDD`` format (inclusive).
     end_date : str
         End date in ``YYYYMMDD`` format (inclusive).
+    limiter : RateLimiter, optional
+        Shared request-rate limiter.
+    client : JuggleClient, optional
+        Shared API client; a temporary one is created if omitted.
 
     Returns
     -------
     List[Dict]
         List of reading dictionaries returned by the API.
     """
-    url = f"{BASE_URL}/meter/{emig_id}/readings"
+    if client is None:
+        with JuggleClient(cfg.api_key) as client:
+            return fetch_readings_for_period(cfg, emig_id, start_date, end_date, limiter, client)
+    limiter = limiter or DEFAULT_LIMITER
     params: Dict[str, Optional[str]] = {
         "startDate": start_date,
         "endDate": end_date,
         "minIntervalS": str(cfg.min_interval_s) if cfg.min_interval_s else None,
     }
-    headers = {"Authorization": f"token {cfg.api_key}"}
-    response = requests.get(url, headers=headers, params=params)
+    attempt = 0
+    while True:
+        limiter.acquire()
+        delay = cfg.backoff_s * (2 ** attempt)
+        try:
+            response = client.get(f"meter/{emig_id}/readings", params=params)
+        except (requests.ConnectionError, requests.Timeout):
+            # e.g. a pooled keep-alive socket the server closed while idle
+            if attempt >= cfg.max_retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt >= cfg.max_retries:
+                break
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        time.sleep(delay)
+        attempt += 1
     response.raise_for_status()
     data = response.json()
     return data.get("readings", [])
 
 
-def fetch_all_readings(cfg: Config, emig_id: str) -> List[Dict]:
+def max_segment_days(min_interval_s: int) -> int:
+    """Days per request that stay within the API's 5,000-readings limit【155652860288747†L473-L496】."""
+    if min_interval_s <= 1800:
+        return 104
+    if min_interval_s <= 3600:
+        return 208
+    # daily or lower frequency can fetch up to 5000 days (effectively unlimited for typical use)
+    return 5000
+
+
+def plan_segments(ranges: Sequence[Tuple[str, str]], min_interval_s: int) -> List[Tuple[str, str]]:
+    """Turn inclusive YYYYMMDD date ranges into API request segments.
+
+    Ranges close enough together to fit in one request are coalesced (the
+    already-downloaded days between them are simply fetched again, which is
+    cheaper than another throttled request); longer ranges are split into
+    segments of at most ``max_segment_days`` days.
+    """
+    max_days = max_segment_days(min_interval_s)
+    segments: List[Tuple[datetime, datetime]] = []
+    for start, end in sorted(ranges):
+        start_dt = datetime.strptime(start, "%Y%m%d")
+        end_dt = datetime.strptime(end, "%Y%m%d")
+        if segments:
+            last_start, last_end = segments[-1]
+            if (end_dt - last_start).days < max_days:
+                segments[-1] = (last_start, max(last_end, end_dt))
+                continue
+            if start_dt <= last_end + timedelta(days=1):
+                # Contiguous with the previous segment: fill it up first
+                full_end = last_start + timedelta(days=max_days - 1)
+                segments[-1] = (last_start, full_end)
+                start_dt = full_end + timedelta(days=1)
+        current_start = start_dt
+        while current_start <= end_dt:
+            current_end = min(current_start + timedelta(days=max_days - 1), end_dt)
+            segments.append((current_start, current_end))
+            current_start = current_end + timedelta(days=1)
+    return [(a.strftime("%Y%m%d"), b.strftime("%Y%m%d")) for a, b in segments]
+
+
+def date_segments(cfg: Config) -> List[Tuple[str, str]]:
+    """Split the configured date range into (start, end) YYYYMMDD segments."""
+    return plan_segments([(cfg.start_date, cfg.end_date)], cfg.min_interval_s)
+
+
+def fetch_all_readings(cfg: Config, emig_id: str, client: Optional[JuggleClient] = None) -> List[Dict]:
     """Fetch all readings across the configured date range, handling API limits.
 
     The Juggle API restricts each readings request to 5,000 data points.  The
@@ -240,42 +431,133 @@ def fetch_all_readings(cfg: Config, emig_id: str) -> List[Dict]:
         Configuration containing API key and date range.
     emig_id : str
         EMIG ID of the inverter to query.
+    client : JuggleClient, optional
+        Shared API client; a temporary one is created if omitted so that all
+        segments reuse the same connection.
 
     Returns
     -------
     List[Dict]
         Combined list of reading dictionaries for the entire date range.
     """
+    if client is None:
+        with JuggleClient(cfg.api_key) as client:
+            return fetch_all_readings(cfg, emig_id, client)
     readings: List[Dict] = []
-    start_dt = datetime.strptime(cfg.start_date, "%Y%m%d")
-    end_dt = datetime.strptime(cfg.end_date, "%Y%m%d")
-
-    # Determine maximum days per request based on minIntervalS
-    # Mapping taken from the API documentation【155652860288747†L473-L496】
-    if cfg.min_interval_s <= 1800:
-        max_days = 104
-    elif cfg.min_interval_s <= 3600:
-        max_days = 208
-    else:
-        # daily or lower frequency can fetch up to 5000 days (effectively unlimited for typical use)
-        max_days = 5000
-
-    current_start = start_dt
-    while current_start <= end_dt:
-        current_end = current_start + timedelta(days=max_days - 1)
-        if current_end > end_dt:
-            current_end = end_dt
-        start_str = current_start.strftime("%Y%m%d")
-        end_str = current_end.strftime("%Y%m%d")
-        segment_readings = fetch_readings_for_period(cfg, emig_id, start_str, end_str)
-        readings.extend(segment_readings)
-        # Advance to the day after current_end
-        current_start = current_end + timedelta(days=1)
-        # Respect the request throttle (minimum interval 1.2 s【155652860288747†L60-L61】)
-        time.sleep(1.2)
+    for start_str, end_str in date_segments(cfg):
+        # Request spacing is enforced by the shared rate limiter
+        readings.extend(fetch_readings_for_period(cfg, emig_id, start_str, end_str, client=client))
     return readings
 
 
+# Completed segments buffered between fetch workers and the consumer.  Workers
+# block once it is full, so memory is bounded by (workers + queue) segments.
+DEFAULT_QUEUE_SIZE = 8
+
+
+def iter_fetch_segments(
+    cfg: Config,
+    emig_ids: Sequence[str],
+    max_workers: int = 4,
+    limiter: Optional[RateLimiter] = None,
+    client: Optional[JuggleClient] = None,
+    plan: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> Iterator[Tuple[str, Tuple[str, str], Optional[List[Dict]], Optional[Exception]]]:
+    """Fetch (device, segment) pairs concurrently, streaming each response.
+
+    Every segment is requested on a thread pool sharing ``limiter`` (so the
+    overall request rate stays within the API throttle) and ``client``'s
+    connection pool (a temporary client sized to ``max_workers`` is used if
+    omitted).  Responses are handed over through a bounded queue and yielded
+    as ``(emig_id, (start, end), readings, None)`` in completion order, or
+    ``(emig_id, (start, end), None, exc)`` on failure, so the caller can
+    store each one and drop it before the next arrives.
+
+    ``plan`` maps each EMIG ID to its own list of segments (see
+    ``plan_segments``); devices missing from it fetch the whole configured
+    range.
+    """
+    if client is None:
+        with JuggleClient(cfg.api_key, pool_maxsize=max_workers) as client:
+            yield from iter_fetch_segments(cfg, emig_ids, max_workers, limiter, client, plan, queue_size)
+        return
+    limiter = limiter or DEFAULT_LIMITER
+    default_segments = date_segments(cfg)
+    tasks = [
+        (emig_id, segment)
+        for emig_id in emig_ids
+        for segment in (plan or {}).get(emig_id, default_segments)
+    ]
+    results: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def _work(emig_id: str, segment: Tuple[str, str]) -> None:
+        if stop.is_set():
+            return
+        try:
+            item = (emig_id, segment, fetch_readings_for_period(cfg, emig_id, *segment, limiter, client), None)
+        except Exception as exc:  # noqa: BLE001 - handed to the consumer
+            item = (emig_id, segment, None, exc)
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for emig_id, segment in tasks:
+            pool.submit(_work, emig_id, segment)
+        for _ in tasks:
+            yield results.get()
+    finally:
+        # Unblock and discard remaining work if the consumer stops early
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_fetch_many(
+    cfg: Config,
+    emig_ids: Sequence[str],
+    max_workers: int = 4,
+    limiter: Optional[RateLimiter] = None,
+    client: Optional[JuggleClient] = None,
+    plan: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+) -> Iterator[Tuple[str, Optional[List[Dict]], Optional[Exception]]]:
+    """Fetch several devices concurrently, yielding each one as it completes.
+
+    Built on ``iter_fetch_segments``.  Yields ``(emig_id, readings, None)``
+    once all segments of a device are in (in date order), or
+    ``(emig_id, None, exc)`` if any segment failed.  Holds a whole device in
+    memory; use ``iter_fetch_segments`` to stream instead.
+    """
+    default_segments = date_segments(cfg)
+    segments = {emig_id: (plan or {}).get(emig_id, default_segments) for emig_id in emig_ids}
+    for emig_id in emig_ids:
+        if not segments[emig_id]:
+            yield emig_id, [], None
+    pending = {emig_id: len(segs) for emig_id, segs in segments.items() if segs}
+    parts: Dict[str, Dict[Tuple[str, str], List[Dict]]] = {emig_id: {} for emig_id in pending}
+    failed: Dict[str, Exception] = {}
+
+    for emig_id, segment, rows, exc in iter_fetch_segments(
+        cfg, list(pending), max_workers, limiter, client, segments
+    ):
+        if exc is not None:
+            failed.setdefault(emig_id, exc)
+        else:
+            parts[emig_id][segment] = rows
+        pending[emig_id] -= 1
+        if pending[emig_id] == 0:
+            if emig_id in failed:
+                yield emig_id, None, failed[emig_id]
+            else:
+                yield emig_id, [r for seg in sorted(parts[emig_id]) for r in parts[emig_id][seg]], None
+            del parts[emig_id]
+
+
 def write_readings_csv(emig_id: str, readings: List[Dict], output_dir: str = ".") -> None:
     """Write readings to a CSV file.
 
@@ -316,14 +598,55 @@ def write_readings_csv(emig_id: str, readings: List[Dict], output_dir: str = "."
     print(f"Saved {len(readings)} readings to {filename}")
 
 
-def write_combined_csv(all_readings: List[Dict], output_file: str = "newfold_inverters_readings.csv") -> None:
+# Rows normalised into one DataFrame per CSV write.  Bounds memory for
+# multi-million-row exports while keeping pandas' C writer busy.
+COMBINED_CSV_CHUNK_ROWS = 100_000
+
+# Reading fields known to come back from the API: the metric registry used
+# for ``readings_typed`` plus non-metric fields such as the device state.
+COMBINED_CSV_FIELDS: Tuple[str, ...] = (*METRIC_COLUMNS, "stateCode")
+
+
+def _unwrap_value(val):
+    # Reading fields arrive either as scalars or as {"value": x, "unit": u}
+    if isinstance(val, dict) and "value" in val:
+        return val["value"]
+    return val
+
+
+def _reading_fields(frame: pd.DataFrame) -> set:
+    return set(frame.columns) - {"ts", "emigId"}
+
+
+def _combined_frame(frame: pd.DataFrame, fieldnames: Sequence[str]) -> pd.DataFrame:
+    """Lay out a frame of readings as a combined CSV chunk (``timestamp``, ``emigId``, then ``fieldnames``)."""
+    # Only object columns can hold {"value": ...} dicts; numeric ones are left as-is
+    wrapped = [col for col in fieldnames if col in frame.columns and frame[col].dtype == object]
+    frame = frame.reindex(columns=["ts", "emigId", *fieldnames]).rename(columns={"ts": "timestamp"})
+    # pandas writes object columns with str() (like csv.writer, so ints stay
+    # ints) about twice as fast as it formats float columns
+    frame = frame.astype(object)
+    for col in wrapped:
+        frame[col] = pd.Series([_unwrap_value(v) for v in frame[col].to_numpy()], index=frame.index, dtype=object)
+    return frame
+
+
+def write_combined_csv(
+    all_readings: List[Dict],
+    output_file: str = "newfold_inverters_readings.csv",
+    fieldnames: Optional[Sequence[str]] = None,
+    chunk_rows: int = COMBINED_CSV_CHUNK_ROWS,
+) -> None:
     """Write combined readings for all inverters into a single CSV file.
 
     Each row of the output contains the timestamp, the EMIG ID of the inverter
-    and one column per reading field returned by the API.  If an inverter
-    does not report a particular field at a given timestamp, the value will
-    be left blank.  See the Juggle API documentation for a list of possible
-    reading fields【155652860288747†L500-L534】.
+    and one column per reading field.  The columns come from ``fieldnames``
+    (by default every known API field, ``COMBINED_CSV_FIELDS``), so the
+    readings are not scanned up front to build the header; any other field
+    is appended as an extra column.  If an inverter does not report a
+    particular field at a given timestamp, the value will be left blank.
+    See the Juggle API documentation for a list of possible reading
+    fields【155652860288747†L500-L534】.
 
     Parameters
     ----------
@@ -334,25 +657,87 @@ def write_combined_csv(all_readings: List[Dict], output_file: str = "newfold_inv
     output_file : str, optional
         Filename for the combined CSV.  Defaults to
         ``newfold_inverters_readings.csv``.
+    fieldnames : Sequence[str], optional
+        Reading fields to write, defaulting to ``COMBINED_CSV_FIELDS``.
+    chunk_rows : int, optional
+        Readings converted and written per chunk.
     """
     if not all_readings:
         print("No readings returned for any inverter.  Skipping combined CSV generation.")
         return
-    # Determine all field names across all readings (exclude ts and emigId)
-    fieldnames = sorted({key for r in all_readings for key in r.keys() if key not in {"ts", "emigId"}})
-    with open(output_file, "w", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["timestamp", "emigId"] + fieldnames)
-        for r in all_readings:
-            row = [r.get("ts"), r.get("emigId")]
-            for field in fieldnames:
-                val = r.get(field)
-                if isinstance(val, dict) and "value" in val:
-                    row.append(val["value"])
-                else:
-                    row.append(val)
-            writer.writerow(row)
-    print(f"Saved {len(all_readings)} combined readings to {output_file}")
+    with CombinedCsvAppender(output_file, fieldnames, chunk_rows) as out:
+        out.append(all_readings)
+    print(f"Saved {out.rows_written} combined readings to {output_file}")
+    if out.extra_fields:
+        print(f"Fields outside the known schema were added as columns: {', '.join(out.extra_fields)}")
+
+
+class CombinedCsvAppender:
+    """Append readings to a combined CSV as they arrive.
+
+    Streaming counterpart of ``write_combined_csv``: the header cannot be
+    derived from the full dataset, so it comes from ``fieldnames`` (by
+    default every known API field, ``COMBINED_CSV_FIELDS``).  Other fields
+    are appended as extra columns (listed in ``extra_fields``); one that
+    first shows up after rows were written widens the file in place, which
+    rewrites it once.  The file is only created when the first non-empty
+    batch arrives.  Each batch is converted to columns and written
+    ``chunk_rows`` readings at a time.
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        fieldnames: Optional[Sequence[str]] = None,
+        chunk_rows: int = COMBINED_CSV_CHUNK_ROWS,
+    ) -> None:
+        self.output_file = output_file
+        self.fieldnames = sorted(fieldnames if fieldnames is not None else COMBINED_CSV_FIELDS)
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self.extra_fields: List[str] = []
+        self._file = None
+
+    def append(self, readings: List[Dict]) -> None:
+        if not readings:
+            return
+        for i in range(0, len(readings), self.chunk_rows):
+            frame = pd.DataFrame.from_records(readings[i : i + self.chunk_rows])
+            new_fields = sorted(_reading_fields(frame) - set(self.fieldnames) - set(self.extra_fields))
+            header = self._file is None
+            if header:
+                self._file = open(self.output_file, "w", newline="")
+            elif new_fields:
+                self._widen(new_fields)
+            self.extra_fields.extend(new_fields)
+            _combined_frame(frame, [*self.fieldnames, *self.extra_fields]).to_csv(
+                self._file, header=header, index=False
+            )
+        self.rows_written += len(readings)
+
+    def _widen(self, new_fields: Sequence[str]) -> None:
+        """Rewrite the rows written so far with empty trailing columns for ``new_fields``."""
+        self._file.close()
+        tmp_path = self.output_file + ".tmp"
+        with open(self.output_file, newline="") as src, open(tmp_path, "w", newline="") as dst:
+            reader, writer = csv.reader(src), csv.writer(dst)
+            writer.writerow(next(reader) + list(new_fields))
+            padding = [""] * len(new_fields)
+            for row in reader:
+                writer.writerow(row + padding)
+        os.replace(tmp_path, self.output_file)
+        self._file = open(self.output_file, "a", newline="")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "CombinedCsvAppender":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
 def main() -> None:
@@ -369,8 +754,11 @@ def main() -> None:
         return
     api_key = api_key.strip()
 
+    # One keep-alive client for discovery and every readings request below
+    client = JuggleClient(api_key)
+
     # Try to discover plants; fall back to env/default prompt
-    discovered = discover_plants(api_key)
+    discovered = discover_plants(api_key, client)
     plant_uid = ""
     if discovered:
         print("\nDiscovered plants:")
@@ -454,7 +842,7 @@ def main() -> None:
     if include_weather:
         print(f"\nFetching weather data for {NEWFOLD_WEATHER_ID} from {cfg.start_date} to {cfg.end_date}...")
         try:
-            weather_readings = fetch_all_readings(cfg, NEWFOLD_WEATHER_ID)
+            weather_readings = fetch_all_readings(cfg, NEWFOLD_WEATHER_ID, client)
             for rec in weather_readings:
                 rec["emigId"] = NEWFOLD_WEATHER_ID
             all_readings.extend(weather_readings)
@@ -468,7 +856,7 @@ def main() -> None:
     for inverter_id in inverter_ids:
         print(f"\nFetching data for inverter {inverter_id} from {cfg.start_date} to {cfg.end_date}...")
         try:
-            readings = fetch_all_readings(cfg, inverter_id)
+            readings = fetch_all_readings(cfg, inverter_id, client)
             # Annotate readings with the inverter ID so they can be distinguished later
             for rec in readings:
                 rec["emigId"] = inverter_id
@@ -478,6 +866,7 @@ def main() -> None:
             print(f"Failed to fetch data for {inverter_id}: {exc}")
         except Exception as exc:
             print(f"Unexpected error processing {inverter_id}: {exc}")
+    client.close()
 
     # Write a single combined CSV file with all data (weather + inverters)
     if all_readings:
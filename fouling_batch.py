@@ -0,0 +1,269 @@
+"""Run the fouling analysis for many plants in one pass.
+
+Each plant is handled by a worker process that reads its plant-level
+(timestamp, ac_power, poa) frame straight from the registry database (one
+range query per device group, see ``build_fouling_dataset.fouling_frame``)
+and runs ``run_fouling_analysis``.  Only the summary numbers travel back to
+the caller, which assembles one table:
+
+    alias, plant_uid, status, fouling_index, fouling_level,
+    energy_loss_kwh_per_day, cleaning_events, clean_start, clean_end,
+    baseline_version, baseline_refit, rows, dc_size_kw, elapsed_s, error
+
+The clean baseline comes from the plant's latest stored model
+(``PlantStore.clean_baseline_record``) as long as the readings of its clean
+days are unchanged; otherwise a clean period is auto-selected, refitted and
+saved by the caller as a new version (``baseline_refit`` is True).  Stored
+records that do not parse as a model are refitted the same way.
+
+``status`` is 'ok', 'no_data' (no inverter/POA data in the window),
+'no_clean_period' (no day passed the clean-period filter) or 'error'.
+
+Example:
+    python fouling_batch.py --start 20250601 --end 20250831 \
+        --plants "Blachford UK,Newfold Farm" --output fleet_fouling.csv
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from build_fouling_dataset import _sanitize_date, fouling_frame
+from Fouling_analysis import (
+    FoulingConfig,
+    auto_select_clean_period,
+    clean_model_is_current,
+    fit_clean_baseline_model,
+    parse_clean_model,
+    run_fouling_analysis,
+)
+from plant_store import DEFAULT_DB, PlantStore
+from table_io import write_table
+
+# Auto clean-period selection: only daylight points (POA >= POA_MIN) count
+# towards the per-day minimum, so a full half-hourly day is ~15-25 points.
+DEFAULT_CLEAN_DAYS = 3
+DEFAULT_MIN_CLEAN_POINTS = 10
+
+FLEET_COLUMNS = [
+    "alias",
+    "plant_uid",
+    "status",
+    "fouling_index",
+    "fouling_level",
+    "energy_loss_kwh_per_day",
+    "cleaning_events",
+    "clean_start",
+    "clean_end",
+    "baseline_version",
+    "baseline_refit",
+    "rows",
+    "dc_size_kw",
+    "elapsed_s",
+    "error",
+]
+
+
+def _plant_fouling_worker(
+    db_path: str,
+    alias: str,
+    start_date: str,
+    end_date: str,
+    clean_days: int,
+    min_clean_points: int,
+    refit_baseline: bool = False,
+) -> Dict:
+    """
+    Load one plant and run the fouling pipeline; never raises.
+
+    A refitted clean-baseline model is returned under ``"clean_model"``
+    (as a dict) for the caller to save; workers never write to the store.
+    """
+    started = time.perf_counter()
+    entry: Dict = {col: None for col in FLEET_COLUMNS}
+    entry.update(alias=alias, status="error", rows=0, baseline_refit=False, clean_model=None)
+    try:
+        with PlantStore(db_path) as store:
+            saved = store.load(alias)
+            if not saved:
+                raise ValueError(f"Plant alias '{alias}' not found in registry.")
+            entry["plant_uid"] = saved["plant_uid"]
+            try:
+                df = fouling_frame(store, alias, start_date, end_date)
+            except ValueError as exc:
+                entry.update(status="no_data", error=str(exc))
+                return entry
+            entry["rows"] = len(df)
+
+            cfg = FoulingConfig(dc_size_kw=saved["dc_size_kw"] or FoulingConfig.dc_size_kw)
+            entry["dc_size_kw"] = cfg.dc_size_kw
+            model = None
+            record = None if refit_baseline else store.clean_baseline_record(saved["plant_uid"])
+            if record is not None:
+                model = parse_clean_model(record["baseline"])
+            if model is not None:
+                first, last = model.clean_dates[0].replace("-", ""), model.clean_dates[-1].replace("-", "")
+                if start_date <= first and last <= end_date:
+                    clean_source = df
+                else:
+                    # Clean days outside this window: read just their span
+                    try:
+                        clean_source = fouling_frame(store, alias, first, last)
+                    except ValueError:
+                        clean_source = None
+                if clean_source is None or not clean_model_is_current(model, clean_source, cfg):
+                    model = None
+                else:
+                    entry["baseline_version"] = record["version"]
+
+        if model is None:
+            clean_df, _ = auto_select_clean_period(df, cfg, days=clean_days, min_points_per_day=min_clean_points)
+            model = fit_clean_baseline_model(clean_df, cfg) if not clean_df.empty else None
+            if model is None:
+                entry["status"] = "no_clean_period"
+                return entry
+            entry.update(baseline_refit=True, clean_model=model.to_dict())
+        entry["clean_start"] = model.clean_dates[0]
+        entry["clean_end"] = model.clean_dates[-1]
+
+        results = run_fouling_analysis(df, clean_df=None, cfg=cfg, clean_model=model)
+        entry.update(
+            status="ok",
+            fouling_index=results["fouling_index"],
+            fouling_level=results["fouling_level"],
+            energy_loss_kwh_per_day=results["energy_loss_kwh_per_day"],
+            cleaning_events=results["cleaning_events_detected"],
+        )
+    except Exception as exc:
+        entry["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        entry["elapsed_s"] = time.perf_counter() - started
+    return entry
+
+
+def run_fleet_fouling(
+    plant_aliases: Sequence[str],
+    start_date: str,
+    end_date: str,
+    db_path: str = DEFAULT_DB,
+    max_workers: Optional[int] = None,
+    clean_days: int = DEFAULT_CLEAN_DAYS,
+    min_clean_points: int = DEFAULT_MIN_CLEAN_POINTS,
+    refit_baseline: bool = False,
+) -> pd.DataFrame:
+    """
+    Fouling analysis for several plants over one date window.
+
+    Parameters
+    ----------
+    plant_aliases : Sequence[str]
+        Registry aliases to analyse
+    start_date, end_date : str
+        Analysis window in YYYYMMDD format (inclusive)
+    db_path : str
+        Registry database; each worker opens its own read connection
+    max_workers : int, optional
+        Worker processes (default: number of CPUs); 1 runs in-process
+    clean_days, min_clean_points : int
+        Passed to ``auto_select_clean_period`` when a baseline is refitted
+    refit_baseline : bool
+        Ignore stored clean-baseline models and refit every plant
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per plant (in ``plant_aliases`` order) with FLEET_COLUMNS.
+        Prints one timing line per plant as results arrive.  Refitted
+        clean-baseline models are saved as new versions in ``db_path``.
+    """
+    aliases = list(dict.fromkeys(plant_aliases))
+    entries: Dict[str, Dict] = {}
+    total_start = time.perf_counter()
+    store = PlantStore(db_path)
+
+    def finish(entry: Dict) -> None:
+        clean_model = entry.pop("clean_model", None)
+        if clean_model is not None:
+            entry["baseline_version"] = store.save_clean_baseline(
+                entry["plant_uid"], clean_model, clean_model["data_hash"]
+            )
+        entries[entry["alias"]] = entry
+        detail = entry["fouling_level"] if entry["status"] == "ok" else entry["status"]
+        if entry["status"] == "error":
+            detail = f"ERROR ({entry['error']})"
+        print(f"  [{len(entries)}/{len(aliases)}] {entry['alias']}: {detail}, {entry['elapsed_s']:.1f}s")
+
+    worker_args = [
+        (db_path, alias, start_date, end_date, clean_days, min_clean_points, refit_baseline) for alias in aliases
+    ]
+    try:
+        if max_workers == 1 or len(aliases) <= 1:
+            for args in worker_args:
+                finish(_plant_fouling_worker(*args))
+        elif aliases:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(_plant_fouling_worker, *args) for args in worker_args]
+                for future in as_completed(futures):
+                    finish(future.result())
+    finally:
+        store.close()
+
+    print(f"  Fouling analysis of {len(aliases)} plant(s) took {time.perf_counter() - total_start:.1f}s")
+    return pd.DataFrame([entries[alias] for alias in aliases], columns=FLEET_COLUMNS)
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="Start date YYYYMMDD.")
+    parser.add_argument("--end", required=True, help="End date YYYYMMDD.")
+    parser.add_argument("--plants", help="Comma-separated plant aliases (default: every plant in the registry).")
+    parser.add_argument("--output", help="Optional CSV or .parquet path for the fleet table.")
+    parser.add_argument("--db-path", default=DEFAULT_DB, help="Path to plant registry SQLite file.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: number of CPUs).")
+    parser.add_argument("--clean-days", type=int, default=DEFAULT_CLEAN_DAYS, help="Top PR days used as the clean baseline.")
+    parser.add_argument(
+        "--min-clean-points",
+        type=int,
+        default=DEFAULT_MIN_CLEAN_POINTS,
+        help="Minimum daylight points per day for clean-period selection.",
+    )
+    parser.add_argument(
+        "--refit-baseline",
+        action="store_true",
+        help="Refit every plant's clean baseline instead of reusing the stored model.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.plants:
+        aliases = [part.strip() for part in args.plants.split(",") if part.strip()]
+    else:
+        with PlantStore(args.db_path) as store:
+            aliases = [p["alias"] for p in store.list_all()]
+    if not aliases:
+        raise SystemExit("No plants to analyse.")
+    table = run_fleet_fouling(
+        aliases,
+        _sanitize_date(args.start),
+        _sanitize_date(args.end),
+        db_path=args.db_path,
+        max_workers=args.workers,
+        clean_days=args.clean_days,
+        min_clean_points=args.min_clean_points,
+        refit_baseline=args.refit_baseline,
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(table.drop(columns=["error"]).to_string(index=False))
+    if args.output:
+        print(f"Fleet fouling table written to {write_table(table, args.output)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
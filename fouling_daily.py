@@ -0,0 +1,241 @@
+"""Incremental daily fouling index updates.
+
+Meant to run after the daily fetch: for each plant, the days stored since
+the last update are read from the registry database (plus one day before
+them, so the first energy delta is complete), matched against the plant's
+stored clean-baseline model and summarised per day.  The rolling fouling
+index and energy loss for each new day come from those per-day summaries
+and the previous ``window_days - 1`` rows of ``fouling_history``, so an
+update costs O(new data) rather than re-reading the whole history.
+
+The last ``reprocess_days`` days already in the history are recomputed on
+every run as well, so a day that had no or only partial data when the job
+ran (e.g. because the fetch lagged) is filled in once its data arrives.
+
+Plants need a stored clean baseline first (``fouling_batch.py`` saves one).
+
+Example:
+    python fouling_daily.py --plants "Blachford UK,Newfold Farm"
+    python fouling_daily.py --since 20250601 --end 20250831   # backfill
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from build_fouling_dataset import _sanitize_date, fouling_frame
+from Fouling_analysis import (
+    FoulingConfig,
+    FoulingDay,
+    daily_fouling_stats,
+    estimate_clean_baseline_poa_matched,
+    parse_clean_model,
+    roll_fouling_days,
+)
+from plant_store import DEFAULT_DB, PlantStore
+from table_io import write_table
+
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_REPROCESS_DAYS = 3
+
+DAILY_COLUMNS = [
+    "alias",
+    "plant_uid",
+    "status",
+    "days_added",
+    "days_updated",
+    "last_day",
+    "fouling_index",
+    "fouling_level",
+    "energy_loss_kwh_per_day",
+    "baseline_version",
+    "elapsed_s",
+    "error",
+]
+
+
+def _day(yyyymmdd: str) -> date:
+    return datetime.strptime(yyyymmdd, "%Y%m%d").date()
+
+
+def update_plant_fouling(
+    store: PlantStore,
+    alias: str,
+    end_date: Optional[str] = None,
+    since: Optional[str] = None,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    reprocess_days: int = DEFAULT_REPROCESS_DAYS,
+) -> Dict:
+    """
+    Append fouling history rows for the days a plant has not been updated
+    for, recomputing the most recent ``reprocess_days`` existing rows.
+
+    Parameters
+    ----------
+    store : PlantStore
+        Registry with readings, clean baselines and fouling history
+    alias : str
+        Plant alias
+    end_date : str, optional
+        Last day to process, YYYYMMDD (default: yesterday, UTC)
+    since : str, optional
+        First day to (re)process, YYYYMMDD.  Default: ``reprocess_days``
+        days before the day after the last history row, or ``window_days``
+        days before ``end_date`` on the first run.
+    window_days : int
+        Rolling window for the fouling index and energy loss
+    reprocess_days : int
+        Trailing history days recomputed on each run, covering days whose
+        data was incomplete at the previous run
+
+    Returns
+    -------
+    dict
+        DAILY_COLUMNS for the plant; ``status`` is 'ok', 'up_to_date',
+        'no_baseline' or 'no_data'.  ``days_added`` counts days after the
+        previous last history row, ``days_updated`` every day written.
+    """
+    started = time.perf_counter()
+    saved = store.load(alias)
+    if not saved:
+        raise ValueError(f"Plant alias '{alias}' not found in registry.")
+    plant_uid = saved["plant_uid"]
+    entry: Dict = {col: None for col in DAILY_COLUMNS}
+    entry.update(alias=alias, plant_uid=plant_uid, days_added=0, days_updated=0, last_day=store.last_fouling_day(plant_uid))
+
+    def done(status: str) -> Dict:
+        entry.update(status=status, elapsed_s=time.perf_counter() - started)
+        return entry
+
+    record = store.clean_baseline_record(plant_uid)
+    model = parse_clean_model(record["baseline"]) if record is not None else None
+    if model is None:
+        return done("no_baseline")
+    entry["baseline_version"] = record["version"]
+
+    end = _day(end_date) if end_date else datetime.now(timezone.utc).date() - timedelta(days=1)
+    if since:
+        first = _day(since)
+    elif entry["last_day"]:
+        first = date.fromisoformat(entry["last_day"]) + timedelta(days=1 - max(reprocess_days, 0))
+    else:
+        first = end - timedelta(days=window_days - 1)
+    if first > end:
+        return done("up_to_date")
+
+    # One extra day in front so the first interval's energy delta is known
+    try:
+        df = fouling_frame(store, alias, (first - timedelta(days=1)).strftime("%Y%m%d"), end.strftime("%Y%m%d"))
+    except ValueError:
+        return done("no_data")
+    cfg = FoulingConfig(dc_size_kw=saved["dc_size_kw"] or FoulingConfig.dc_size_kw)
+    estimate_clean_baseline_poa_matched(df, cfg, copy=False, baseline=model.baseline)
+    new_days = [d for d in daily_fouling_stats(df, cfg) if first.isoformat() <= d.day <= end.isoformat()]
+    if not new_days:
+        return done("no_data")
+
+    previous = [
+        FoulingDay(row["day"], np.frombuffer(row["ratios"], dtype="float64"), row["loss_kwh"], row["points"])
+        for row in store.load_fouling_history(
+            plant_uid,
+            (first - timedelta(days=window_days - 1)).isoformat(),
+            (first - timedelta(days=1)).isoformat(),
+        )
+    ]
+    rolled = roll_fouling_days(previous, new_days, window_days)
+    store.save_fouling_days(
+        plant_uid,
+        [
+            {
+                "day": day.day,
+                "baseline_version": record["version"],
+                "points": day.points,
+                "loss_kwh": day.loss_kwh,
+                "ratios": np.ascontiguousarray(day.ratios, dtype="float64").tobytes(),
+                "fouling_index": state["fouling_index"],
+                "energy_loss_kwh_per_day": state["energy_loss_kwh_per_day"],
+            }
+            for day, state in zip(new_days, rolled)
+        ],
+    )
+    latest = rolled[-1]
+    entry.update(
+        days_added=sum(1 for d in new_days if entry["last_day"] is None or d.day > entry["last_day"]),
+        days_updated=len(new_days),
+        last_day=latest["day"],
+        fouling_index=latest["fouling_index"],
+        fouling_level=latest["fouling_level"],
+        energy_loss_kwh_per_day=latest["energy_loss_kwh_per_day"],
+    )
+    return done("ok")
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plants", help="Comma-separated plant aliases (default: every plant in the registry).")
+    parser.add_argument("--end", help="Last day to process, YYYYMMDD (default: yesterday, UTC).")
+    parser.add_argument("--since", help="Reprocess from this day, YYYYMMDD (default: the last --reprocess-days updated days).")
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS, help="Rolling window in days.")
+    parser.add_argument(
+        "--reprocess-days",
+        type=int,
+        default=DEFAULT_REPROCESS_DAYS,
+        help="Most recent history days recomputed on each run (late or partial data).",
+    )
+    parser.add_argument("--output", help="Optional CSV or .parquet path for the per-plant summary.")
+    parser.add_argument("--db-path", default=DEFAULT_DB, help="Path to plant registry SQLite file.")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> None:
+    args = parse_args(argv)
+    with PlantStore(args.db_path) as store:
+        if args.plants:
+            aliases = [part.strip() for part in args.plants.split(",") if part.strip()]
+        else:
+            aliases = [p["alias"] for p in store.list_all()]
+        if not aliases:
+            raise SystemExit("No plants to update.")
+        entries = []
+        for i, alias in enumerate(aliases, 1):
+            started = time.perf_counter()
+            try:
+                entry = update_plant_fouling(
+                    store,
+                    alias,
+                    end_date=_sanitize_date(args.end) if args.end else None,
+                    since=_sanitize_date(args.since) if args.since else None,
+                    window_days=args.window_days,
+                    reprocess_days=args.reprocess_days,
+                )
+            except Exception as exc:
+                # One bad alias or baseline must not stop the other plants
+                entry = {col: None for col in DAILY_COLUMNS}
+                entry.update(
+                    alias=alias,
+                    status="error",
+                    days_added=0,
+                    days_updated=0,
+                    elapsed_s=time.perf_counter() - started,
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+            detail = entry["fouling_level"] if entry["status"] == "ok" else entry["status"]
+            if entry["status"] == "error":
+                detail = f"ERROR ({entry['error']})"
+            print(f"  [{i}/{len(aliases)}] {alias}: {detail}, +{entry['days_added']} day(s), {entry['elapsed_s']:.2f}s")
+            entries.append(entry)
+    table = pd.DataFrame(entries, columns=DAILY_COLUMNS)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(table.drop(columns=["error"]).to_string(index=False))
+    if args.output:
+        print(f"Daily fouling summary written to {write_table(table, args.output)}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -20,22 +20,25 @@ from typing import List, Sequence
 import tkinter as tk
 from tkinter import filedialog
 
+import numpy as np
 import pandas as pd
-import requests
 
 from fetch_inverter_data import (
     BASE_URL,
     Config as FetchConfig,
     NEWFOLD_INVERTER_IDS,
     NEWFOLD_WEATHER_ID,
+    JuggleClient,
     get_plant_devices,
-    fetch_all_readings,
-    write_combined_csv,
+    CombinedCsvAppender,
+    iter_fetch_segments,
+    plan_segments,
 )
 from Fouling_analysis import (
     FoulingConfig,
     auto_select_clean_period,
     filter_by_date_range,
+    fouling_input_columns,
     run_fouling_analysis,
 )
 from Shading_analysis import (
@@ -47,10 +50,14 @@ from Shading_analysis import (
     summarise_shading,
 )
 from plant_store import DEFAULT_DB, PlantStore
+from table_io import read_table, table_columns, write_table
 
 
 logger = logging.getLogger("inverter_pipeline")
 
+# Threads used by `fetch`; overall request rate is capped by the shared limiter.
+DEFAULT_FETCH_WORKERS = 4
+
 
 def _setup_logging(verbose: bool) -> None:
     level = logging.DEBUG if verbose else logging.INFO
@@ -92,8 +99,59 @@ def _date_range_to_ts(start_date: str, end_date: str) -> tuple[str, str]:
     return f"{start_formatted}T00:00:00", f"{end_formatted}T23:59:59"
 
 
+# Cumulative energy counters need float64 precision; other metrics fit in float32.
+FLOAT64_METRICS = {"importEnergy", "exportEnergy"}
+
+
+def _frame_from_payload_batches(batches) -> pd.DataFrame:
+    """Decode (emig_id, ts, payload) batches and build a DataFrame column by column.
+
+    Nested values (e.g. {"value": 123, "unit": "W"}) are flattened to the value.
+    Each field is collected as (row positions, values) so no per-row dicts are
+    kept and missing fields become NaN in a single reindex per column.
+    """
+    positions: dict[str, list[int]] = {}
+    values: dict[str, list] = {}
+    emig_ids: list[str] = []
+    n = 0
+    for batch in batches:
+        decoded = [json.loads(payload) for _, _, payload in batch]
+        for (emig, _, _), reading in zip(batch, decoded):
+            for key, val in reading.items():
+                if isinstance(val, dict) and "value" in val:
+                    val = val["value"]
+                if key not in values:
+                    positions[key] = []
+                    values[key] = []
+                positions[key].append(n)
+                values[key].append(val)
+            emig_ids.append(emig)
+            n += 1
+    if n == 0:
+        return pd.DataFrame()
+
+    data: dict[str, pd.Series] = {}
+    for key, vals in values.items():
+        col = pd.Series(vals, index=positions[key])
+        if len(vals) != n:
+            col = col.reindex(range(n))
+        if col.dtype == object:
+            try:
+                col = pd.to_numeric(col)
+            except (TypeError, ValueError):
+                pass
+        data[key] = col
+    data["emigId"] = pd.Series(pd.Categorical(emig_ids))
+    return pd.DataFrame(data)
+
+
 def load_db_dataframe(store: PlantStore, plant_alias: str, start_date: str, end_date: str, emig_ids: List[str] | None = None) -> pd.DataFrame:
-    """Load readings from database and flatten nested JSON values."""
+    """Load readings from database and flatten nested JSON values.
+
+    All requested devices are read with a single range query and decoded in
+    batches.  Returns one row per reading with a column per payload field and
+    a categorical ``emigId`` column.
+    """
     saved = store.load(plant_alias)
     if not saved:
         raise SystemExit(f"Plant alias '{plant_alias}' not found in registry.")
@@ -104,52 +162,69 @@ def load_db_dataframe(store: PlantStore, plant_alias: str, start_date: str, end_
     if not ids:
         return pd.DataFrame()
     start_ts, end_ts = _date_range_to_ts(start_date, end_date)
-    rows: list[dict] = []
-    for emig in ids:
-        readings = store.load_readings(plant_uid, emig, start_ts, end_ts)
-        # Flatten nested dict values (e.g., {"value": 123, "unit": "W"} -> 123)
-        for reading in readings:
-            for key, val in reading.items():
-                if isinstance(val, dict) and "value" in val:
-                    reading[key] = val["value"]
-        rows.extend(readings)
-    return pd.DataFrame(rows)
-
-
-def query_db_day(store: PlantStore, plant_alias: str, date_yyyymmdd: str, emig_ids: List[str] | None = None) -> pd.DataFrame:
-    """Query a single day from database and flatten nested JSON values."""
+    return _frame_from_payload_batches(store.iter_readings_many(plant_uid, ids, start_ts, end_ts))
+
+
+def load_db_frame(
+    store: PlantStore,
+    plant_alias: str,
+    start_date: str,
+    end_date: str,
+    emig_ids: List[str] | None = None,
+    metrics: List[str] | None = None,
+) -> pd.DataFrame:
+    """Load typed metrics for many devices, indexed by UTC timestamp.
+
+    Reads the ``readings_typed`` table (no JSON decoding); a plant with no
+    typed rows yet is backfilled from its payloads first.  The result has a
+    datetime64 ``ts`` index, a categorical ``emigId`` column and one float
+    column per metric (float64 for energy counters, float32 otherwise).
+    When ``metrics`` is omitted, metrics with no data in the range are dropped.
+    """
     saved = store.load(plant_alias)
     if not saved:
         raise SystemExit(f"Plant alias '{plant_alias}' not found in registry.")
     plant_uid = saved["plant_uid"]
+    written = store.ensure_typed_readings(plant_uid)
+    if written:
+        logger.info(f"Backfilled {written} typed reading rows for {plant_uid} (run 'db migrate' to do this up front).")
     ids = emig_ids or store.list_emig_ids(plant_uid)
     if not ids:
         return pd.DataFrame()
-    # Convert YYYYMMDD to YYYY-MM-DD format for timestamp comparison
-    if len(date_yyyymmdd) == 8 and date_yyyymmdd.isdigit():
-        date_formatted = f"{date_yyyymmdd[:4]}-{date_yyyymmdd[4:6]}-{date_yyyymmdd[6:8]}"
-    else:
-        date_formatted = date_yyyymmdd
-    start_ts = f"{date_formatted}T00:00:00"
-    end_ts = f"{date_formatted}T23:59:59"
-    rows: list[dict] = []
-    for emig in ids:
-        readings = store.load_readings(plant_uid, emig, start_ts, end_ts)
-        # Flatten nested dict values
-        for reading in readings:
-            for key, val in reading.items():
-                if isinstance(val, dict) and "value" in val:
-                    reading[key] = val["value"]
-        rows.extend(readings)
-    return pd.DataFrame(rows)
+    start_ts, end_ts = _date_range_to_ts(start_date, end_date)
+    columns, rows = store.load_typed_readings(plant_uid, ids, start_ts, end_ts, metrics)
+    if not rows:
+        return pd.DataFrame()
+
+    cols = dict(zip(columns, zip(*rows)))
+    index = pd.DatetimeIndex(
+        pd.to_datetime(np.array(cols["ts_epoch"], dtype="float64"), unit="s", utc=True),
+        name="ts",
+    )
+    data: dict[str, object] = {"emigId": pd.Categorical(cols["emig_id"])}
+    for metric in columns[3:]:
+        dtype = "float64" if metric in FLOAT64_METRICS else "float32"
+        arr = np.array(cols[metric], dtype=dtype)
+        if metrics is None and np.isnan(arr).all():
+            continue
+        data[metric] = arr
+    return pd.DataFrame(data, index=index)
 
 
-def discover_plants(api_key: str) -> List[dict]:
+def query_db_day(store: PlantStore, plant_alias: str, date_yyyymmdd: str, emig_ids: List[str] | None = None) -> pd.DataFrame:
+    """Query a single day from database and flatten nested JSON values."""
+    return load_db_dataframe(store, plant_alias, date_yyyymmdd, date_yyyymmdd, emig_ids)
+
+
+def discover_plants(api_key: str, client: JuggleClient | None = None) -> List[dict]:
     """
     Discover plants available to the API key using the Juggle endpoint.
     Tries a few possible list endpoints; logs and returns [] on failure.
+    All probes reuse one keep-alive ``client`` (created if omitted).
     """
-    headers = {"Authorization": f"token {api_key}"}
+    if client is None:
+        with JuggleClient(api_key) as client:
+            return discover_plants(api_key, client)
     urls = [
         f"{BASE_URL}/plants",
         f"{BASE_URL}/plants/list",
@@ -160,7 +235,7 @@ def discover_plants(api_key: str) -> List[dict]:
     ]
     for url in urls:
         try:
-            resp = requests.get(url, headers=headers, timeout=30)
+            resp = client.get(url, timeout=30)
             if resp.status_code == 404:
                 logger.debug(f"Plant discovery endpoint not found: {url}")
                 continue
@@ -188,7 +263,7 @@ def discover_plants(api_key: str) -> List[dict]:
         for i in range(1, 101):
             uid = f"{prefix}:{i:05d}"
             try:
-                resp = requests.get(f"{BASE_URL}/plant/{uid}", headers=headers, timeout=10)
+                resp = client.get(f"plant/{uid}", timeout=10)
                 if resp.status_code == 404:
                     continue
                 resp.raise_for_status()
@@ -293,56 +368,94 @@ def run_fetch(args: argparse.Namespace) -> None:
         return
 
     include_weather = args.include_weather
-    all_readings = []
 
-    if include_weather:
-        if not args.force_download and store.has_fetch(plant_uid, weather_id, cfg.start_date, cfg.end_date):
-            logger.info(f"Skipping weather {weather_id}; already cached for {cfg.start_date}-{cfg.end_date}.")
+    devices = list(dict.fromkeys(([weather_id] if include_weather else []) + list(inverter_ids)))
+    to_fetch = []
+    plan = {}
+    for emig_id in devices:
+        kind = "weather" if emig_id == weather_id else "inverter"
+        if args.force_download:
+            gaps = [(cfg.start_date, cfg.end_date)]
         else:
-            try:
-                logger.info(f"Fetching weather data for {weather_id} {cfg.start_date}-{cfg.end_date}...")
-                weather = fetch_all_readings(cfg, weather_id)
-                for rec in weather:
-                    rec["emigId"] = weather_id
-                all_readings.extend(weather)
-                logger.info(f"  Retrieved {len(weather)} weather rows.")
-                store.record_fetch(plant_uid, weather_id, cfg.start_date, cfg.end_date)
-                store.store_readings(plant_uid, weather_id, weather)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning(f"Failed to fetch weather data for {weather_id}: {exc}")
-
-    for emig_id in inverter_ids:
-        if not args.force_download and store.has_fetch(plant_uid, emig_id, cfg.start_date, cfg.end_date):
-            logger.info(f"Skipping inverter {emig_id}; already cached for {cfg.start_date}-{cfg.end_date}.")
+            gaps = store.missing_ranges(plant_uid, emig_id, cfg.start_date, cfg.end_date)
+        if not gaps:
+            logger.info(f"Skipping {kind} {emig_id}; already cached for {cfg.start_date}-{cfg.end_date}.")
             continue
-        logger.info(f"Fetching inverter {emig_id} {cfg.start_date}-{cfg.end_date}...")
-        try:
-            rows = fetch_all_readings(cfg, emig_id)
+        plan[emig_id] = plan_segments(gaps, cfg.min_interval_s)
+        if gaps != [(cfg.start_date, cfg.end_date)]:
+            logger.info(f"  {kind} {emig_id}: fetching missing ranges {', '.join(f'{a}-{b}' for a, b in gaps)}")
+        to_fetch.append(emig_id)
+
+    workers = getattr(args, "workers", None) or DEFAULT_FETCH_WORKERS
+    if to_fetch:
+        logger.info(
+            f"Fetching {len(to_fetch)} devices {cfg.start_date}-{cfg.end_date} with {workers} workers..."
+        )
+
+    # Each segment is stored (and appended to the CSV) as soon as it arrives,
+    # so memory stays flat regardless of the date range.
+    output_file = args.output or f"newfold_data_{cfg.start_date}_{cfg.end_date}.csv"
+    csv_out = None if getattr(args, "no_csv", False) else CombinedCsvAppender(output_file)
+    row_counts = {emig_id: 0 for emig_id in to_fetch}
+    with JuggleClient(api_key, pool_maxsize=workers) as client:
+        for emig_id, (seg_start, seg_end), rows, exc in iter_fetch_segments(
+            cfg, to_fetch, max_workers=workers, client=client, plan=plan
+        ):
+            if exc is not None:
+                logger.warning(f"  Failed to fetch {emig_id} {seg_start}-{seg_end}: {exc}")
+                continue
             for rec in rows:
                 rec["emigId"] = emig_id
-            all_readings.extend(rows)
-            logger.info(f"  Retrieved {len(rows)} rows.")
-            store.record_fetch(plant_uid, emig_id, cfg.start_date, cfg.end_date)
             store.store_readings(plant_uid, emig_id, rows)
-        except requests.HTTPError as exc:
-            logger.warning(f"  Failed to fetch {emig_id}: {exc}")
-
-    if not all_readings:
+            store.record_fetch(plant_uid, emig_id, seg_start, seg_end)
+            row_counts[emig_id] += len(rows)
+            logger.debug(f"  Stored {len(rows)} rows for {emig_id} {seg_start}-{seg_end}.")
+            if csv_out is not None:
+                try:
+                    csv_out.append(rows)
+                except PermissionError as exc:
+                    logger.error(f"Could not write to {csv_out.output_file}: {exc}")
+                    csv_out.close()
+                    if csv_out.output_file != output_file:
+                        csv_out = None
+                        continue
+                    csv_out = CombinedCsvAppender(output_file + ".alt.csv")
+                    try:
+                        csv_out.append(rows)
+                        logger.info(f"Writing data to alternate file: {csv_out.output_file}")
+                    except Exception as exc2:
+                        logger.error(f"Alternate write also failed: {exc2}")
+                        csv_out = None
+
+    if csv_out is not None:
+        csv_out.close()
+        if csv_out.rows_written:
+            logger.info(f"Saved {csv_out.rows_written} combined readings to {csv_out.output_file}")
+        if csv_out.extra_fields:
+            logger.info(f"Fields outside the known schema were added as columns: {', '.join(csv_out.extra_fields)}")
+
+    # Columnar copy of the whole range (cached + newly fetched), read back
+    # from the database in device/time order so row groups prune by emigId.
+    parquet_out = getattr(args, "parquet", None)
+    if parquet_out:
+        start_ts, end_ts = _date_range_to_ts(cfg.start_date, cfg.end_date)
+        df = _frame_from_payload_batches(store.iter_readings_many(plant_uid, devices, start_ts, end_ts))
+        if df.empty:
+            logger.warning(f"No readings in the database for {cfg.start_date}-{cfg.end_date}; {parquet_out} not written.")
+        else:
+            try:
+                write_table(df, parquet_out)
+                logger.info(f"Saved {len(df)} readings to {parquet_out}")
+            except (ImportError, OSError, TypeError, ValueError) as exc:
+                # pyarrow's ArrowTypeError (a TypeError) e.g. for a field with mixed str/float values
+                logger.error(f"Could not write {parquet_out}: {exc}")
+
+    for emig_id, count in row_counts.items():
+        logger.info(f"  Retrieved {count} rows for {emig_id}.")
+    if not any(row_counts.values()):
         logger.warning("No data fetched; nothing to write.")
         return
 
-    output_file = args.output or f"newfold_data_{cfg.start_date}_{cfg.end_date}.csv"
-    try:
-        write_combined_csv(all_readings, output_file)
-    except PermissionError as exc:
-        logger.error(f"Could not write to {output_file}: {exc}")
-        alt_path = output_file + ".alt.csv"
-        try:
-            write_combined_csv(all_readings, alt_path)
-            logger.info(f"Wrote data to alternate file: {alt_path}")
-        except Exception as exc2:
-            logger.error(f"Alternate write also failed: {exc2}")
-
     if args.save_plant:
         store.save(args.save_plant, plant_uid, inverter_ids, weather_id, None)
         logger.info(f"Saved plant '{args.save_plant}' to registry {args.db_path}")
@@ -352,18 +465,25 @@ def run_fetch(args: argparse.Namespace) -> None:
 # Fouling workflow
 # -----------------------------------------------------------------------------
 
-def run_fouling(args: argparse.Namespace) -> None:
-    if hasattr(args, "full_df") and hasattr(args, "clean_df"):
-        full_df = args.full_df
-        clean_df = args.clean_df
-    else:
-        full_df = pd.read_csv(args.full_data)
-        clean_df = pd.read_csv(args.clean_data)
+def _read_fouling_table(path: str, cfg: FoulingConfig, keep_all: bool = False) -> pd.DataFrame:
+    """Read a fouling input file, loading only the columns the analysis maps unless ``keep_all``."""
+    if keep_all:
+        return read_table(path)
+    return read_table(path, fouling_input_columns(table_columns(path), cfg))
 
+
+def run_fouling(args: argparse.Namespace) -> None:
     cfg = FoulingConfig(
         dc_size_kw=args.dc_size_kw,
         column_map=None,
     )
+    if hasattr(args, "full_df") and hasattr(args, "clean_df"):
+        full_df = args.full_df
+        clean_df = args.clean_df
+    else:
+        # The enriched output carries every input column, so read them all then
+        full_df = _read_fouling_table(args.full_data, cfg, keep_all=bool(args.enriched_out))
+        clean_df = _read_fouling_table(args.clean_data, cfg)
 
     results = run_fouling_analysis(full_df, clean_df=clean_df, cfg=cfg)
 
@@ -379,10 +499,17 @@ def run_fouling(args: argparse.Namespace) -> None:
 
 
 def run_fouling_auto(args: argparse.Namespace) -> None:
+    cfg = FoulingConfig(
+        timestamp=args.timestamp_col,
+        ac_power=args.ac_col,
+        poa=args.poa_col,
+        dc_size_kw=args.dc_size_kw,
+        column_map=None,
+    )
     if hasattr(args, "data_df"):
         df = args.data_df
     else:
-        df = pd.read_csv(args.data)
+        df = _read_fouling_table(args.data, cfg, keep_all=bool(args.enriched_out))
     
     # Preprocess: extract numeric values from dict columns (handles DB JSON payloads)
     def extract_value(val):
@@ -400,14 +527,6 @@ def run_fouling_auto(args: argparse.Namespace) -> None:
             except:
                 pass
 
-    cfg = FoulingConfig(
-        timestamp=args.timestamp_col,
-        ac_power=args.ac_col,
-        poa=args.poa_col,
-        dc_size_kw=args.dc_size_kw,
-        column_map=None,
-    )
-
     analysis_start = pd.to_datetime(args.analysis_start) if args.analysis_start else None
     analysis_end = pd.to_datetime(args.analysis_end) if args.analysis_end else None
     df = filter_by_date_range(df, cfg, analysis_start, analysis_end)
@@ -629,6 +748,29 @@ def run_plants(args: argparse.Namespace) -> None:
         return
 
 
+# -----------------------------------------------------------------------------
+# Database maintenance
+# -----------------------------------------------------------------------------
+
+def run_db(args: argparse.Namespace) -> None:
+    store = PlantStore(args.db_path)
+
+    if args.action == "migrate":
+        plant_uid = None
+        if args.plant_alias:
+            saved = store.load(args.plant_alias)
+            if not saved:
+                raise SystemExit(f"Plant alias '{args.plant_alias}' not found in registry.")
+            plant_uid = saved["plant_uid"]
+        if store.pending_migration:
+            logger.info(f"Adding epoch timestamps to {len(store.pending_migration)} readings table(s)...")
+            logger.info(f"Upgraded {store.migrate_schema()} readings table(s).")
+        logger.info(f"Backfilling typed readings table{f' for {plant_uid}' if plant_uid else ''}...")
+        written = store.backfill_typed_readings(plant_uid)
+        logger.info(f"Wrote {written} typed reading rows.")
+        return
+
+
 # -----------------------------------------------------------------------------
 # Interactive menu helpers
 # -----------------------------------------------------------------------------
@@ -994,8 +1136,8 @@ def interactive_fouling() -> None:
         end_date = _sanitize_date(_ask("Full dataset end YYYYMMDD"))
         clean_start = _sanitize_date(_ask("Clean dataset start YYYYMMDD"))
         clean_end = _sanitize_date(_ask("Clean dataset end YYYYMMDD"))
-        df_full = load_db_dataframe(store, plant_alias, start_date, end_date)
-        df_clean = load_db_dataframe(store, plant_alias, clean_start, clean_end)
+        df_full = load_db_frame(store, plant_alias, start_date, end_date).reset_index()
+        df_clean = load_db_frame(store, plant_alias, clean_start, clean_end).reset_index()
         if df_full.empty or df_clean.empty:
             print("No data found for given date ranges in database. Please fetch data first or adjust dates.")
             return
@@ -1028,8 +1170,8 @@ def interactive_fouling() -> None:
     if not full or not clean:
         print("Missing file selection; cancelled.")
         return
-    df_full = pd.read_csv(full)
-    df_clean = pd.read_csv(clean)
+    df_full = read_table(full)
+    df_clean = read_table(clean)
     enriched = _ask("Enriched output CSV (optional)", "")
     args = argparse.Namespace(
         full_df=df_full,
@@ -1085,7 +1227,7 @@ def interactive_fouling_auto() -> None:
         start_date = _sanitize_date(_ask("Operational data start date (YYYYMMDD)"))
         end_date = _sanitize_date(_ask("Operational data end date (YYYYMMDD)"))
         print(f"\nLoading data from {start_date} to {end_date}...")
-        data_df = load_db_dataframe(store, plant_alias, start_date, end_date)
+        data_df = load_db_frame(store, plant_alias, start_date, end_date).reset_index()
         if data_df.empty:
             print("❌ No data found for given date range in database.")
             print("   Please fetch data first using option 1 (Fetch data) or adjust dates.")
@@ -1222,8 +1364,8 @@ def interactive_shading() -> None:
         if not winter_start:
             winter_start = _sanitize_date(_ask("Winter start YYYYMMDD"))
             winter_end = _sanitize_date(_ask("Winter end YYYYMMDD"))
-        df_summer = load_db_dataframe(store, plant_alias, summer_start, summer_end)
-        df_winter = load_db_dataframe(store, plant_alias, winter_start, winter_end)
+        df_summer = load_db_frame(store, plant_alias, summer_start, summer_end).reset_index()
+        df_winter = load_db_frame(store, plant_alias, winter_start, winter_end).reset_index()
         if df_summer.empty or df_winter.empty:
             print("No data found for given date ranges in database. Please fetch data first or adjust dates.")
             return
@@ -1408,6 +1550,14 @@ def build_parser() -> argparse.ArgumentParser:
     p_fetch.add_argument("--no-weather", dest="include_weather", action="store_false", help="Skip weather data.")
     p_fetch.add_argument("--force-download", action="store_true", help="Ignore cache and re-download data.")
     p_fetch.add_argument("--output", help="Output CSV path for combined data.")
+    p_fetch.add_argument("--no-csv", action="store_true", help="Only store readings in the database; skip the combined CSV.")
+    p_fetch.add_argument("--parquet", help="Also export the plant's readings for the date range to this .parquet file.")
+    p_fetch.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_FETCH_WORKERS,
+        help=f"Concurrent fetch threads (default {DEFAULT_FETCH_WORKERS}); request rate stays within the API throttle.",
+    )
     p_fetch.set_defaults(func=run_fetch)
 
     # fouling
@@ -1475,6 +1625,13 @@ def build_parser() -> argparse.ArgumentParser:
     p_query.add_argument("--db-path", default=DEFAULT_DB, help="Path to plant registry SQLite file.")
     p_query.set_defaults(func=run_query)
 
+    # database maintenance
+    p_db = sub.add_parser("db", help="Database maintenance (schema migrations/backfills).")
+    p_db.add_argument("action", choices=["migrate"], help="Maintenance action.")
+    p_db.add_argument("--plant-alias", help="Limit the action to one plant (default: all plants).")
+    p_db.add_argument("--db-path", default=DEFAULT_DB, help="Path to plant registry SQLite file.")
+    p_db.set_defaults(func=run_db)
+
     return parser
 
 
@@ -23,6 +23,29 @@ PLANT_FILE_MAPPING = {
     'Sofina Foods': ('Sofina_Haverhill', 1015.48),
 }
 
+# Exact SolarGIS CSV file names that take precedence over PLANT_FILE_MAPPING
+# during POA import (one CSV per site per month)
+SOLARGIS_CSV_OVERRIDES = {
+    'Man City FC Training Ground': 'City_Football_Group_Phase_1.csv',
+    'Finlay Beverages': 'Finlay_Beverages.csv',
+    'Blachford UK': 'Blachford.csv',
+    'Cromwell Tools': 'Cromwell_Tools.csv',
+    'Metrocentre': 'Metro_Centre.csv',
+    'Merry Hill Shopping Centre': 'Merry_Hill_Shopping_Centre.csv',
+    'Hibernian Stadium': 'Hibernian_Stadium.csv',
+    'Hibernian Training Ground': 'Hibernian_Training_Ground.csv',
+    'Parfetts Birmingham': 'Parfetts.csv',
+    "Sheldons Motor Books": "Sheldons_Bakery.csv",
+    "Smithy's Mushrooms": "Smithys_Mushrooms.csv",
+    "Smithy's Mushrooms PH2": "Smithy's_Mushrooms_Phase_2.csv",
+}
+
+def csv_names_for_plant(plant_alias):
+    """Exact CSV file names to try for a plant before fuzzy matching"""
+    if plant_alias in SOLARGIS_CSV_OVERRIDES:
+        return [SOLARGIS_CSV_OVERRIDES[plant_alias]]
+    return []
+
 def get_csv_pattern_for_plant(plant_alias):
     """Get the exact CSV filename pattern for a plant"""
     if plant_alias in PLANT_FILE_MAPPING:
@@ -6,25 +6,427 @@ Stores:
   - plant_uid
   - inverter_ids (JSON array of EMIG IDs)
   - weather_id (optional)
+
+Readings are kept twice: the raw JSON payload in ``readings`` and a typed
+copy in ``readings_typed`` with one REAL column per known metric (see
+``METRIC_COLUMNS``), so analyses can aggregate with plain SQL instead of
+``json_extract``.  Both carry the timestamp as integer epoch seconds (UTC)
+next to the original ISO text, plus generated ``ts_year``/``ts_month``
+columns; range, span and season queries seek on indexes over those.
+``readings_rollup`` keeps hourly/daily/monthly aggregates per device and
+metric, refreshed in the same transaction as every write.
+
+Both tables can optionally be partitioned by month or by plant and month
+(see ``READINGS_LAYOUTS``) and PlantStore routes reads and writes to the
+shard tables.  ``readings``/``readings_typed`` are views over all shards
+(for raw-SQL reports); in the plant_month layout each plant also gets its
+own pair of views (``readings_<key>``/``readings_typed_<key>``, see
+``plant_shard_key``).  A fleet quickly outgrows SQLite's limit on UNION ALL
+terms, so the all-shard views nest their selects (``_union_sql``).
 """
 
+import hashlib
 import json
+import logging
 import os
+import re
 import sqlite3
-from typing import Dict, List, Optional, Sequence
+import threading
+from operator import itemgetter
+from itertools import repeat
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 
 DEFAULT_DB = os.path.join(os.path.dirname(__file__), "plant_registry.sqlite")
 
+logger = logging.getLogger("plant_store")
+
+# Reading fields that get their own REAL column in ``readings_typed``.
+# Column names match the Juggle API field names.  Append new fields at the
+# end; existing databases pick them up via ALTER TABLE in _ensure_schema.
+METRIC_COLUMNS: Tuple[str, ...] = (
+    "apparentPower",
+    "activePower",
+    "importActivePower",
+    "reactivePower",
+    "poaIrradiance",
+    "exportEnergy",
+    "importEnergy",
+    "dcCurrent",
+    "dcVoltage",
+    "currentL1",
+    "currentL2",
+    "currentL3",
+    "voltageL1L2",
+    "voltageL1L3",
+    "voltageL2L3",
+    "voltageL1N",
+    "voltageL2N",
+    "voltageL3N",
+    "mainsFrequency",
+    "powerFactor",
+    "deviceTemperature",
+    "exportLimit",
+)
+
+READINGS_COLUMNS: Tuple[str, ...] = ("plant_uid", "emig_id", "ts", "ts_epoch", "payload")
+TYPED_COLUMNS: Tuple[str, ...] = ("plant_uid", "emig_id", "ts", "ts_epoch", *METRIC_COLUMNS)
+
+# Virtual columns derived from ts_epoch on both readings tables (UTC calendar).
+TS_PART_COLUMNS: Dict[str, str] = {
+    "ts_year": "CAST(strftime('%Y', ts_epoch, 'unixepoch') AS INTEGER)",
+    "ts_month": "CAST(strftime('%m', ts_epoch, 'unixepoch') AS INTEGER)",
+}
+
+# Storage layouts for the readings tables, fixed when a database is created:
+#   single      - one ``readings`` / ``readings_typed`` table pair
+#   month       - one pair per calendar month (``readings_202508``, ...)
+#   plant_month - one pair per plant and month
+READINGS_LAYOUTS: Tuple[str, ...] = ("single", "month", "plant_month")
+
+# Aggregation periods kept in ``readings_rollup``.  Energy/insolation
+# integrates each reading over the gap to the device's previous reading; the
+# first reading and readings after a gap longer than ROLLUP_MAX_GAP_S count
+# as one ROLLUP_DEFAULT_INTERVAL_S interval.
+ROLLUP_PERIODS: Tuple[str, ...] = ("hour", "day", "month")
+ROLLUP_COLUMNS: Tuple[str, ...] = ("n", "total", "min_value", "max_value", "energy")
+ROLLUP_DEFAULT_INTERVAL_S = 1800
+ROLLUP_MAX_GAP_S = 3600
+
+_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def ts_to_epoch(ts: Any) -> Optional[int]:
+    """Convert an ISO timestamp to integer epoch seconds (naive values are UTC)."""
+    if ts is None:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(ts))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _require_epochs(timestamps: Sequence[Any]) -> List[int]:
+    """Epochs of ISO timestamps; ValueError if any cannot be parsed (they would be unqueryable)."""
+    epochs = [ts_to_epoch(ts) for ts in timestamps]
+    bad = [ts for ts, epoch in zip(timestamps, epochs) if epoch is None]
+    if bad:
+        raise ValueError(f"{len(bad)} reading(s) have unparseable timestamps, e.g. {bad[0]!r}")
+    return epochs
+
+
+def _number(val: Any) -> Optional[float]:
+    """Float of a numeric scalar or numeric string (as CAST(... AS REAL) reads it); None otherwise."""
+    if isinstance(val, bool):
+        return None
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        try:
+            return float(val)
+        except ValueError:
+            return None
+    return None
+
+
+def metric_value(val: Any) -> Optional[float]:
+    """Return the numeric value of a reading field ({"value": x, "unit": u} or scalar)."""
+    if isinstance(val, dict):
+        val = val.get("value")
+    return _number(val)
+
+
+def ts_month(ts: Any) -> str:
+    """Month key (YYYY-MM) of an ISO timestamp, used to route readings to shards."""
+    month = str(ts)[:7]
+    if not _MONTH_RE.match(month):
+        raise ValueError(f"Cannot derive a month from timestamp: {ts!r}")
+    return month
+
+
+def _epoch_bounds(start_ts: Any, end_ts: Any) -> Tuple[int, int]:
+    """Inclusive epoch range for ISO start/end timestamps (naive values are UTC)."""
+    start, end = ts_to_epoch(start_ts), ts_to_epoch(end_ts)
+    if start is None or end is None:
+        raise ValueError(f"Invalid timestamp range: {start_ts!r} to {end_ts!r}")
+    return start, end
+
+
+def _shard_month(ts: Any, shift_days: int) -> str:
+    """Shard month for a range bound, widened by a day for UTC offsets in the stored ts text."""
+    epoch = ts_to_epoch(ts)
+    if epoch is None:
+        return str(ts)[:7]
+    return datetime.fromtimestamp(epoch + shift_days * 86400, timezone.utc).strftime("%Y-%m")
+
+
+def _epoch_iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _month_start(epoch: int) -> int:
+    """Epoch of the first second of the UTC month containing ``epoch``."""
+    dt = datetime.fromtimestamp(epoch, timezone.utc)
+    return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def _day(date_str: str) -> datetime:
+    return datetime.strptime(date_str, "%Y%m%d")
+
+
+def merge_date_ranges(ranges: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Merge inclusive YYYYMMDD ranges, joining overlapping and adjacent days."""
+    merged: List[Tuple[datetime, datetime]] = []
+    for start, end in sorted((_day(a), _day(b)) for a, b in ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return [(a.strftime("%Y%m%d"), b.strftime("%Y%m%d")) for a, b in merged]
+
+
+def missing_date_ranges(
+    covered: Sequence[Tuple[str, str]], start_date: str, end_date: str
+) -> List[Tuple[str, str]]:
+    """Return the inclusive YYYYMMDD sub-ranges of start..end not in ``covered``."""
+    gaps: List[Tuple[str, str]] = []
+    cursor = _day(start_date)
+    stop = _day(end_date)
+    for a, b in merge_date_ranges(covered):
+        a_dt, b_dt = _day(a), _day(b)
+        if b_dt < cursor:
+            continue
+        if a_dt > stop:
+            break
+        if a_dt > cursor:
+            gaps.append((cursor, a_dt - timedelta(days=1)))
+        cursor = max(cursor, b_dt + timedelta(days=1))
+    if cursor <= stop:
+        gaps.append((cursor, stop))
+    return [(a.strftime("%Y%m%d"), b.strftime("%Y%m%d")) for a, b in gaps]
+
+
+def _typed_row(plant_uid: str, emig_id: str, reading: Dict, epoch: int) -> Tuple:
+    return (
+        plant_uid,
+        emig_id,
+        reading.get("ts"),
+        epoch,
+        *(metric_value(reading.get(col)) for col in METRIC_COLUMNS),
+    )
+
+
+def _ts_part_def(col: str) -> str:
+    return f"{col} INTEGER GENERATED ALWAYS AS ({TS_PART_COLUMNS[col]}) VIRTUAL"
+
+
+def _readings_ddl(table: str) -> str:
+    part_defs = ",\n".join(f"            {_ts_part_def(col)}" for col in TS_PART_COLUMNS)
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            plant_uid TEXT NOT NULL,
+            emig_id TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            ts_epoch INTEGER,
+            payload BLOB NOT NULL,
+{part_defs},
+            PRIMARY KEY (plant_uid, emig_id, ts)
+        )
+    """
+
+
+def _typed_ddl(table: str) -> str:
+    metric_defs = ",\n".join(f"            {col} REAL" for col in METRIC_COLUMNS)
+    part_defs = ",\n".join(f"            {_ts_part_def(col)}" for col in TS_PART_COLUMNS)
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            plant_uid TEXT NOT NULL,
+            emig_id TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            ts_epoch INTEGER,
+{metric_defs},
+{part_defs},
+            PRIMARY KEY (plant_uid, emig_id, ts)
+        )
+    """
+
+
+def _readings_index_ddl(readings: str, typed: str) -> List[str]:
+    """Indexes for a readings/readings_typed table pair.
+
+    (plant_uid, emig_id, ts_epoch) serves per-device range reads,
+    (plant_uid, ts_epoch) plant-wide spans and (plant_uid, ts_month,
+    ts_year, ts_epoch) covers season lookups.
+    """
+    return [
+        f"CREATE INDEX IF NOT EXISTS idx_{readings}_epoch ON {readings} (plant_uid, emig_id, ts_epoch)",
+        f"CREATE INDEX IF NOT EXISTS idx_{readings}_plant_epoch ON {readings} (plant_uid, ts_epoch)",
+        f"CREATE INDEX IF NOT EXISTS idx_{readings}_season ON {readings} (plant_uid, ts_month, ts_year, ts_epoch)",
+        f"CREATE INDEX IF NOT EXISTS idx_{typed}_epoch ON {typed} (plant_uid, emig_id, ts_epoch)",
+    ]
+
+
+def _add_metric_columns(conn: sqlite3.Connection, typed: str) -> bool:
+    """Add METRIC_COLUMNS appended after a typed table was created (metadata-only); True if any were added."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({typed})")}
+    added = False
+    for col in METRIC_COLUMNS:
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {typed} ADD COLUMN {col} REAL")
+            added = True
+    return added
+
+
+def _needs_epoch_upgrade(conn: sqlite3.Connection, readings: str, typed: str) -> bool:
+    """True if a readings table pair predates the epoch / ts_year / ts_month columns."""
+    for table in (readings, typed):
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        if not {"ts_epoch", *TS_PART_COLUMNS} <= existing:
+            return True
+    return False
+
+
+def _add_epoch_columns(conn: sqlite3.Connection, readings: str, typed: str) -> None:
+    """Add and fill the epoch columns of an older readings table pair (rewrites every row)."""
+    for table in (readings, typed):
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        if "ts_epoch" not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN ts_epoch INTEGER")
+            conn.execute(f"UPDATE {table} SET ts_epoch = iso_epoch(ts)")
+        for col in TS_PART_COLUMNS:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {_ts_part_def(col)}")
+
+
+def _shard_table(table: str, suffix: str) -> str:
+    return f"{table}_{suffix}" if suffix else table
+
+
+def plant_shard_key(plant_uid: str) -> str:
+    """Table-name-safe key of a plant, used for plant_month shards and per-plant views."""
+    return hashlib.sha1(plant_uid.encode("utf-8")).hexdigest()[:12]
+
+
+def _union_sql(table: str, columns: str, suffixes: Sequence[str]) -> str:
+    """UNION ALL over the shard tables of ``table``, nested to stay below MAX_UNION_TERMS."""
+    selects = [f"SELECT {columns} FROM {table}_{suffix}" for suffix in suffixes]
+    while len(selects) > MAX_UNION_TERMS:
+        selects = [
+            f"SELECT {columns} FROM (" + " UNION ALL ".join(selects[i : i + MAX_UNION_TERMS]) + ")"
+            for i in range(0, len(selects), MAX_UNION_TERMS)
+        ]
+    return " UNION ALL ".join(selects)
+
+
+def _json_number_sql(path: str) -> str:
+    return (
+        f"CASE json_type(payload, '{path}') "
+        f"WHEN 'integer' THEN json_extract(payload, '{path}') "
+        f"WHEN 'real' THEN json_extract(payload, '{path}') "
+        f"WHEN 'text' THEN metric_number(json_extract(payload, '{path}')) END"
+    )
+
+
+def _json_metric_sql(col: str) -> str:
+    """SQL expression extracting a numeric metric from a JSON payload (same rules as metric_value)."""
+    return (
+        f"CASE json_type(payload, '$.{col}') "
+        f"WHEN 'object' THEN {_json_number_sql(f'$.{col}.value')} "
+        f"ELSE {_json_number_sql(f'$.{col}')} END"
+    )
+
+
+# Applied to every connection.  WAL lets readers (e.g. the Streamlit UI) run
+# alongside a writer (a background fetch) without "database is locked" errors.
+CONNECTION_PRAGMAS: Tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped I/O
+)
+BUSY_TIMEOUT_S = 30.0
+
+# Generated columns (3.31) and MATERIALIZED CTEs (3.35) in the readings schema
+MIN_SQLITE_VERSION: Tuple[int, int, int] = (3, 35, 0)
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit.
+MAX_IN_PARAMS = 500
+
+# UNION ALL terms per compound SELECT over shards; SQLite rejects more than
+# 500 (SQLITE_MAX_COMPOUND_SELECT), so longer shard lists are nested.
+MAX_UNION_TERMS = 400
+
 
 class PlantStore:
-    def __init__(self, db_path: str = DEFAULT_DB) -> None:
+    """
+    Registry and readings store backed by one SQLite file.
+
+    Connections are long-lived and kept per thread (SQLite connections must
+    not be shared between threads), so repeated calls reuse the same handle.
+    Call ``close()`` or use the store as a context manager to release them.
+
+    ``layout`` picks the readings storage layout (one of READINGS_LAYOUTS)
+    for a new database; it is recorded in the file, so existing databases
+    keep theirs and passing a different one raises ValueError.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB, layout: Optional[str] = None) -> None:
+        if layout is not None and layout not in READINGS_LAYOUTS:
+            raise ValueError(f"Unknown readings layout: {layout}")
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"PlantStore needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer; "
+                f"this Python is linked against SQLite {sqlite3.sqlite_version}"
+            )
         self.db_path = db_path
-        self._ensure_schema()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._ensure_schema(layout)
 
-    def _ensure_schema(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        try:
+    def __enter__(self) -> "PlantStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening and tuning it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            # Python parsing rules for timestamps and metric values, so SQL
+            # backfills type rows exactly like the write methods
+            conn.create_function("iso_epoch", 1, ts_to_epoch, deterministic=True)
+            conn.create_function("metric_number", 1, _number, deterministic=True)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection opened by this store (reopened lazily on next use)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def _ensure_schema(self, layout: Optional[str] = None) -> None:
+        conn = self._connection()
+        with conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS plants (
@@ -55,23 +457,166 @@ class PlantStore:
             )
             conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS readings (
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+                """
+            )
+            self.layout = self._resolve_layout(conn, layout)
+            if self.layout == "single":
+                conn.execute(_readings_ddl("readings"))
+                conn.execute(_typed_ddl("readings_typed"))
+                suffixes = [""]
+            else:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS reading_shards (
+                        suffix TEXT PRIMARY KEY,
+                        plant_uid TEXT,
+                        month TEXT NOT NULL
+                    )
+                    """
+                )
+                suffixes = self._shard_suffixes(conn=conn)
+            # Backward compatibility: new metric columns are added here; epoch
+            # columns missing from older tables rewrite every row, so they
+            # wait for an explicit migrate_schema() ('db migrate')
+            altered = False
+            self.pending_migration = []
+            for suffix in suffixes:
+                readings, typed = _shard_table("readings", suffix), _shard_table("readings_typed", suffix)
+                altered = _add_metric_columns(conn, typed) or altered
+                if _needs_epoch_upgrade(conn, readings, typed):
+                    self.pending_migration.append(suffix)
+                    continue
+                for ddl in _readings_index_ddl(readings, typed):
+                    conn.execute(ddl)
+            if self.pending_migration:
+                logger.warning(
+                    f"{self.db_path}: {len(self.pending_migration)} readings table(s) predate epoch timestamps; "
+                    "run 'python inverter_pipeline.py db migrate' to upgrade them"
+                )
+            global_views = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'readings_typed'"
+            ).fetchone()
+            if self.layout != "single" and not self.pending_migration and (altered or not global_views):
+                self._rebuild_reading_views(conn)
+            # Per-device hourly/daily/monthly aggregates of readings_typed,
+            # refreshed by the write methods (see _refresh_rollups)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS readings_rollup (
                     plant_uid TEXT NOT NULL,
                     emig_id TEXT NOT NULL,
-                    ts TEXT NOT NULL,
-                    payload BLOB NOT NULL,
-                    PRIMARY KEY (plant_uid, emig_id, ts)
+                    period TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    metric TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    total REAL,
+                    min_value REAL,
+                    max_value REAL,
+                    energy REAL,
+                    PRIMARY KEY (plant_uid, emig_id, period, bucket, metric)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_readings_rollup_plant ON readings_rollup (plant_uid, period, bucket)"
+            )
+            # SolarGIS file index: scanned folders/files and per-plant matches
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS solargis_folders (
+                    folder TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    month TEXT
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS solargis_files (
+                    folder TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    PRIMARY KEY (folder, filename)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_solargis_files_name ON solargis_files (filename)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plant_solargis_matches (
+                    alias TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (alias, filename)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plant_solargis_state (
+                    alias TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL
+                )
+                """
+            )
+            # Versioned clean-baseline models per plant (fouling analysis)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS clean_baselines (
+                    plant_uid TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    data_hash TEXT,
+                    baseline TEXT NOT NULL,
+                    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (plant_uid, version)
+                )
+                """
+            )
+            # Daily fouling state: per-day ratios/loss plus the rolling index
+            # as of that day (see Fouling_analysis.roll_fouling_days)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fouling_history (
+                    plant_uid TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    baseline_version INTEGER,
+                    points INTEGER NOT NULL,
+                    loss_kwh REAL NOT NULL,
+                    ratios BLOB NOT NULL,
+                    fouling_index REAL,
+                    energy_loss_kwh_per_day REAL,
+                    saved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (plant_uid, day)
                 )
                 """
             )
-            conn.commit()
-        finally:
-            conn.close()
+
+    def migrate_schema(self) -> int:
+        """
+        Add and fill the epoch columns (ts_epoch, ts_year, ts_month) and their
+        indexes on readings tables created before they existed.  Rewrites
+        every row of those tables, so it only runs on request
+        ('inverter_pipeline.py db migrate').  Returns the table pairs upgraded.
+        """
+        conn = self._connection()
+        with conn:
+            for suffix in self.pending_migration:
+                readings, typed = _shard_table("readings", suffix), _shard_table("readings_typed", suffix)
+                _add_epoch_columns(conn, readings, typed)
+                for ddl in _readings_index_ddl(readings, typed):
+                    conn.execute(ddl)
+            if self.pending_migration and self.layout != "single":
+                self._rebuild_reading_views(conn)
+        upgraded, self.pending_migration = len(self.pending_migration), []
+        return upgraded
 
     def save(self, alias: str, plant_uid: str, inverter_ids: List[str], weather_id: Optional[str], dc_size_kw: Optional[float] = None) -> None:
         payload = json.dumps(inverter_ids)
-        conn = sqlite3.connect(self.db_path)
-        try:
+        conn = self._connection()
+        with conn:
             conn.execute(
                 """
                 INSERT INTO plants (alias, plant_uid, inverter_ids, weather_id, dc_size_kw)
@@ -84,100 +629,79 @@ class PlantStore:
                 """,
                 (alias, plant_uid, payload, weather_id, dc_size_kw),
             )
-            conn.commit()
-        finally:
-            conn.close()
 
     def load(self, alias: str) -> Optional[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(
-                "SELECT plant_uid, inverter_ids, weather_id, dc_size_kw FROM plants WHERE alias = ?",
-                (alias,),
-            )
-            row = cur.fetchone()
-            if not row:
-                return None
-            plant_uid, inverter_ids_json, weather_id, dc_size_kw = row
-            return {
-                "alias": alias,
-                "plant_uid": plant_uid,
-                "inverter_ids": json.loads(inverter_ids_json),
-                "weather_id": weather_id,
-                "dc_size_kw": dc_size_kw,
-            }
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute(
+            "SELECT plant_uid, inverter_ids, weather_id, dc_size_kw FROM plants WHERE alias = ?",
+            (alias,),
+        )
+        row = cur.fetchone()
+        if not row:
+            return None
+        plant_uid, inverter_ids_json, weather_id, dc_size_kw = row
+        return {
+            "alias": alias,
+            "plant_uid": plant_uid,
+            "inverter_ids": json.loads(inverter_ids_json),
+            "weather_id": weather_id,
+            "dc_size_kw": dc_size_kw,
+        }
 
     def list_all(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute("SELECT alias, plant_uid, weather_id, dc_size_kw FROM plants ORDER BY alias")
-            return [
-                {"alias": alias, "plant_uid": plant_uid, "weather_id": weather_id, "dc_size_kw": dc_size_kw}
-                for alias, plant_uid, weather_id, dc_size_kw in cur.fetchall()
-            ]
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute("SELECT alias, plant_uid, weather_id, dc_size_kw FROM plants ORDER BY alias")
+        return [
+            {"alias": alias, "plant_uid": plant_uid, "weather_id": weather_id, "dc_size_kw": dc_size_kw}
+            for alias, plant_uid, weather_id, dc_size_kw in cur.fetchall()
+        ]
 
     def first(self) -> Optional[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute("SELECT alias, plant_uid, inverter_ids, weather_id, dc_size_kw FROM plants ORDER BY alias LIMIT 1")
-            row = cur.fetchone()
-            if not row:
-                return None
-            alias, plant_uid, inverter_ids_json, weather_id, dc_size_kw = row
-            return {
-                "alias": alias,
-                "plant_uid": plant_uid,
-                "inverter_ids": json.loads(inverter_ids_json),
-                "weather_id": weather_id,
-                "dc_size_kw": dc_size_kw,
-            }
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute("SELECT alias, plant_uid, inverter_ids, weather_id, dc_size_kw FROM plants ORDER BY alias LIMIT 1")
+        row = cur.fetchone()
+        if not row:
+            return None
+        alias, plant_uid, inverter_ids_json, weather_id, dc_size_kw = row
+        return {
+            "alias": alias,
+            "plant_uid": plant_uid,
+            "inverter_ids": json.loads(inverter_ids_json),
+            "weather_id": weather_id,
+            "dc_size_kw": dc_size_kw,
+        }
 
     def alias_for(self, plant_uid: str) -> Optional[str]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute("SELECT alias FROM plants WHERE plant_uid = ? LIMIT 1", (plant_uid,))
-            row = cur.fetchone()
-            return row[0] if row else None
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute("SELECT alias FROM plants WHERE plant_uid = ? LIMIT 1", (plant_uid,))
+        row = cur.fetchone()
+        return row[0] if row else None
 
     def delete(self, alias: str) -> bool:
-        conn = sqlite3.connect(self.db_path)
-        try:
+        conn = self._connection()
+        with conn:
             cur = conn.execute("DELETE FROM plants WHERE alias = ?", (alias,))
-            conn.commit()
             return cur.rowcount > 0
-        finally:
-            conn.close()
 
     def export_all(self) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute("SELECT alias, plant_uid, inverter_ids, weather_id FROM plants ORDER BY alias")
-            rows = cur.fetchall()
-            out: List[Dict] = []
-            for alias, plant_uid, inverter_ids_json, weather_id in rows:
-                out.append(
-                    {
-                        "alias": alias,
-                        "plant_uid": plant_uid,
-                        "inverter_ids": json.loads(inverter_ids_json),
-                        "weather_id": weather_id,
-                    }
-                )
-            return out
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute("SELECT alias, plant_uid, inverter_ids, weather_id FROM plants ORDER BY alias")
+        rows = cur.fetchall()
+        out: List[Dict] = []
+        for alias, plant_uid, inverter_ids_json, weather_id in rows:
+            out.append(
+                {
+                    "alias": alias,
+                    "plant_uid": plant_uid,
+                    "inverter_ids": json.loads(inverter_ids_json),
+                    "weather_id": weather_id,
+                }
+            )
+        return out
 
     def import_many(self, records: List[Dict]) -> None:
-        conn = sqlite3.connect(self.db_path)
-        try:
+        conn = self._connection()
+        with conn:
             for rec in records:
                 alias = rec["alias"]
                 plant_uid = rec["plant_uid"]
@@ -197,185 +721,1065 @@ class PlantStore:
                     """,
                     (alias, plant_uid, payload, weather_id, dc_size_kw),
                 )
-            conn.commit()
-        finally:
-            conn.close()
+
+    # ------------------------------------------------------------------
+    # Readings layout and shard routing
+    # ------------------------------------------------------------------
+    def _resolve_layout(self, conn: sqlite3.Connection, layout: Optional[str]) -> str:
+        row = conn.execute("SELECT value FROM store_meta WHERE key = 'readings_layout'").fetchone()
+        if row:
+            if layout is not None and layout != row[0]:
+                raise ValueError(f"{self.db_path} uses the '{row[0]}' readings layout, not '{layout}'")
+            return row[0]
+        layout = layout or "single"
+        if layout != "single" and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'readings'"
+        ).fetchone():
+            if conn.execute("SELECT 1 FROM readings LIMIT 1").fetchone():
+                raise ValueError(f"{self.db_path} already holds unpartitioned readings")
+            conn.execute("DROP TABLE readings")
+            conn.execute("DROP TABLE IF EXISTS readings_typed")
+        conn.execute("INSERT INTO store_meta (key, value) VALUES ('readings_layout', ?)", (layout,))
+        return layout
+
+    def _shard_suffixes(
+        self,
+        plant_uid: Optional[str] = None,
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> List[str]:
+        """Table suffixes of the shards holding a plant's readings for months start..end (YYYY-MM)."""
+        sql = "SELECT suffix FROM reading_shards WHERE 1 = 1"
+        params: List[str] = []
+        if plant_uid is not None and self.layout == "plant_month":
+            sql += " AND plant_uid = ?"
+            params.append(plant_uid)
+        if start_month:
+            sql += " AND month >= ?"
+            params.append(start_month)
+        if end_month:
+            sql += " AND month <= ?"
+            params.append(end_month)
+        sql += " ORDER BY month, suffix"
+        conn = conn or self._connection()
+        return [row[0] for row in conn.execute(sql, params)]
+
+    def _ensure_shard(self, conn: sqlite3.Connection, plant_uid: str, month: str) -> Tuple[str, bool]:
+        """
+        Create the shard tables for a plant/month if needed.  Returns their
+        suffix and whether they were created; the caller rebuilds the views.
+        """
+        suffix = month.replace("-", "")
+        if self.layout == "plant_month":
+            suffix = f"{plant_shard_key(plant_uid)}_{suffix}"
+        if conn.execute("SELECT 1 FROM reading_shards WHERE suffix = ?", (suffix,)).fetchone():
+            return suffix, False
+        conn.execute(_readings_ddl(f"readings_{suffix}"))
+        conn.execute(_typed_ddl(f"readings_typed_{suffix}"))
+        for ddl in _readings_index_ddl(f"readings_{suffix}", f"readings_typed_{suffix}"):
+            conn.execute(ddl)
+        conn.execute(
+            "INSERT OR IGNORE INTO reading_shards (suffix, plant_uid, month) VALUES (?, ?, ?)",
+            (suffix, plant_uid if self.layout == "plant_month" else None, month),
+        )
+        return suffix, True
+
+    def _rebuild_reading_views(self, conn: sqlite3.Connection, plant_uid: Optional[str] = None) -> None:
+        """
+        (Re)create the views over the shards: ``readings``/``readings_typed``
+        over all of them and, in the plant_month layout, the per-plant views
+        of ``plant_uid`` (default: every plant).
+        """
+        self._create_reading_views(conn, "", self._shard_suffixes(conn=conn))
+        if self.layout != "plant_month":
+            return
+        if plant_uid is None:
+            plants = [row[0] for row in conn.execute("SELECT DISTINCT plant_uid FROM reading_shards")]
+        else:
+            plants = [plant_uid]
+        for uid in plants:
+            self._create_reading_views(conn, plant_shard_key(uid), self._shard_suffixes(uid, conn=conn))
+
+    @staticmethod
+    def _create_reading_views(conn: sqlite3.Connection, key: str, suffixes: Sequence[str]) -> None:
+        for table, columns in (("readings", READINGS_COLUMNS), ("readings_typed", TYPED_COLUMNS)):
+            view = _shard_table(table, key)
+            conn.execute(f"DROP VIEW IF EXISTS {view}")
+            if not suffixes:
+                if not key:
+                    columns = (*columns, *TS_PART_COLUMNS)
+                    conn.execute(
+                        f"CREATE VIEW {view} AS SELECT "
+                        + ", ".join(f"NULL AS {col}" for col in columns)
+                        + " WHERE 0"
+                    )
+                continue
+            conn.execute(f"CREATE VIEW {view} AS {_union_sql(table, ', '.join((*columns, *TS_PART_COLUMNS)), suffixes)}")
+
+    def _require_migrated(self) -> None:
+        """Refuse to read or write readings tables still waiting for migrate_schema()."""
+        if self.pending_migration:
+            raise RuntimeError(
+                f"{self.db_path} has readings tables without epoch timestamps; "
+                "run 'python inverter_pipeline.py db migrate' first"
+            )
+
+    def _readings_source(
+        self,
+        table: str,
+        plant_uid: Optional[str] = None,
+        start_ts: Optional[str] = None,
+        end_ts: Optional[str] = None,
+    ) -> str:
+        """FROM-clause source for ``readings``/``readings_typed`` limited to the relevant shards."""
+        self._require_migrated()
+        if self.layout == "single":
+            return table
+        column_names = (*(READINGS_COLUMNS if table == "readings" else TYPED_COLUMNS), *TS_PART_COLUMNS)
+        columns = ", ".join(column_names)
+        suffixes = self._shard_suffixes(
+            plant_uid,
+            _shard_month(start_ts, -1) if start_ts else None,
+            _shard_month(end_ts, 1) if end_ts else None,
+        )
+        if not suffixes:
+            return "(SELECT " + ", ".join(f"NULL AS {col}" for col in column_names) + " WHERE 0)"
+        if len(suffixes) == 1:
+            return f"{table}_{suffixes[0]}"
+        return f"({_union_sql(table, columns, suffixes)})"
+
+    def _shard_batches(self, conn: sqlite3.Connection, plant_uid: str, rows: List, ts_of) -> List[Tuple[str, List]]:
+        """Split rows by target table suffix ('' for the single layout), creating shards as needed."""
+        if self.layout == "single":
+            return [("", rows)]
+        by_month: Dict[str, List] = {}
+        for row in rows:
+            by_month.setdefault(ts_month(ts_of(row)), []).append(row)
+        batches, created = [], False
+        for month, batch in sorted(by_month.items()):
+            suffix, new_shard = self._ensure_shard(conn, plant_uid, month)
+            batches.append((suffix, batch))
+            created = created or new_shard
+        if created:
+            # Once per write: each rebuild re-creates the all-shard views
+            self._rebuild_reading_views(conn, plant_uid)
+        return batches
+
+    def reading_shards(self, plant_uid: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+        """Shards of a partitioned store (suffix, plant_uid, month); empty for the single layout."""
+        if self.layout == "single":
+            return []
+        sql = "SELECT suffix, plant_uid, month FROM reading_shards"
+        params: List[str] = []
+        if plant_uid is not None and self.layout == "plant_month":
+            sql += " WHERE plant_uid = ?"
+            params.append(plant_uid)
+        conn = self._connection()
+        return [
+            {"suffix": suffix, "plant_uid": uid, "month": month}
+            for suffix, uid, month in conn.execute(sql + " ORDER BY month, suffix", params)
+        ]
+
+    def drop_month(self, month: str, plant_uid: Optional[str] = None, pattern: Optional[str] = None) -> int:
+        """
+        Delete one month (YYYY-MM) of readings, optionally for one plant and/or
+        devices matching a LIKE pattern (e.g. 'POA:%').  Returns rows removed.
+
+        In a partitioned store a whole shard is dropped with DROP TABLE when
+        nothing outside the selection lives in it (month layout without a
+        plant or pattern, plant_month layout without a pattern); otherwise
+        the delete only touches that month's shard(s).
+        """
+        if not _MONTH_RE.match(month):
+            raise ValueError(f"Expected a YYYY-MM month, got {month!r}")
+        conditions: List[str] = []
+        params: List[str] = []
+        if plant_uid is not None:
+            conditions.append("plant_uid = ?")
+            params.append(plant_uid)
+        if pattern is not None:
+            conditions.append("emig_id LIKE ?")
+            params.append(pattern)
+        bounds = [ts_to_epoch(f"{month}-01"), ts_to_epoch(f"{_next_month(month)}-01")]
+        rollup_where = " AND ".join(["bucket >= ?", "bucket < ?", *conditions])
+        rollup_params = [*bounds, *params]
+        conn = self._connection()
+        if self.layout == "single":
+            where = " AND ".join(["ts_epoch >= ?", "ts_epoch < ?", *conditions])
+            return self._delete_readings(conn, [""], where, [*bounds, *params], rollup_where, rollup_params)
+        suffixes = self._shard_suffixes(plant_uid, month, month)
+        whole_shard = pattern is None and (plant_uid is None or self.layout == "plant_month")
+        if not whole_shard:
+            return self._delete_readings(
+                conn, suffixes, " AND ".join(conditions), params, rollup_where, rollup_params
+            )
+        removed = 0
+        with conn:
+            conn.execute(f"DELETE FROM readings_rollup WHERE {rollup_where}", rollup_params)
+            for suffix in suffixes:
+                removed += conn.execute(f"SELECT COUNT(*) FROM readings_{suffix}").fetchone()[0]
+                shard_plant = conn.execute(
+                    "SELECT plant_uid FROM reading_shards WHERE suffix = ?", (suffix,)
+                ).fetchone()[0]
+                conn.execute("DELETE FROM reading_shards WHERE suffix = ?", (suffix,))
+                self._rebuild_reading_views(conn, shard_plant)
+                conn.execute(f"DROP TABLE IF EXISTS readings_{suffix}")
+                conn.execute(f"DROP TABLE IF EXISTS readings_typed_{suffix}")
+        return removed
+
+    def _delete_readings(
+        self,
+        conn: sqlite3.Connection,
+        suffixes: Sequence[str],
+        where: str,
+        params: Sequence[Any],
+        rollup_where: Optional[str] = None,
+        rollup_params: Sequence[Any] = (),
+    ) -> int:
+        """Delete matching rows from the readings tables of each shard and their rollups."""
+        removed = 0
+        with conn:
+            for suffix in suffixes:
+                cur = conn.execute(f"DELETE FROM {_shard_table('readings', suffix)} WHERE {where}", params)
+                conn.execute(f"DELETE FROM {_shard_table('readings_typed', suffix)} WHERE {where}", params)
+                removed += cur.rowcount
+            conn.execute(f"DELETE FROM readings_rollup WHERE {rollup_where or where}", rollup_params or params)
+        return removed
 
     # ------------------------------------------------------------------
     # Fetch cache helpers
     # ------------------------------------------------------------------
     def has_fetch(self, plant_uid: str, emig_id: str, start_date: str, end_date: str) -> bool:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(
-                """
-                SELECT 1 FROM fetch_cache
-                WHERE plant_uid = ? AND emig_id = ? AND start_date = ? AND end_date = ?
-                """,
-                (plant_uid, emig_id, start_date, end_date),
-            )
-            return cur.fetchone() is not None
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute(
+            """
+            SELECT 1 FROM fetch_cache
+            WHERE plant_uid = ? AND emig_id = ? AND start_date = ? AND end_date = ?
+            """,
+            (plant_uid, emig_id, start_date, end_date),
+        )
+        return cur.fetchone() is not None
 
     def record_fetch(self, plant_uid: str, emig_id: str, start_date: str, end_date: str) -> None:
-        conn = sqlite3.connect(self.db_path)
-        try:
+        conn = self._connection()
+        with conn:
             conn.execute(
                 """
-                INSERT OR IGNORE INTO fetch_cache (plant_uid, emig_id, start_date, end_date)
+                INSERT OR REPLACE INTO fetch_cache (plant_uid, emig_id, start_date, end_date)
                 VALUES (?, ?, ?, ?)
                 """,
                 (plant_uid, emig_id, start_date, end_date),
             )
-            conn.commit()
-        finally:
-            conn.close()
+
+    def fetch_coverage(self, plant_uid: str, emig_id: str) -> List[Tuple[str, str]]:
+        """
+        Merged YYYYMMDD date ranges already downloaded for a device.
+
+        Uses ``fetch_cache``; a range is only counted up to the day before it
+        was fetched, since the API returns a partial day for "today".  Devices
+        with readings but no fetch records (older databases) fall back to
+        their stored data span, minus the possibly incomplete last day.
+        """
+        conn = self._connection()
+        rows = conn.execute(
+            """
+            SELECT start_date, end_date, saved_at FROM fetch_cache
+            WHERE plant_uid = ? AND emig_id = ?
+            """,
+            (plant_uid, emig_id),
+        ).fetchall()
+        ranges: List[Tuple[str, str]] = []
+        for start, end, saved_at in rows:
+            if saved_at:
+                complete_until = (datetime.fromisoformat(str(saved_at)) - timedelta(days=1)).strftime("%Y%m%d")
+                end = min(end, complete_until)
+            if start <= end:
+                ranges.append((start, end))
+        if not rows:
+            mn, mx = conn.execute(
+                f"SELECT MIN(ts), MAX(ts) FROM {self._readings_source('readings', plant_uid)} "
+                "WHERE plant_uid = ? AND emig_id = ?",
+                (plant_uid, emig_id),
+            ).fetchone()
+            if mn is not None:
+                start = mn[:10].replace("-", "")
+                end = (_day(mx[:10].replace("-", "")) - timedelta(days=1)).strftime("%Y%m%d")
+                if start <= end:
+                    ranges.append((start, end))
+        return merge_date_ranges(ranges)
+
+    def missing_ranges(self, plant_uid: str, emig_id: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """Inclusive YYYYMMDD ranges within start..end not yet fetched for a device."""
+        return missing_date_ranges(self.fetch_coverage(plant_uid, emig_id), start_date, end_date)
 
     def list_emig_ids(self, plant_uid: str) -> List[str]:
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(
-                "SELECT DISTINCT emig_id FROM readings WHERE plant_uid = ? ORDER BY emig_id",
-                (plant_uid,),
-            )
-            return [row[0] for row in cur.fetchall()]
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute(
+            f"SELECT DISTINCT emig_id FROM {self._readings_source('readings', plant_uid)} "
+            "WHERE plant_uid = ? ORDER BY emig_id",
+            (plant_uid,),
+        )
+        return [row[0] for row in cur.fetchall()]
 
     def season_range(self, plant_uid: str, months: Sequence[str]) -> Optional[Dict[str, str]]:
         """
         Find a date range for the most recent year that has data in the given month set.
         months: list like ["06","07","08"]
-        Returns dict with start_date/end_date (YYYYMMDD) or None.
+        Returns dict with start_date/end_date (YYYYMMDD, UTC) or None.
         """
         if not months:
             return None
         placeholders = ",".join("?" for _ in months)
         sql = f"""
-            SELECT substr(ts,1,4) as year,
-                   MIN(substr(ts,1,10)) as start_date,
-                   MAX(substr(ts,1,10)) as end_date,
-                   COUNT(*) as n
-            FROM readings
+            SELECT ts_year,
+                   strftime('%Y%m%d', MIN(ts_epoch), 'unixepoch') as start_date,
+                   strftime('%Y%m%d', MAX(ts_epoch), 'unixepoch') as end_date
+            FROM {self._readings_source("readings", plant_uid)}
             WHERE plant_uid = ?
-              AND substr(ts,6,2) IN ({placeholders})
-            GROUP BY year
-            ORDER BY year DESC
+              AND ts_month IN ({placeholders})
+            GROUP BY ts_year
+            ORDER BY ts_year DESC
             LIMIT 1
         """
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(sql, [plant_uid, *months])
-            row = cur.fetchone()
-            if not row:
-                return None
-            year, start_date, end_date, _ = row
-            start_date = start_date.replace("-", "")
-            end_date = end_date.replace("-", "")
-            return {"start": start_date, "end": end_date, "year": year}
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute(sql, [plant_uid, *(int(m) for m in months)])
+        row = cur.fetchone()
+        if not row:
+            return None
+        year, start_date, end_date = row
+        return {"start": start_date, "end": end_date, "year": str(year)}
 
     def date_span(self, plant_uid: str) -> Optional[Dict[str, str]]:
-        """Return min/max ts for a plant."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(
-                """
-                SELECT MIN(ts), MAX(ts) FROM readings WHERE plant_uid = ?
-                """,
-                (plant_uid,),
-            )
-            row = cur.fetchone()
-            if not row or row[0] is None:
-                return None
-            return {"min": row[0], "max": row[1]}
-        finally:
-            conn.close()
+        """Return the first and last stored ts for a plant (ordered by epoch)."""
+        source = self._readings_source("readings", plant_uid)
+        conn = self._connection()
+        cur = conn.execute(
+            f"""
+            SELECT
+                (SELECT ts FROM {source} WHERE plant_uid = ? AND ts_epoch IS NOT NULL
+                 ORDER BY ts_epoch LIMIT 1),
+                (SELECT ts FROM {source} WHERE plant_uid = ? AND ts_epoch IS NOT NULL
+                 ORDER BY ts_epoch DESC LIMIT 1)
+            """,
+            (plant_uid, plant_uid),
+        )
+        row = cur.fetchone()
+        if not row or row[0] is None:
+            return None
+        return {"min": row[0], "max": row[1]}
 
     def emig_date_spans(self, plant_uid: str) -> List[Dict[str, str]]:
         """Return min/max ts per emig for a plant."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(
-                """
-                SELECT emig_id, MIN(ts), MAX(ts)
-                FROM readings
-                WHERE plant_uid = ?
-                GROUP BY emig_id
-                ORDER BY emig_id
-                """,
-                (plant_uid,),
-            )
-            rows = cur.fetchall()
-            return [{"emig_id": emig, "min": mn, "max": mx} for emig, mn, mx in rows]
-        finally:
-            conn.close()
+        conn = self._connection()
+        cur = conn.execute(
+            f"""
+            SELECT emig_id, MIN(ts), MAX(ts)
+            FROM {self._readings_source("readings", plant_uid)}
+            WHERE plant_uid = ?
+            GROUP BY emig_id
+            ORDER BY emig_id
+            """,
+            (plant_uid,),
+        )
+        rows = cur.fetchall()
+        return [{"emig_id": emig, "min": mn, "max": mx} for emig, mn, mx in rows]
 
     def store_readings(self, plant_uid: str, emig_id: str, readings: List[Dict]) -> None:
         if not readings:
             return
-        conn = sqlite3.connect(self.db_path)
-        try:
-            conn.executemany(
+        valid = [r for r in readings if r.get("ts") is not None]
+        if not valid:
+            return
+        epochs = _require_epochs([r["ts"] for r in valid])
+        self._require_migrated()
+        rows = list(zip(valid, epochs))
+        conn = self._connection()
+        with conn:
+            for suffix, batch in self._shard_batches(conn, plant_uid, rows, lambda row: row[0]["ts"]):
+                conn.executemany(
+                    f"""
+                    INSERT OR REPLACE INTO {_shard_table("readings", suffix)}
+                        (plant_uid, emig_id, ts, ts_epoch, payload)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(plant_uid, emig_id, r["ts"], epoch, json.dumps(r)) for r, epoch in batch],
+                )
+                conn.executemany(
+                    self._typed_insert_sql(_shard_table("readings_typed", suffix)),
+                    [_typed_row(plant_uid, emig_id, r, epoch) for r, epoch in batch],
+                )
+            self._refresh_rollups(conn, plant_uid, emig_id, min(epochs), max(epochs))
+
+    def store_metric_series(
+        self,
+        plant_uid: str,
+        emig_id: str,
+        ts: Sequence[str],
+        values: Sequence[float],
+        metric: str,
+        unit: Optional[str] = None,
+    ) -> int:
+        """
+        Bulk-write a single metric time series given as parallel arrays.
+
+        ``ts`` holds ISO timestamp strings and ``values`` the readings (NumPy
+        arrays, pandas Series or lists).  Equivalent to ``store_readings``
+        with ``{"ts": t, metric: {"value": v, "unit": unit}}`` per row, but
+        the JSON payload is built by SQLite, so no per-row dicts are created.
+        Unparseable timestamps raise ValueError.  Both tables (and the affected rollups) are written in
+        one transaction; returns the row count.
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric column: {metric}")
+        ts = ts.tolist() if hasattr(ts, "tolist") else list(ts)
+        values = values.tolist() if hasattr(values, "tolist") else list(values)
+        if len(ts) != len(values):
+            raise ValueError("ts and values must have the same length")
+        if not ts:
+            return 0
+        epochs = _require_epochs(ts)
+        self._require_migrated()
+        value_sql = "json_object('value', ?, 'unit', ?)" if unit is not None else "json_object('value', ?)"
+        payload_sql = f"json_object('ts', ?, '{metric}', {value_sql})"
+        conn = self._connection()
+        with conn:
+            if self.layout == "single":
+                batches = [("", ts, epochs, values)]
+            else:
+                batches = [
+                    (suffix, *map(list, zip(*rows)))
+                    for suffix, rows in self._shard_batches(
+                        conn, plant_uid, list(zip(ts, epochs, values)), itemgetter(0)
+                    )
+                ]
+            for suffix, batch_ts, batch_epochs, batch_values in batches:
+                if unit is not None:
+                    payload_params = zip(
+                        repeat(plant_uid), repeat(emig_id), batch_ts, batch_epochs, batch_ts, batch_values, repeat(unit)
+                    )
+                else:
+                    payload_params = zip(
+                        repeat(plant_uid), repeat(emig_id), batch_ts, batch_epochs, batch_ts, batch_values
+                    )
+                conn.executemany(
+                    f"""
+                    INSERT OR REPLACE INTO {_shard_table("readings", suffix)}
+                        (plant_uid, emig_id, ts, ts_epoch, payload)
+                    VALUES (?, ?, ?, ?, {payload_sql})
+                    """,
+                    payload_params,
+                )
+                conn.executemany(
+                    f"""
+                    INSERT OR REPLACE INTO {_shard_table("readings_typed", suffix)}
+                        (plant_uid, emig_id, ts, ts_epoch, {metric})
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    zip(repeat(plant_uid), repeat(emig_id), batch_ts, batch_epochs, batch_values),
+                )
+            self._refresh_rollups(conn, plant_uid, emig_id, min(epochs), max(epochs))
+        return len(ts)
+
+    @staticmethod
+    def _typed_insert_sql(table: str = "readings_typed") -> str:
+        cols = ", ".join(TYPED_COLUMNS)
+        placeholders = ", ".join("?" for _ in TYPED_COLUMNS)
+        return f"INSERT OR REPLACE INTO {table} ({cols}) VALUES ({placeholders})"
+
+    def backfill_typed_readings(self, plant_uid: Optional[str] = None) -> int:
+        """
+        Populate ``readings_typed`` from the JSON payloads already in ``readings``.
+
+        Runs as one INSERT ... SELECT per table (json_extract, with the
+        store's own timestamp/number parsing registered as SQL functions),
+        so existing databases can be migrated without decoding payloads in
+        Python.  The rollups of the backfilled plant(s) are rebuilt
+        afterwards.  Rows whose timestamp cannot be parsed keep a NULL epoch
+        and are logged as a warning.  Returns the number of rows written.
+        """
+        cols = ", ".join(TYPED_COLUMNS)
+        extracts = ",\n                   ".join(_json_metric_sql(col) for col in METRIC_COLUMNS)
+        self._require_migrated()
+        params: List[str] = []
+        where = ""
+        if plant_uid is not None:
+            where = " WHERE plant_uid = ?"
+            params.append(plant_uid)
+        suffixes = [""] if self.layout == "single" else self._shard_suffixes(plant_uid)
+        written = unparsed = 0
+        conn = self._connection()
+        with conn:
+            for suffix in suffixes:
+                sql = f"""
+                    INSERT OR REPLACE INTO {_shard_table("readings_typed", suffix)} ({cols})
+                    SELECT plant_uid, emig_id, ts, iso_epoch(ts),
+                           {extracts}
+                    FROM {_shard_table("readings", suffix)}
                 """
-                INSERT OR REPLACE INTO readings (plant_uid, emig_id, ts, payload)
-                VALUES (?, ?, ?, ?)
-                """,
-                [
-                    (plant_uid, emig_id, r.get("ts"), json.dumps(r))
-                    for r in readings
-                    if r.get("ts") is not None
-                ],
-            )
-            conn.commit()
-        finally:
-            conn.close()
+                written += conn.execute(sql + where, params).rowcount
+                unparsed += conn.execute(
+                    f"SELECT COUNT(*) FROM {_shard_table('readings_typed', suffix)} "
+                    f"WHERE ts_epoch IS NULL{where.replace(' WHERE', ' AND')}",
+                    params,
+                ).fetchone()[0]
+        if unparsed:
+            logger.warning(f"{unparsed} typed reading row(s) have unparseable timestamps and no epoch")
+        self.rebuild_rollups(plant_uid)
+        return written
+
+    def ensure_typed_readings(self, plant_uid: str) -> int:
+        """
+        Backfill ``readings_typed`` for a plant that has payload readings but
+        no typed rows yet (a database not migrated with ``db migrate``).
+        Returns the rows written (0 when nothing was missing).
+        """
+        conn = self._connection()
+        has_typed = conn.execute(
+            f"SELECT 1 FROM {self._readings_source('readings_typed', plant_uid)} WHERE plant_uid = ? LIMIT 1",
+            (plant_uid,),
+        ).fetchone()
+        if has_typed:
+            return 0
+        has_payloads = conn.execute(
+            f"SELECT 1 FROM {self._readings_source('readings', plant_uid)} WHERE plant_uid = ? LIMIT 1",
+            (plant_uid,),
+        ).fetchone()
+        return self.backfill_typed_readings(plant_uid) if has_payloads else 0
 
     def load_readings(self, plant_uid: str, emig_id: str, start_ts: str, end_ts: str) -> List[Dict]:
-        conn = sqlite3.connect(self.db_path)
-        try:
+        start_epoch, end_epoch = _epoch_bounds(start_ts, end_ts)
+        conn = self._connection()
+        cur = conn.execute(
+            f"""
+            SELECT payload FROM {self._readings_source("readings", plant_uid, start_ts, end_ts)}
+            WHERE plant_uid = ? AND emig_id = ? AND ts_epoch BETWEEN ? AND ?
+            ORDER BY ts_epoch
+            """,
+            (plant_uid, emig_id, start_epoch, end_epoch),
+        )
+        return [json.loads(row[0]) for row in cur.fetchall()]
+
+    def iter_readings_many(
+        self,
+        plant_uid: str,
+        emig_ids: Sequence[str],
+        start_ts: str,
+        end_ts: str,
+        batch_size: int = 10000,
+    ) -> Iterator[List[Tuple[str, str, str]]]:
+        """
+        Yield batches of (emig_id, ts, payload) rows for several devices.
+
+        Uses one ``emig_id IN (...)`` range query per MAX_IN_PARAMS devices
+        instead of one query per device, and streams the result with
+        ``fetchmany`` so callers can decode payloads batch by batch.
+        """
+        start_epoch, end_epoch = _epoch_bounds(start_ts, end_ts)
+        conn = self._connection()
+        source = self._readings_source("readings", plant_uid, start_ts, end_ts)
+        ids = list(emig_ids)
+        for i in range(0, len(ids), MAX_IN_PARAMS):
+            chunk = ids[i : i + MAX_IN_PARAMS]
+            placeholders = ",".join("?" for _ in chunk)
             cur = conn.execute(
-                """
-                SELECT payload FROM readings
-                WHERE plant_uid = ? AND emig_id = ? AND ts >= ? AND ts <= ?
-                ORDER BY ts
+                f"""
+                SELECT emig_id, ts, payload FROM {source}
+                WHERE plant_uid = ? AND emig_id IN ({placeholders}) AND ts_epoch BETWEEN ? AND ?
+                ORDER BY emig_id, ts_epoch
                 """,
-                (plant_uid, emig_id, start_ts, end_ts),
+                (plant_uid, *chunk, start_epoch, end_epoch),
             )
-            return [json.loads(row[0]) for row in cur.fetchall()]
-        finally:
-            conn.close()
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
 
-    def delete_device_readings(self, plant_uid: str, emig_id: str) -> int:
-        """Delete all readings for a specific device. Returns number of rows deleted."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+    def load_typed_readings(
+        self,
+        plant_uid: str,
+        emig_ids: Sequence[str],
+        start_ts: str,
+        end_ts: str,
+        metrics: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[Tuple]]:
+        """
+        Load typed metric rows for several devices without touching JSON payloads.
+
+        Returns (columns, rows) where columns are
+        ``["emig_id", "ts", "ts_epoch", *metrics]``.  ``metrics`` defaults to
+        all METRIC_COLUMNS; unknown names raise ValueError.
+        """
+        metrics = list(metrics) if metrics else list(METRIC_COLUMNS)
+        unknown = [m for m in metrics if m not in METRIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown metric column(s): {', '.join(unknown)}")
+        columns = ["emig_id", "ts", "ts_epoch", *metrics]
+        start_epoch, end_epoch = _epoch_bounds(start_ts, end_ts)
+        conn = self._connection()
+        source = self._readings_source("readings_typed", plant_uid, start_ts, end_ts)
+        ids = list(emig_ids)
+        rows: List[Tuple] = []
+        for i in range(0, len(ids), MAX_IN_PARAMS):
+            chunk = ids[i : i + MAX_IN_PARAMS]
+            placeholders = ",".join("?" for _ in chunk)
             cur = conn.execute(
-                """
-                DELETE FROM readings
-                WHERE plant_uid = ? AND emig_id = ?
+                f"""
+                SELECT {", ".join(columns)} FROM {source}
+                WHERE plant_uid = ? AND emig_id IN ({placeholders}) AND ts_epoch BETWEEN ? AND ?
+                ORDER BY emig_id, ts_epoch
                 """,
-                (plant_uid, emig_id),
+                (plant_uid, *chunk, start_epoch, end_epoch),
             )
-            conn.commit()
-            return cur.rowcount
-        finally:
-            conn.close()
+            rows.extend(cur.fetchall())
+        return columns, rows
+
+    def metric_month_fingerprints(self, plant_uid: str, emig_id: str, metric: str) -> Dict[int, List]:
+        """
+        Per-month change fingerprints of one device metric, keyed by UTC month start epoch.
+
+        Each is [count, SUM(value), MIN(ts_epoch), MAX(ts_epoch), SUM(ts_epoch * value)],
+        so re-imports that only move values in time change it as well.
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric column: {metric}")
+        conn = self._connection()
+        cur = conn.execute(
+            f"""
+            SELECT COUNT(*), SUM({metric}), MIN(ts_epoch), MAX(ts_epoch), SUM(ts_epoch * {metric})
+            FROM {self._readings_source("readings_typed", plant_uid)}
+            WHERE plant_uid = ? AND emig_id = ? AND ts_epoch IS NOT NULL AND {metric} IS NOT NULL
+            GROUP BY ts_year, ts_month
+            """,
+            (plant_uid, emig_id),
+        )
+        return {_month_start(row[2]): list(row) for row in cur.fetchall()}
+
+    def delete_device_readings(self, plant_uid: str, emig_id: str) -> int:
+        """Delete all readings for a specific device. Returns number of rows deleted."""
+        suffixes = [""] if self.layout == "single" else self._shard_suffixes(plant_uid)
+        return self._delete_readings(
+            self._connection(), suffixes, "plant_uid = ? AND emig_id = ?", (plant_uid, emig_id)
+        )
 
     def delete_devices_by_pattern(self, plant_uid: str, pattern: str) -> int:
         """Delete all readings for devices matching a pattern (e.g., 'POA:%', 'WETH:%'). Returns number of rows deleted."""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            cur = conn.execute(
+        suffixes = [""] if self.layout == "single" else self._shard_suffixes(plant_uid)
+        return self._delete_readings(
+            self._connection(), suffixes, "plant_uid = ? AND emig_id LIKE ?", (plant_uid, pattern)
+        )
+
+    # ------------------------------------------------------------------
+    # Rollups
+    # ------------------------------------------------------------------
+    def _refresh_rollups(
+        self, conn: sqlite3.Connection, plant_uid: str, emig_id: str, start_epoch: int, end_epoch: int
+    ) -> None:
+        """
+        Recompute one device's rollups for the days and months touching start..end.
+
+        Hours are aggregated from ``readings_typed``, days from hours and
+        months from days, so a write only rescans the raw rows of the days it
+        touched.  A reading's energy uses its gap to the previous reading, so
+        the day (and month) of the first reading after the touched days is
+        recomputed too when that gap is short enough to count.  Runs inside
+        the caller's transaction.
+        """
+        day_start = start_epoch - start_epoch % 86400
+        day_end = end_epoch - end_epoch % 86400 + 86400
+        device = {"plant_uid": plant_uid, "emig_id": emig_id}
+        source = self._readings_source(
+            "readings_typed", plant_uid, _epoch_iso(day_end), _epoch_iso(day_end + ROLLUP_MAX_GAP_S)
+        )
+        next_epoch = conn.execute(
+            f"""
+            SELECT MIN(ts_epoch) FROM {source}
+            WHERE plant_uid = :plant_uid AND emig_id = :emig_id AND ts_epoch >= :lo AND ts_epoch < :hi
+            """,
+            {**device, "lo": day_end, "hi": day_end + ROLLUP_MAX_GAP_S},
+        ).fetchone()[0]
+        if next_epoch is not None:
+            day_end = next_epoch - next_epoch % 86400 + 86400
+        month_start = _month_start(start_epoch)
+        month_end = _month_start(_month_start(day_end - 1) + 32 * 86400)
+        window_start = day_start - ROLLUP_MAX_GAP_S
+        conn.execute(
+            """
+            DELETE FROM readings_rollup
+            WHERE plant_uid = :plant_uid AND emig_id = :emig_id
+              AND ((period IN ('hour', 'day') AND bucket >= :day_start AND bucket < :day_end)
+                   OR (period = 'month' AND bucket >= :month_start AND bucket < :month_end))
+            """,
+            {**device, "day_start": day_start, "day_end": day_end, "month_start": month_start, "month_end": month_end},
+        )
+        source = self._readings_source("readings_typed", plant_uid, _epoch_iso(window_start), _epoch_iso(day_end))
+        per_metric = "\n            UNION ALL\n".join(
+            f"""
+            SELECT ts_epoch - ts_epoch % 3600, '{col}', COUNT({col}), SUM({col}), MIN({col}), MAX({col}),
+                   SUM({col} * dt) / 3600.0
+            FROM timed WHERE {col} IS NOT NULL
+            GROUP BY ts_epoch - ts_epoch % 3600"""
+            for col in METRIC_COLUMNS
+        )
+        conn.execute(
+            f"""
+            WITH gaps AS MATERIALIZED (
+                SELECT ts_epoch, {", ".join(METRIC_COLUMNS)},
+                       ts_epoch - LAG(ts_epoch) OVER (ORDER BY ts_epoch) AS gap
+                FROM {source}
+                WHERE plant_uid = :plant_uid AND emig_id = :emig_id
+                  AND ts_epoch >= :window_start AND ts_epoch < :day_end
+            ),
+            timed AS MATERIALIZED (
+                SELECT *, CASE WHEN gap BETWEEN 1 AND :max_gap THEN gap ELSE :default_interval END AS dt
+                FROM gaps WHERE ts_epoch >= :day_start
+            )
+            INSERT INTO readings_rollup (plant_uid, emig_id, period, bucket, metric, {", ".join(ROLLUP_COLUMNS)})
+            SELECT :plant_uid, :emig_id, 'hour', * FROM ({per_metric}
+            )
+            """,
+            {
+                **device,
+                "window_start": window_start,
+                "day_start": day_start,
+                "day_end": day_end,
+                "max_gap": ROLLUP_MAX_GAP_S,
+                "default_interval": ROLLUP_DEFAULT_INTERVAL_S,
+            },
+        )
+        for period, parent, bucket_sql, lo, hi in (
+            ("day", "hour", "bucket - bucket % 86400", day_start, day_end),
+            ("month", "day", "CAST(strftime('%s', bucket, 'unixepoch', 'start of month') AS INTEGER)", month_start, month_end),
+        ):
+            conn.execute(
+                f"""
+                INSERT INTO readings_rollup (plant_uid, emig_id, period, bucket, metric, {", ".join(ROLLUP_COLUMNS)})
+                SELECT plant_uid, emig_id, '{period}', {bucket_sql}, metric,
+                       SUM(n), SUM(total), MIN(min_value), MAX(max_value), SUM(energy)
+                FROM readings_rollup
+                WHERE plant_uid = ? AND emig_id = ? AND period = '{parent}' AND bucket >= ? AND bucket < ?
+                GROUP BY {bucket_sql}, metric
+                """,
+                (plant_uid, emig_id, lo, hi),
+            )
+
+    def rebuild_rollups(
+        self,
+        plant_uid: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> int:
+        """
+        Recompute rollups from ``readings_typed``.
+
+        Limited to one plant and/or an inclusive YYYYMMDD date range; the
+        UTC months touched by the range are recomputed in full.  Use it
+        once to populate rollups for data written before they existed.
+        Returns the number of devices refreshed.
+        """
+        # Widen the range to whole months: month rollups are built from days
+        start_epoch = end_epoch = None
+        if start_date:
+            start_epoch = _month_start(ts_to_epoch(f"{start_date[:4]}-{start_date[4:6]}-{start_date[6:8]}"))
+        if end_date:
+            end_epoch = _month_start(
+                _month_start(ts_to_epoch(f"{end_date[:4]}-{end_date[4:6]}-{end_date[6:8]}")) + 32 * 86400
+            )
+        conditions: List[str] = []
+        params: List[Any] = []
+        if plant_uid is not None:
+            conditions.append("plant_uid = ?")
+            params.append(plant_uid)
+        rollup_conditions, rollup_params = list(conditions), list(params)
+        if start_epoch is not None:
+            conditions.append("ts_epoch >= ?")
+            params.append(start_epoch)
+            rollup_conditions.append("bucket >= ?")
+            rollup_params.append(start_epoch)
+        if end_epoch is not None:
+            conditions.append("ts_epoch < ?")
+            params.append(end_epoch)
+            rollup_conditions.append("bucket < ?")
+            rollup_params.append(end_epoch)
+        source = self._readings_source(
+            "readings_typed",
+            plant_uid,
+            _epoch_iso(start_epoch) if start_epoch is not None else None,
+            _epoch_iso(end_epoch) if end_epoch is not None else None,
+        )
+        conn = self._connection()
+        devices = conn.execute(
+            f"""
+            SELECT plant_uid, emig_id, MIN(ts_epoch), MAX(ts_epoch) FROM {source}
+            WHERE {" AND ".join(["ts_epoch IS NOT NULL", *conditions])}
+            GROUP BY plant_uid, emig_id
+            """,
+            params,
+        ).fetchall()
+        with conn:
+            # Clear the affected months first so rollups of devices without
+            # data left in the range disappear too
+            conn.execute(
+                f"DELETE FROM readings_rollup WHERE {' AND '.join(['1 = 1', *rollup_conditions])}",
+                rollup_params,
+            )
+            for uid, emig_id, lo, hi in devices:
+                self._refresh_rollups(conn, uid, emig_id, lo, hi)
+        return len(devices)
+
+    def load_rollups(
+        self,
+        plant_uid: str,
+        period: str,
+        start_ts: Optional[str] = None,
+        end_ts: Optional[str] = None,
+        emig_ids: Optional[Sequence[str]] = None,
+        metrics: Optional[Sequence[str]] = None,
+        by_device: bool = True,
+    ) -> Tuple[List[str], List[Tuple]]:
+        """
+        Load rollup rows for a plant.
+
+        Returns (columns, rows) with columns ``["emig_id", "bucket", "metric",
+        "n", "total", "min_value", "max_value", "energy"]``; ``bucket`` is
+        the UTC period start as epoch seconds and ``energy`` the value
+        integrated over time in value-hours (Wh for W, Wh/m² for W/m²).
+        With ``by_device=False`` devices are combined per bucket and metric
+        and ``emig_id`` is omitted.
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"Unknown rollup period: {period}")
+        metrics = list(metrics) if metrics else []
+        unknown = [m for m in metrics if m not in METRIC_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown metric column(s): {', '.join(unknown)}")
+        sql_where = ["plant_uid = ?", "period = ?"]
+        params: List[Any] = [plant_uid, period]
+        if start_ts is not None:
+            sql_where.append("bucket >= ?")
+            params.append(ts_to_epoch(start_ts))
+        if end_ts is not None:
+            sql_where.append("bucket <= ?")
+            params.append(ts_to_epoch(end_ts))
+        if emig_ids:
+            sql_where.append(f"emig_id IN ({', '.join('?' for _ in emig_ids)})")
+            params.extend(emig_ids)
+        if metrics:
+            sql_where.append(f"metric IN ({', '.join('?' for _ in metrics)})")
+            params.extend(metrics)
+        where = " AND ".join(sql_where)
+        if by_device:
+            columns = ["emig_id", "bucket", "metric", *ROLLUP_COLUMNS]
+            sql = f"SELECT {', '.join(columns)} FROM readings_rollup WHERE {where} ORDER BY emig_id, metric, bucket"
+        else:
+            columns = ["bucket", "metric", *ROLLUP_COLUMNS]
+            sql = f"""
+                SELECT bucket, metric, SUM(n), SUM(total), MIN(min_value), MAX(max_value), SUM(energy)
+                FROM readings_rollup WHERE {where}
+                GROUP BY bucket, metric ORDER BY metric, bucket
+            """
+        conn = self._connection()
+        return columns, conn.execute(sql, params).fetchall()
+
+    # ------------------------------------------------------------------
+    # SolarGIS file index
+    # ------------------------------------------------------------------
+    def solargis_folders(self) -> Dict[str, int]:
+        """Indexed SolarGIS folders and the directory mtime they were scanned at."""
+        conn = self._connection()
+        return dict(conn.execute("SELECT folder, mtime_ns FROM solargis_folders").fetchall())
+
+    def index_solargis_folder(self, folder: str, mtime_ns: int, month: Optional[str], filenames: Sequence[str]) -> None:
+        """Replace the indexed CSV file list of one folder."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM solargis_files WHERE folder = ?", (folder,))
+            conn.executemany(
+                "INSERT INTO solargis_files (folder, filename) VALUES (?, ?)",
+                [(folder, name) for name in filenames],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO solargis_folders (folder, mtime_ns, month) VALUES (?, ?, ?)",
+                (folder, mtime_ns, month),
+            )
+
+    def drop_solargis_folder(self, folder: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM solargis_files WHERE folder = ?", (folder,))
+            conn.execute("DELETE FROM solargis_folders WHERE folder = ?", (folder,))
+
+    def solargis_filenames(self) -> List[str]:
+        """Distinct CSV file names across all indexed folders."""
+        conn = self._connection()
+        return [row[0] for row in conn.execute("SELECT DISTINCT filename FROM solargis_files ORDER BY filename")]
+
+    def solargis_match_fingerprint(self, alias: str) -> Optional[str]:
+        conn = self._connection()
+        row = conn.execute("SELECT fingerprint FROM plant_solargis_state WHERE alias = ?", (alias,)).fetchone()
+        return row[0] if row else None
+
+    def set_plant_solargis_matches(self, alias: str, fingerprint: str, matches: Sequence[Tuple[str, float]]) -> None:
+        """Store the file names matched to a plant and the index state they were computed from."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM plant_solargis_matches WHERE alias = ?", (alias,))
+            conn.executemany(
+                "INSERT INTO plant_solargis_matches (alias, filename, score) VALUES (?, ?, ?)",
+                [(alias, name, score) for name, score in matches],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO plant_solargis_state (alias, fingerprint) VALUES (?, ?)",
+                (alias, fingerprint),
+            )
+
+    def plant_solargis_files(self, alias: str, folders: Optional[Sequence[str]] = None) -> List[Dict]:
+        """
+        Indexed SolarGIS files matched to a plant, best score first.
+
+        Returns dicts with folder, filename, month and score, optionally
+        limited to the given folders.
+        """
+        sql = """
+            SELECT f.folder, f.filename, d.month, m.score
+            FROM plant_solargis_matches m
+            JOIN solargis_files f ON f.filename = m.filename
+            JOIN solargis_folders d ON d.folder = f.folder
+            WHERE m.alias = ?
+        """
+        params: List[Any] = [alias]
+        if folders is not None:
+            sql += f" AND f.folder IN ({', '.join('?' for _ in folders)})"
+            params.extend(folders)
+        sql += " ORDER BY m.score DESC, d.month, f.folder"
+        conn = self._connection()
+        return [
+            {"folder": folder, "filename": filename, "month": month, "score": score}
+            for folder, filename, month, score in conn.execute(sql, params)
+        ]
+
+    # ------------------------------------------------------------------
+    # Clean baselines
+    # ------------------------------------------------------------------
+    def save_clean_baseline(self, plant_uid: str, baseline: Dict, data_hash: Optional[str] = None) -> int:
+        """
+        Store a new version of a plant's clean-baseline model and return its
+        version number (1, 2, ...).  ``baseline`` is any JSON-serialisable dict
+        (e.g. ``CleanBaselineModel.to_dict()``); ``data_hash`` identifies the
+        data it was fitted on.
+        """
+        conn = self._connection()
+        with conn:
+            row = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM clean_baselines WHERE plant_uid = ?",
+                (plant_uid,),
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO clean_baselines (plant_uid, version, data_hash, baseline) VALUES (?, ?, ?, ?)",
+                (plant_uid, row[0], data_hash, json.dumps(baseline)),
+            )
+        return row[0]
+
+    def load_clean_baseline(self, plant_uid: str, version: Optional[int] = None) -> Optional[Dict]:
+        """A plant's stored clean-baseline dict (latest version by default), or None."""
+        record = self.clean_baseline_record(plant_uid, version)
+        return record["baseline"] if record else None
+
+    def clean_baseline_record(self, plant_uid: str, version: Optional[int] = None) -> Optional[Dict]:
+        """
+        One stored clean-baseline version (latest by default) as a dict with
+        version, data_hash, saved_at and baseline, or None.
+        """
+        conn = self._connection()
+        sql = "SELECT version, data_hash, saved_at, baseline FROM clean_baselines WHERE plant_uid = ?"
+        params: List[Any] = [plant_uid]
+        if version is not None:
+            sql += " AND version = ?"
+            params.append(version)
+        row = conn.execute(sql + " ORDER BY version DESC LIMIT 1", params).fetchone()
+        if not row:
+            return None
+        version, data_hash, saved_at, baseline = row
+        return {"version": version, "data_hash": data_hash, "saved_at": saved_at, "baseline": json.loads(baseline)}
+
+    def clean_baseline_versions(self, plant_uid: str) -> List[Dict]:
+        """Stored versions for a plant, oldest first (version, data_hash, saved_at)."""
+        conn = self._connection()
+        cur = conn.execute(
+            "SELECT version, data_hash, saved_at FROM clean_baselines WHERE plant_uid = ? ORDER BY version",
+            (plant_uid,),
+        )
+        return [
+            {"version": version, "data_hash": data_hash, "saved_at": saved_at}
+            for version, data_hash, saved_at in cur.fetchall()
+        ]
+
+    def delete_clean_baseline(self, plant_uid: str, version: Optional[int] = None) -> int:
+        """Delete one version (or all versions) of a plant's clean baseline; returns rows removed."""
+        conn = self._connection()
+        sql = "DELETE FROM clean_baselines WHERE plant_uid = ?"
+        params: List[Any] = [plant_uid]
+        if version is not None:
+            sql += " AND version = ?"
+            params.append(version)
+        with conn:
+            cur = conn.execute(sql, params)
+        return cur.rowcount
+
+    # ------------------------------------------------------------------
+    # Fouling history
+    # ------------------------------------------------------------------
+    def save_fouling_days(self, plant_uid: str, days: Sequence[Dict]) -> None:
+        """
+        Insert or replace daily fouling rows.  Each dict has day (YYYY-MM-DD),
+        baseline_version, points, loss_kwh, ratios (float64 bytes),
+        fouling_index and energy_loss_kwh_per_day.
+        """
+        conn = self._connection()
+        with conn:
+            conn.executemany(
                 """
-                DELETE FROM readings
-                WHERE plant_uid = ? AND emig_id LIKE ?
+                INSERT OR REPLACE INTO fouling_history
+                    (plant_uid, day, baseline_version, points, loss_kwh, ratios, fouling_index, energy_loss_kwh_per_day)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (plant_uid, pattern),
+                [
+                    (
+                        plant_uid,
+                        d["day"],
+                        d["baseline_version"],
+                        d["points"],
+                        d["loss_kwh"],
+                        d["ratios"],
+                        d["fouling_index"],
+                        d["energy_loss_kwh_per_day"],
+                    )
+                    for d in days
+                ],
             )
-            conn.commit()
-            return cur.rowcount
-        finally:
-            conn.close()
+
+    def load_fouling_history(
+        self, plant_uid: str, start_day: Optional[str] = None, end_day: Optional[str] = None
+    ) -> List[Dict]:
+        """Daily fouling rows for a plant (optionally start..end inclusive), oldest first."""
+        sql = """
+            SELECT day, baseline_version, points, loss_kwh, ratios, fouling_index, energy_loss_kwh_per_day, saved_at
+            FROM fouling_history WHERE plant_uid = ?
+        """
+        params: List[Any] = [plant_uid]
+        if start_day is not None:
+            sql += " AND day >= ?"
+            params.append(start_day)
+        if end_day is not None:
+            sql += " AND day <= ?"
+            params.append(end_day)
+        conn = self._connection()
+        columns = ["day", "baseline_version", "points", "loss_kwh", "ratios", "fouling_index", "energy_loss_kwh_per_day", "saved_at"]
+        return [dict(zip(columns, row)) for row in conn.execute(sql + " ORDER BY day", params)]
+
+    def last_fouling_day(self, plant_uid: str) -> Optional[str]:
+        """Latest day with a fouling history row, or None."""
+        conn = self._connection()
+        row = conn.execute("SELECT MAX(day) FROM fouling_history WHERE plant_uid = ?", (plant_uid,)).fetchone()
+        return row[0]
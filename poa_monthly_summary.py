@@ -1,28 +1,36 @@
 """Generate monthly POA summary for all plants"""
-import sqlite3
 import json
 from datetime import datetime
 import pandas as pd
 
-conn = sqlite3.connect('plant_registry.sqlite')
+from plant_store import PlantStore
+
+POA_DEVICE = 'POA:SOLARGIS:WEIGHTED'
+
+# Monthly figures come from the rollup table, bucketed by UTC month (not the
+# local date in each reading's timestamp); rollups are built on first use for
+# databases written before they existed
+store = PlantStore('plant_registry.sqlite')
 
-# Get all plants with POA data
-cur = conn.cursor()
-cur.execute("""
-    SELECT DISTINCT p.plant_uid, p.alias as name, p.dc_size_kw as dc_capacity
-    FROM plants p
-    WHERE p.plant_uid IN (
-        SELECT DISTINCT plant_uid 
-        FROM readings 
-        WHERE emig_id = 'POA:SOLARGIS:WEIGHTED'
-    )
-    ORDER BY p.alias
-""")
 
-plants_with_poa = cur.fetchall()
+def load_monthly_poa(plant_uid):
+    _, rows = store.load_rollups(plant_uid, 'month', emig_ids=[POA_DEVICE], metrics=['poaIrradiance'])
+    if not rows:
+        store.rebuild_rollups(plant_uid)
+        _, rows = store.load_rollups(plant_uid, 'month', emig_ids=[POA_DEVICE], metrics=['poaIrradiance'])
+    return rows
+
+
+# Get all plants with POA data
+plants_with_poa = [
+    (plant['plant_uid'], plant['alias'], plant['dc_size_kw'])
+    for plant in store.list_all()
+    if POA_DEVICE in store.list_emig_ids(plant['plant_uid'])
+]
 
 print(f"Monthly POA Irradiance Summary")
 print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+print("Months are calendar months in UTC")
 print("="*120)
 print(f"\nFound {len(plants_with_poa)} plants with POA data\n")
 
@@ -47,22 +55,10 @@ for plant_uid, plant_name, dc_capacity in plants_with_poa:
     print("-" * 120)
     
     # Get monthly totals
-    cur.execute("""
-        SELECT 
-            strftime('%Y-%m', ts) as month,
-            COUNT(*) as readings,
-            SUM(json_extract(payload, '$.poaIrradiance.value')) as total_poa,
-            AVG(json_extract(payload, '$.poaIrradiance.value')) as avg_poa,
-            MIN(json_extract(payload, '$.poaIrradiance.value')) as min_poa,
-            MAX(json_extract(payload, '$.poaIrradiance.value')) as max_poa
-        FROM readings
-        WHERE plant_uid = ?
-          AND emig_id = 'POA:SOLARGIS:WEIGHTED'
-        GROUP BY strftime('%Y-%m', ts)
-        ORDER BY month
-    """, (plant_uid,))
-    
-    monthly_results = cur.fetchall()
+    monthly_results = [
+        (pd.Timestamp(bucket, unit='s').strftime('%Y-%m'), n, total, total / n, min_value, max_value)
+        for _, bucket, _, n, total, min_value, max_value, _ in load_monthly_poa(plant_uid)
+    ]
     
     print(f"{'Month':<15} {'Total POA':>12} {'Avg POA':>12} {'Min POA':>12} {'Max POA':>12} {'Readings':>10}")
     print(f"{'':15} {'(kWh/m²)':>12} {'(kWh/m²)':>12} {'(kWh/m²)':>12} {'(kWh/m²)':>12} {'(count)':>10}")
@@ -111,7 +107,7 @@ if not df.empty:
     df.to_csv(csv_file, index=False)
     print(f"\n\nDetailed data saved to: {csv_file}")
 
-conn.close()
+store.close()
 
 print("\n" + "="*120)
 print("Summary complete!")
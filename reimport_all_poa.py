@@ -1,15 +1,7 @@
 """Reimport all POA data for all plants"""
 import os
-import sys
-import io
 from plant_store import PlantStore
-from solargis_poa_import import import_poa_for_plant_multi_folder, store_poa_in_db
-
-store = PlantStore('plant_registry.sqlite')
-base_dir = os.path.expanduser("~/OneDrive - AMPYR IDEA UK Ltd/Monthly Excom/Monthly SolarGIS data")
-
-all_items = os.listdir(base_dir)
-solargis_folders = [os.path.join(base_dir, item) for item in all_items if os.path.isdir(os.path.join(base_dir, item))]
+from solargis_poa_import import reimport_poa_parallel
 
 # Manual list of plants with known names
 plants = [
@@ -28,59 +20,46 @@ plants = [
     ('BAE Fylde', 'AMP:00002'),
 ]
 
-print(f"Reimporting POA data for {len(plants)} plants...")
-print(f"Date range: June 2025 - November 2025")
-print("="*80)
 
-imported_count = 0
-failed_count = 0
+def main():
+    store = PlantStore('plant_registry.sqlite')
+    base_dir = os.path.expanduser("~/OneDrive - AMPYR IDEA UK Ltd/Monthly Excom/Monthly SolarGIS data")
+
+    all_items = os.listdir(base_dir)
+    solargis_folders = [os.path.join(base_dir, item) for item in all_items if os.path.isdir(os.path.join(base_dir, item))]
+
+    print(f"Reimporting POA data for {len(plants)} plants...")
+    print(f"Date range: June 2025 - November 2025")
+    print("="*80)
 
-for plant_name, plant_uid in plants:
-    print(f"\n[{imported_count + failed_count + 1}/{len(plants)}] {plant_name}...")
-    
-    # Delete old POA data
-    deleted = store.delete_devices_by_pattern(plant_uid, 'POA:%')
-    if deleted > 0:
-        print(f"  Deleted {deleted} old POA records")
-    
-    # Suppress verbose output
-    old_stdout = sys.stdout
-    sys.stdout = io.StringIO()
-    
-    try:
-        poa_df = import_poa_for_plant_multi_folder(
-            plant_name=plant_name,
-            plant_uid=plant_uid,
-            solargis_folders=solargis_folders,
-            start_date="20250601",
-            end_date="20251130",
-            store=store,
-            fuzzy_threshold=0.5
-        )
-        
-        sys.stdout = old_stdout
-        
-        if poa_df is not None and not poa_df.empty:
-            # Store in database
-            old_stdout = sys.stdout
-            sys.stdout = io.StringIO()
-            store_poa_in_db(store, plant_uid, poa_df)
-            sys.stdout = old_stdout
-            
-            # Get updated capacity
-            updated_plant = store.load(plant_name)
-            dc = updated_plant.get('dc_size_kw', 0)
-            orientations = len(poa_df[['azimuth', 'slope']].drop_duplicates())
-            print(f"  ✓ Imported {len(poa_df)} records, {orientations} orientations, DC: {dc:.1f} kW")
+    # Plants are read/processed in parallel; this process is the only DB writer
+    results = reimport_poa_parallel(
+        store,
+        plants,
+        solargis_folders,
+        start_date="20250601",
+        end_date="20251130",
+        fuzzy_threshold=0.5,
+    )
+
+    imported_count = 0
+    failed_count = 0
+    for r in results:
+        if r['status'] == 'ok':
+            dc = store.load(r['alias']) or {}
+            print(f"  ✓ {r['alias']}: {r['records']} records, {r['orientations']} orientations, DC: {dc.get('dc_size_kw') or 0:.1f} kW")
             imported_count += 1
+        elif r['status'] == 'no_data':
+            print(f"  ⚠ {r['alias']}: No POA data found")
+            failed_count += 1
         else:
-            print(f"  ⚠ No POA data found")
+            print(f"  ✗ {r['alias']}: Error: {r['error']}")
             failed_count += 1
-            
-    except Exception as e:
-        sys.stdout = old_stdout
-        print(f"  ✗ Error: {str(e)}")
-        failed_count += 1
 
-print("\n" + "="*80)
-print(f"Import complete: {imported_count} succeeded, {failed_count} failed/no data")
+    print("\n" + "="*80)
+    print(f"Import complete: {imported_count} succeeded, {failed_count} failed/no data")
+
+
+# The guard matters: worker processes re-import this module on spawn platforms
+if __name__ == "__main__":
+    main()
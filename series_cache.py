@@ -0,0 +1,222 @@
+"""
+Memory-mapped per-device metric series.
+
+Each (plant, device, metric) series from PlantStore is materialised into a
+raw ``float32`` file on a fixed-interval UTC grid (NaN where there is no
+reading) plus a small JSON index.  Reads return ``np.memmap`` slices, so
+analyses can take years of data as zero-copy views without SQLite or JSON
+decoding.
+
+Refreshes are incremental: each month of a series has a fingerprint over
+its values and timestamps (``PlantStore.metric_month_fingerprints``), and
+only months whose fingerprint changed since the last refresh are re-read
+from ``readings_typed``.  That also picks up re-imports of past months,
+including ones that only shift readings in time, not just newly appended
+data.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from plant_store import METRIC_COLUMNS, PlantStore
+
+SERIES_CACHE_DIR = os.environ.get(
+    "SERIES_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".series_cache")
+)
+SERIES_CACHE_VERSION = 2
+DEFAULT_INTERVAL_S = 1800
+
+
+def _next_month_epoch(epoch: int) -> int:
+    dt = datetime.fromtimestamp(epoch, timezone.utc)
+    year, month = (dt.year + 1, 1) if dt.month == 12 else (dt.year, dt.month + 1)
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _month_runs(months: List[int]) -> List[Tuple[int, int]]:
+    """Merge sorted month-start epochs into contiguous [start, end) epoch runs."""
+    runs: List[Tuple[int, int]] = []
+    for start in sorted(months):
+        end = _next_month_epoch(start)
+        if runs and runs[-1][1] == start:
+            runs[-1] = (runs[-1][0], end)
+        else:
+            runs.append((start, end))
+    return runs
+
+
+@dataclass
+class CachedSeries:
+    """A slice of a cached series: ``values[i]`` covers ``start_epoch + i * interval_s``."""
+
+    start_epoch: int
+    interval_s: int
+    values: np.ndarray
+
+    def times(self) -> np.ndarray:
+        """UTC slot start times as datetime64[s]."""
+        return (
+            np.datetime64(self.start_epoch, "s")
+            + np.arange(len(self.values), dtype="int64") * np.timedelta64(self.interval_s, "s")
+        )
+
+    def to_series(self) -> pd.Series:
+        index = pd.DatetimeIndex(self.times(), name="ts").tz_localize("UTC")
+        return pd.Series(self.values, index=index, copy=False)
+
+
+class SeriesCache:
+    """
+    On-disk cache of dense metric series for PlantStore devices.
+
+    Parameters
+    ----------
+    store : PlantStore
+        Source of readings
+    cache_dir : str, optional
+        Directory for the ``.f32`` / ``.json`` files (defaults to
+        ``SERIES_CACHE_DIR``)
+    interval_s : int
+        Grid spacing in seconds; readings are averaged into the slot they
+        fall in
+    """
+
+    def __init__(self, store: PlantStore, cache_dir: Optional[str] = None, interval_s: int = DEFAULT_INTERVAL_S) -> None:
+        if 86400 % interval_s:
+            raise ValueError("interval_s must divide a day evenly")
+        self.store = store
+        self.cache_dir = cache_dir or SERIES_CACHE_DIR
+        self.interval_s = interval_s
+
+    def _paths(self, plant_uid: str, emig_id: str, metric: str) -> Tuple[str, str]:
+        key = f"{os.path.abspath(self.store.db_path)}|{plant_uid}|{emig_id}|{metric}|{self.interval_s}"
+        base = os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest())
+        return f"{base}.f32", f"{base}.json"
+
+    def _read_index(self, index_path: str, data_path: str) -> Optional[Dict]:
+        if not os.path.exists(index_path) or not os.path.exists(data_path):
+            return None
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != SERIES_CACHE_VERSION or meta.get("interval_s") != self.interval_s:
+            return None
+        if os.path.getsize(data_path) != meta["length"] * 4:
+            return None
+        return meta
+
+    def _write_index(self, index_path: str, meta: Dict) -> None:
+        # Write then rename so concurrent readers never see a partial index
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, index_path)
+
+    def _month_fingerprints(self, plant_uid: str, emig_id: str, metric: str) -> Dict[str, List]:
+        months = self.store.metric_month_fingerprints(plant_uid, emig_id, metric)
+        return {str(bucket): fp for bucket, fp in months.items()}
+
+    def refresh(self, plant_uid: str, emig_id: str, metric: str) -> int:
+        """
+        Bring one cached series up to date with the store.
+
+        Returns the number of months re-read (0 when already current).
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric column: {metric}")
+        data_path, index_path = self._paths(plant_uid, emig_id, metric)
+        meta = self._read_index(index_path, data_path)
+        months = self._month_fingerprints(plant_uid, emig_id, metric)
+        if not months:
+            for path in (data_path, index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return 0
+
+        start = min(int(b) for b in months)
+        end = _next_month_epoch(max(int(b) for b in months))
+        length = (end - start) // self.interval_s
+        if meta is None or start < meta["start_epoch"]:
+            # New series, or data before the cached grid: start a fresh file
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.full(length, np.nan, dtype=np.float32).tofile(data_path)
+            meta = {"version": SERIES_CACHE_VERSION, "interval_s": self.interval_s, "start_epoch": start, "length": length, "months": {}}
+        elif start + length * self.interval_s > meta["start_epoch"] + meta["length"] * self.interval_s:
+            # Grow the file with NaN slots for later months
+            extra = (start + length * self.interval_s - meta["start_epoch"]) // self.interval_s - meta["length"]
+            with open(data_path, "ab") as f:
+                np.full(extra, np.nan, dtype=np.float32).tofile(f)
+            meta["length"] += extra
+
+        changed = [int(b) for b, fp in months.items() if meta["months"].get(b) != fp]
+        removed = [int(b) for b in meta["months"] if b not in months]
+        if changed or removed:
+            values = np.memmap(data_path, dtype=np.float32, mode="r+", shape=(meta["length"],))
+            origin = meta["start_epoch"]
+            for run_start, run_end in _month_runs(changed + removed):
+                lo = (run_start - origin) // self.interval_s
+                hi = (run_end - origin) // self.interval_s
+                values[lo:hi] = np.nan
+                _, rows = self.store.load_typed_readings(
+                    plant_uid,
+                    [emig_id],
+                    datetime.fromtimestamp(run_start, timezone.utc).isoformat(),
+                    datetime.fromtimestamp(run_end - 1, timezone.utc).isoformat(),
+                    [metric],
+                )
+                if not rows:
+                    continue
+                epochs = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+                vals = np.array([r[3] for r in rows], dtype=np.float64)
+                ok = ~np.isnan(vals)
+                slots = (epochs[ok] - run_start) // self.interval_s
+                counts = np.bincount(slots, minlength=hi - lo)
+                sums = np.bincount(slots, weights=vals[ok], minlength=hi - lo)
+                filled = counts > 0
+                values[lo:hi][filled] = (sums[filled] / counts[filled]).astype(np.float32)
+            values.flush()
+            del values
+        meta["months"] = months
+        self._write_index(index_path, meta)
+        return len(changed) + len(removed)
+
+    def series(
+        self,
+        plant_uid: str,
+        emig_id: str,
+        metric: str,
+        start_ts: Optional[str] = None,
+        end_ts: Optional[str] = None,
+        refresh: bool = True,
+    ) -> Optional[CachedSeries]:
+        """
+        Read-only view of a cached series, optionally limited to start..end
+        (ISO timestamps, inclusive slots).  Refreshes first unless
+        ``refresh=False``.  Returns None when the device has no data for
+        ``metric``.
+        """
+        if refresh:
+            self.refresh(plant_uid, emig_id, metric)
+        data_path, index_path = self._paths(plant_uid, emig_id, metric)
+        meta = self._read_index(index_path, data_path)
+        if meta is None or meta["length"] == 0:
+            return None
+        values = np.memmap(data_path, dtype=np.float32, mode="r", shape=(meta["length"],))
+        origin = meta["start_epoch"]
+        lo, hi = 0, meta["length"]
+        if start_ts is not None:
+            lo = min(max(0, -(-(int(pd.Timestamp(start_ts, tz="UTC").timestamp()) - origin) // self.interval_s)), hi)
+        if end_ts is not None:
+            hi = min(max(lo, (int(pd.Timestamp(end_ts, tz="UTC").timestamp()) - origin) // self.interval_s + 1), hi)
+        return CachedSeries(origin + lo * self.interval_s, self.interval_s, values[lo:hi])
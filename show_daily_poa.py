@@ -4,8 +4,6 @@ Display monthly POA totals with daily breakdown for manual verification
 """
 
 import pandas as pd
-import sqlite3
-import json
 from plant_store import PlantStore
 
 def get_monthly_breakdown(store, plant_name, month_start, month_end):
@@ -21,34 +19,17 @@ def get_monthly_breakdown(store, plant_name, month_start, month_end):
     if not weighted_poa:
         return None
     
-    # Query database
-    conn = sqlite3.connect(store.db_path)
-    try:
-        cur = conn.execute(
-            """
-            SELECT ts, payload FROM readings
-            WHERE plant_uid = ? AND emig_id = ?
-            AND ts BETWEEN ? AND ?
-            ORDER BY ts
-            """,
-            (plant_uid, weighted_poa[0], month_start, month_end)
-        )
-        
-        day_totals = {}
-        for ts, payload_json in cur.fetchall():
-            payload = json.loads(payload_json)
-            poa_irr = payload.get('poaIrradiance', {})
-            poa_w = poa_irr.get('value', 0)
-            poa_kwh = poa_w * 0.5 / 1000.0
-            
-            date = ts[:10]
-            if date not in day_totals:
-                day_totals[date] = 0
-            day_totals[date] += poa_kwh
-        
-        return day_totals
-    finally:
-        conn.close()
+    # Daily insolation from the rollup table (Wh/m² -> kWh/m²)
+    query = dict(emig_ids=weighted_poa[:1], metrics=['poaIrradiance'])
+    _, rows = store.load_rollups(plant_uid, 'day', month_start, month_end, **query)
+    if not rows:
+        store.rebuild_rollups(plant_uid)
+        _, rows = store.load_rollups(plant_uid, 'day', month_start, month_end, **query)
+    
+    return {
+        pd.Timestamp(bucket, unit='s').strftime('%Y-%m-%d'): energy / 1000.0
+        for _, bucket, _, _, _, _, _, energy in rows
+    }
 
 def main():
     store = PlantStore('plant_registry.sqlite')
@@ -71,7 +52,7 @@ def main():
             print("No data")
             continue
         
-        print(f"{'Date':<15} {'Daily POA (kWh/m²)':<20}")
+        print(f"{'Date (UTC)':<15} {'Daily POA (kWh/m²)':<20}")
         print('-'*80)
         
         monthly_total = 0
@@ -11,13 +11,24 @@ Features:
 - Support for various SolarGIS CSV formats
 """
 
+import codecs
+import hashlib
+import io
+import json
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from datetime import datetime
 from difflib import SequenceMatcher
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from plant_csv_mapping import csv_names_for_plant
+
 
 def fuzzy_match_filename(plant_name: str, filenames: List[str], threshold: float = 0.6) -> Optional[str]:
     """
@@ -116,15 +127,16 @@ def detect_solargis_format(df: pd.DataFrame) -> Dict[str, any]:
         else:
             orientation_df = df[[azimuth_col, slope_col]].drop_duplicates()
         
-        for _, row in orientation_df.iterrows():
-            azimuth = row[azimuth_col]
-            slope = row[slope_col]
-            capacity = row[capacity_col] if capacity_col and pd.notna(row.get(capacity_col)) else None
-            unique_orientations.append({
-                'azimuth': azimuth,
-                'slope': slope,
-                'capacity': capacity
-            })
+        if capacity_col:
+            capacities = orientation_df[capacity_col].astype(object).where(orientation_df[capacity_col].notna(), None)
+        else:
+            capacities = [None] * len(orientation_df)
+        unique_orientations = [
+            {'azimuth': azimuth, 'slope': slope, 'capacity': capacity}
+            for azimuth, slope, capacity in zip(
+                orientation_df[azimuth_col].tolist(), orientation_df[slope_col].tolist(), list(capacities)
+            )
+        ]
     
     # Find all GTI/POA columns
     import re
@@ -231,46 +243,269 @@ def detect_solargis_format(df: pd.DataFrame) -> Dict[str, any]:
     return mapping
 
 
-def load_solargis_csv(filepath: str) -> Tuple[pd.DataFrame, Dict[str, any]]:
+# On-disk cache of parsed SolarGIS files.  Entries are keyed by absolute path
+# and invalidated when the file's mtime or size changes; bump the version when
+# the parsing/format detection logic or the entry layout changes.  Entries are
+# plain .npz archives (one array per column, JSON metadata) read back with
+# allow_pickle=False, so a shared cache directory cannot inject code.
+SOLARGIS_CACHE_DIR = os.environ.get(
+    "SOLARGIS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".solargis_cache")
+)
+SOLARGIS_CACHE_VERSION = 3
+
+# Part of the per-plant match fingerprint; bump when the cached candidates change meaning
+SOLARGIS_MATCH_VERSION = 2
+
+
+def _solargis_cache_path(filepath: str, cache_dir: str) -> str:
+    digest = hashlib.sha1(os.path.abspath(filepath).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.npz")
+
+
+def _solargis_cache_key(filepath: str) -> List:
+    stat = os.stat(filepath)
+    return [os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, SOLARGIS_CACHE_VERSION]
+
+
+def _json_scalar(value):
+    # NumPy scalars in the format mapping (e.g. capacities from pd.to_numeric)
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot cache {type(value).__name__} in a SolarGIS mapping")
+
+
+def _read_solargis_cache(filepath: str, cache_dir: str) -> Optional[Tuple[pd.DataFrame, Dict[str, any]]]:
+    cache_path = _solargis_cache_path(filepath, cache_dir)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as entry:
+            meta = json.loads(str(entry["meta"]))
+            if meta["key"] != _solargis_cache_key(filepath):
+                return None
+            data = {}
+            for i, (col, dtype) in enumerate(zip(meta["columns"], meta["dtypes"])):
+                values = entry[f"c{i}"]
+                if f"m{i}" in entry.files:
+                    # Text column: restore missing cells from the NaN mask
+                    column = pd.Series(values, dtype=object)
+                    column[entry[f"m{i}"]] = np.nan
+                    values = column.astype(dtype)
+                data[col] = values
+        return pd.DataFrame(data, columns=meta["columns"]), meta["mapping"]
+    except Exception:
+        # Corrupt or incompatible entry - re-parse and overwrite
+        return None
+
+
+def _write_solargis_cache(filepath: str, cache_dir: str, df: pd.DataFrame, mapping: Dict[str, any]) -> None:
+    arrays: Dict[str, np.ndarray] = {}
+    for i, col in enumerate(df.columns):
+        column = df[col]
+        if column.dtype.kind in "biuf":
+            arrays[f"c{i}"] = column.to_numpy()
+        else:
+            missing = column.isna().to_numpy()
+            arrays[f"c{i}"] = column.where(~missing, "").astype(str).to_numpy(dtype=str)
+            arrays[f"m{i}"] = missing
+    meta = {
+        "key": _solargis_cache_key(filepath),
+        "columns": [str(col) for col in df.columns],
+        "dtypes": [str(dtype) for dtype in df.dtypes],
+        "mapping": mapping,
+    }
+    try:
+        arrays["meta"] = np.array(json.dumps(meta, default=_json_scalar))
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = _solargis_cache_path(filepath, cache_dir)
+        # Write then rename so parallel importers never see a partial entry
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError) as e:
+        print(f"   Could not cache {os.path.basename(filepath)}: {e}")
+
+
+def load_solargis_csv(
+    filepath: str,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, any]]:
     """
     Load a SolarGIS CSV file and detect its format.
     
+    Parsed results are cached on disk (see ``SOLARGIS_CACHE_DIR``) so files
+    that have not changed since the last import skip CSV parsing entirely.
+    
     Parameters
     ----------
     filepath : str
         Path to the SolarGIS CSV file
+    use_cache : bool
+        Read/write the parsed-file cache
+    cache_dir : str, optional
+        Cache directory (defaults to ``SOLARGIS_CACHE_DIR``)
     
     Returns
     -------
     Tuple[pd.DataFrame, Dict[str, any]]
         Loaded dataframe and column mapping
     """
-    # Try different encodings and skip row combinations
-    for encoding in ['utf-8', 'latin1', 'cp1252']:
-        for skiprows in [0, 1, 2, 3]:
+    cache_dir = cache_dir or SOLARGIS_CACHE_DIR
+    if use_cache:
+        cached = _read_solargis_cache(filepath, cache_dir)
+        if cached is not None:
+            df, mapping = cached
+            print(f"  Loaded {os.path.basename(filepath)} (cached)")
+            return df, mapping
+    
+    df, mapping = _parse_solargis_csv(filepath)
+    if use_cache:
+        _write_solargis_cache(filepath, cache_dir, df, mapping)
+    return df, mapping
+
+
+# Bytes read by the format sniffer; enough for the preamble, header and a
+# few hundred data rows of any SolarGIS export seen so far.
+SNIFF_BYTES = 64 * 1024
+
+
+def _solargis_usecols(columns: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Pick the columns ``detect_solargis_format`` can use (timestamp, GTI/POA,
+    azimuth, slope, capacity, name) and their dtypes, preserving file order.
+    """
+    timestamp_patterns = ['date', 'time', 'datetime', 'timestamp', 'utc']
+    skip_patterns = ['azimuth', 'slope', 'angle', 'name', '_low', '_high', '_p90', '_p10', 'cap']
+    ts_col = next((c for c in columns if any(p in c.lower() for p in timestamp_patterns)), columns[0])
+    
+    usecols: List[str] = []
+    dtypes: Dict[str, str] = {}
+    for col in columns:
+        col_lower = col.lower()
+        if col == ts_col:
+            dtypes[col] = 'str'
+        elif 'azimuth' in col_lower or 'slope' in col_lower or 'tilt' in col_lower:
+            dtypes[col] = 'float64'
+        elif 'array_cap' in col_lower:
+            dtypes[col] = 'float64'
+        elif 'name' in col_lower:
+            dtypes[col] = 'str'
+        elif not any(skip in col_lower for skip in skip_patterns) and (
+            col_lower in ['gti', 'ghi', 'poa']
+            or any(pattern in col_lower for pattern in ['irradiance', 'g(i)', 'w/m'])
+            or 'array' in col_lower
+        ):
+            # GTI columns may carry a capacity label in the first row, so
+            # leave their dtype to the parser
+            pass
+        else:
+            continue
+        usecols.append(col)
+    return usecols, dtypes
+
+
+def sniff_solargis_csv(filepath: str) -> Dict[str, any]:
+    """
+    Work out how to parse a SolarGIS CSV from its first few KB.
+    
+    Returns a dict with ``encoding``, ``skiprows``, ``sep``, ``usecols`` and
+    ``dtype``; raises ValueError if no header offset/delimiter yields a
+    recognisable SolarGIS layout.
+    """
+    with open(filepath, 'rb') as f:
+        sample = f.read(SNIFF_BYTES)
+        complete = not f.read(1)
+    
+    if sample.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    else:
+        encoding = 'utf-8'
+    try:
+        # Incremental decode tolerates a multi-byte character cut at the end
+        text = codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+    except UnicodeDecodeError:
+        encoding = 'latin1'
+        text = sample.decode(encoding)
+    
+    lines = text.splitlines()
+    if not complete and len(lines) > 1:
+        lines = lines[:-1]  # last line may be truncated
+    
+    for skiprows in [0, 1, 2, 3]:
+        for sep in [',', ';', '\t']:
             try:
-                df = pd.read_csv(filepath, encoding=encoding, skiprows=skiprows)
-                
-                # Check if we got valid data
-                if len(df) > 0 and len(df.columns) > 1:
-                    mapping = detect_solargis_format(df)
-                    
-                    # Valid if we at least found timestamp and either arrays or split_by_orientation
-                    if 'timestamp' in mapping and (mapping.get('arrays') or mapping.get('split_by_orientation')):
-                        filename = os.path.basename(filepath)
-                        print(f"  Loaded {filename}")
-                        print(f"    - Encoding: {encoding}, Skip rows: {skiprows}")
-                        if mapping.get('split_by_orientation'):
-                            print(f"    - Found {len(mapping['orientations'])} orientation(s) (row-based)")
-                        else:
-                            print(f"    - Found {len(mapping['arrays'])} array(s)")
-                        return df, mapping
+                head = pd.read_csv(io.StringIO("\n".join(lines)), skiprows=skiprows, sep=sep)
             except Exception:
                 continue
-    
+            if len(head) == 0 or len(head.columns) <= 1:
+                continue
+            mapping = detect_solargis_format(head)
+            if 'timestamp' in mapping and (mapping.get('arrays') or mapping.get('split_by_orientation')):
+                usecols, dtypes = _solargis_usecols([str(c) for c in head.columns])
+                return {
+                    'encoding': encoding,
+                    'skiprows': skiprows,
+                    'sep': sep,
+                    'usecols': usecols,
+                    'dtype': dtypes,
+                }
     raise ValueError(f"Could not parse SolarGIS file: {filepath}")
 
 
+def _read_solargis_frame(filepath: str, layout: Dict[str, any]) -> pd.DataFrame:
+    read_kwargs = dict(
+        encoding=layout['encoding'],
+        skiprows=layout['skiprows'],
+        sep=layout['sep'],
+        usecols=layout['usecols'],
+    )
+    try:
+        return pd.read_csv(filepath, dtype=layout['dtype'], **read_kwargs)
+    except UnicodeDecodeError:
+        raise
+    except ValueError:
+        # A metadata column with non-numeric cells further down the file
+        return pd.read_csv(filepath, **read_kwargs)
+
+
+def _parse_solargis_csv(filepath: str) -> Tuple[pd.DataFrame, Dict[str, any]]:
+    """Parse a SolarGIS CSV once, using the layout found by ``sniff_solargis_csv``."""
+    layout = sniff_solargis_csv(filepath)
+    try:
+        df = _read_solargis_frame(filepath, layout)
+    except UnicodeDecodeError:
+        # The sample decoded as UTF-8 but a later byte does not
+        layout['encoding'] = 'latin1'
+        df = _read_solargis_frame(filepath, layout)
+    
+    mapping = detect_solargis_format(df)
+    if not ('timestamp' in mapping and (mapping.get('arrays') or mapping.get('split_by_orientation'))):
+        raise ValueError(f"Could not parse SolarGIS file: {filepath}")
+    
+    filename = os.path.basename(filepath)
+    print(f"  Loaded {filename}")
+    print(f"    - Encoding: {layout['encoding']}, Skip rows: {layout['skiprows']}, Delimiter: {layout['sep']!r}")
+    if mapping.get('split_by_orientation'):
+        print(f"    - Found {len(mapping['orientations'])} orientation(s) (row-based)")
+    else:
+        print(f"    - Found {len(mapping['arrays'])} array(s)")
+    return df, mapping
+
+
+def _merge_poa_chunks(chunks: List[pd.Series]) -> pd.Series:
+    """
+    Combine per-file POA series for one orientation in a single pass.
+    
+    Where periods overlap, the value from the earliest file wins.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    combined = pd.concat(chunks)
+    return combined[~combined.index.duplicated(keep='first')].sort_index()
+
+
 def calculate_capacity_weighted_poa(
     dfs_and_mappings: List[Tuple[pd.DataFrame, Dict[str, any]]],
     start_date: str,
@@ -309,7 +544,9 @@ def calculate_capacity_weighted_poa(
     end_dt = pd.to_datetime(end_date, format='%Y%m%d', utc=True) + pd.Timedelta(days=1)
     
     # Group arrays by azimuth/slope combination
-    orientation_groups = {}  # (azimuth, slope) -> {capacity: kW, poa_series: Series, capacity_set: bool}
+    # (azimuth, slope) -> {capacity: kW, chunks: [resampled Series per file], capacity_set: bool}
+    # Chunks are merged once at the end, so N monthly files cost O(N), not O(N^2)
+    orientation_groups = {}
     
     print(f"\n  Processing arrays and grouping by orientation:")
     
@@ -339,48 +576,41 @@ def calculate_capacity_weighted_poa(
                 print(f"    File {file_idx}: No data in date range")
                 continue
             
-            # Process each orientation - build unique array keys and deduplicate
-            for orient in orientations:
-                azimuth = float(orient['azimuth'])
-                slope = float(orient['slope'])
-                
-                # Filter rows for this orientation
-                orient_mask = (df_filtered[azimuth_col] == azimuth) & (df_filtered[slope_col] == slope)
-                orient_data = df_filtered[orient_mask].copy()
-                
-                if orient_data.empty:
-                    continue
-                
-                # Build unique array key (name + capacity + azimuth + slope)
-                if name_col and name_col in orient_data.columns:
-                    orient_data['ArrayKey'] = (
-                        orient_data[name_col].astype(str).str.strip() + "|" +
-                        orient_data[capacity_col].astype(str) + "|" +
-                        orient_data[azimuth_col].astype(str).str.strip() + "|" +
-                        orient_data[slope_col].astype(str).str.strip()
-                    )
-                else:
-                    # No name column, use capacity + orientation as key
-                    orient_data['ArrayKey'] = (
-                        orient_data[capacity_col].astype(str) + "|" +
-                        orient_data[azimuth_col].astype(str).str.strip() + "|" +
-                        orient_data[slope_col].astype(str).str.strip()
-                    )
-                
-                # Deduplicate: drop duplicate readings per array per timestamp
-                orient_data_unique = orient_data.drop_duplicates(subset=['ArrayKey', 'ts'])
-                
-                # Calculate total capacity for this orientation (sum all unique arrays)
-                unique_arrays = orient_data_unique.groupby('ArrayKey')[capacity_col].first()
-                total_capacity = unique_arrays.sum()
-                
-                # GTI is irradiance (kWh/m) - same for all arrays with same orientation
-                # Take mean in case of slight variations (should be same value)
-                gti_by_timestamp = orient_data_unique.groupby('ts')[gti_col].mean()
+            # Identify each physical array (name + capacity + orientation) with an
+            # integer code rather than a concatenated key string
+            if capacity_col is None:
+                capacity_col = '_capacity'
+                df_filtered[capacity_col] = np.nan
+            key_cols = [azimuth_col, slope_col, capacity_col]
+            if name_col and name_col in df_filtered.columns:
+                name_codes, name_uniques = pd.factorize(df_filtered[name_col])
+                # Names differing only by surrounding whitespace are the same array
+                stripped_codes, _ = pd.factorize(pd.Index(name_uniques.astype(str)).str.strip())
+                df_filtered['_name'] = np.where(name_codes >= 0, stripped_codes[name_codes], -1)
+                key_cols = ['_name'] + key_cols
+            df_filtered['_array'] = df_filtered.groupby(key_cols, sort=False, dropna=False).ngroup()
+            df_filtered[gti_col] = pd.to_numeric(df_filtered[gti_col], errors='coerce')
+            
+            # Deduplicate: drop duplicate readings per array per timestamp
+            unique_rows = df_filtered.drop_duplicates(subset=['_array', 'ts'])
+            
+            # One grouped pass per quantity, keyed by orientation (first-seen order)
+            orient_keys = [azimuth_col, slope_col]
+            array_caps = unique_rows.groupby(orient_keys + ['_array'], sort=False)[capacity_col].first()
+            orient_caps = array_caps.groupby(level=[0, 1], sort=False).agg(['sum', 'size'])
+            
+            # GTI is irradiance (kWh/m) - same for all arrays with same orientation
+            # Take mean in case of slight variations (should be same value)
+            gti_means = unique_rows.groupby(orient_keys + ['ts'], sort=False)[gti_col].mean()
+            
+            for (azimuth, slope), gti_by_timestamp in gti_means.groupby(level=[0, 1], sort=False):
+                total_capacity, n_arrays = orient_caps.loc[(azimuth, slope)]
+                azimuth = float(azimuth)
+                slope = float(slope)
+                gti_by_timestamp = gti_by_timestamp.droplevel([0, 1]).sort_index()
                 
                 # CSV values are kWh/m per 15-min (energy accumulated in that period)
                 # Resample to 30-min by summing pairs to get energy per 30-min period
-                gti_by_timestamp = pd.to_numeric(gti_by_timestamp, errors='coerce')
                 
                 # Normalize timestamps to remove seconds offset (e.g., 00:00:30 -> 00:00:00)
                 # This ensures proper alignment during resampling
@@ -395,23 +625,15 @@ def calculate_capacity_weighted_poa(
                 if orientation_key not in orientation_groups:
                     orientation_groups[orientation_key] = {
                         'capacity': total_capacity,
-                        'poa_series': None,
+                        'chunks': [],
                         'capacity_set': True
                     }
                 
                 # Don't add capacity from other months - capacity is static
-                # Just update POA series by concatenating/combining time series data
-                if orientation_groups[orientation_key]['poa_series'] is None:
-                    orientation_groups[orientation_key]['poa_series'] = poa_resampled
-                else:
-                    # Concatenate time series data (different time periods from different months)
-                    existing = orientation_groups[orientation_key]['poa_series']
-                    combined = pd.concat([existing, poa_resampled])
-                    # Remove duplicates keeping first, then sort by index
-                    combined = combined[~combined.index.duplicated(keep='first')].sort_index()
-                    orientation_groups[orientation_key]['poa_series'] = combined
+                # Just collect this period's series; merged after all files are read
+                orientation_groups[orientation_key]['chunks'].append(poa_resampled)
                 
-                print(f"      - Azimuth={azimuth}, Slope={slope}: {total_capacity:.1f} kW ({len(unique_arrays)} unique arrays)")
+                print(f"      - Azimuth={azimuth}, Slope={slope}: {total_capacity:.1f} kW ({int(n_arrays)} unique arrays)")
             
             continue
         
@@ -466,21 +688,13 @@ def calculate_capacity_weighted_poa(
             if orientation_key not in orientation_groups:
                 orientation_groups[orientation_key] = {
                     'capacity': capacity,
-                    'poa_series': None,
+                    'chunks': [],
                     'capacity_set': True
                 }
             
             # Don't add capacity from other months - capacity is static
-            # Just update POA series by concatenating time series data
-            if orientation_groups[orientation_key]['poa_series'] is None:
-                orientation_groups[orientation_key]['poa_series'] = poa_resampled
-            else:
-                # Concatenate time series data (different time periods from different months)
-                existing = orientation_groups[orientation_key]['poa_series']
-                combined = pd.concat([existing, poa_resampled])
-                # Remove duplicates keeping first, then sort by index
-                combined = combined[~combined.index.duplicated(keep='first')].sort_index()
-                orientation_groups[orientation_key]['poa_series'] = combined
+            # Just collect this period's series; merged after all files are read
+            orientation_groups[orientation_key]['chunks'].append(poa_resampled)
             
             print(f"      - {array_id}: {capacity:.1f} kW (azimuth={azimuth}, slope={slope})")
     
@@ -494,7 +708,7 @@ def calculate_capacity_weighted_poa(
     results = []
     for (azimuth, slope), data in orientation_groups.items():
         total_capacity = data['capacity']
-        poa_series = data['poa_series']
+        poa_series = _merge_poa_chunks(data['chunks'])
         
         # Create output dataframe
         result = pd.DataFrame({
@@ -526,6 +740,198 @@ def calculate_capacity_weighted_poa(
         return combined
 
 
+def _fuzzy_scores(plant_name: str, filenames: List[str]) -> List[Tuple[str, float]]:
+    """(filename, similarity) for every distinct name, in name order."""
+    plant_name_normalized = plant_name.lower().replace("_", " ").replace("-", " ")
+    return [
+        (
+            filename,
+            SequenceMatcher(
+                None,
+                plant_name_normalized,
+                filename.lower().replace("_", " ").replace("-", " ")
+            ).ratio(),
+        )
+        for filename in sorted(set(filenames))
+    ]
+
+
+def match_solargis_files(
+    plant_name: str,
+    filenames: List[str],
+    fuzzy_threshold: float = 0.5
+) -> List[Tuple[str, float]]:
+    """
+    Match a plant to SolarGIS CSV file names.
+    
+    The exact names from ``plant_csv_mapping.csv_names_for_plant`` are tried
+    first (the first one present wins); otherwise every name scoring at least
+    ``fuzzy_threshold`` is returned, best first.
+    
+    Returns
+    -------
+    List[Tuple[str, float]]
+        (filename, score) pairs
+    """
+    names = set(filenames)
+    for exact_name in csv_names_for_plant(plant_name):
+        if exact_name in names:
+            return [(exact_name, 1.0)]
+    
+    matches = [(name, score) for name, score in _fuzzy_scores(plant_name, filenames) if score >= fuzzy_threshold]
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches
+
+
+def _print_closest_matches(plant_name: str, filenames: List[str], fuzzy_threshold: float) -> None:
+    print(f"   No matching files found for '{plant_name}'")
+    print(f"   Try lowering fuzzy_threshold (current: {fuzzy_threshold})")
+    
+    # Show top 5 closest matches for debugging
+    print(f"   Closest matches:")
+    plant_name_normalized = plant_name.lower().replace("_", " ").replace("-", " ")
+    scored = []
+    for filename in filenames[:20]:  # Sample first 20
+        score = SequenceMatcher(None, plant_name_normalized, filename.lower().replace("_", " ")).ratio()
+        scored.append((filename, score))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    for fname, sc in scored[:5]:
+        print(f"    - {fname} (score: {sc:.2f})")
+
+
+def _folder_month(folder: str) -> Optional[str]:
+    """Month (YYYY-MM) encoded in a SolarGIS folder name such as 'August 2025'."""
+    name = os.path.basename(os.path.normpath(folder)).strip()
+    for fmt in ('%B %Y', '%b %Y', '%Y-%m', '%Y_%m', '%Y%m'):
+        try:
+            return datetime.strptime(name, fmt).strftime('%Y-%m')
+        except ValueError:
+            continue
+    return None
+
+
+def update_solargis_index(store, solargis_folders: List[str]) -> int:
+    """
+    Bring the SolarGIS file index in the PlantStore up to date.
+    
+    Only folders that are new or whose directory mtime changed since they
+    were last indexed are listed again; indexed folders that no longer exist
+    are dropped.  Returns the number of folders (re)scanned.
+    """
+    indexed = store.solargis_folders()
+    for folder in indexed:
+        if not os.path.isdir(folder):
+            store.drop_solargis_folder(folder)
+    
+    scanned = 0
+    for folder in solargis_folders:
+        if not os.path.isdir(folder):
+            print(f"   Folder not found: {folder}")
+            continue
+        mtime_ns = os.stat(folder).st_mtime_ns
+        if indexed.get(folder) == mtime_ns:
+            continue
+        csv_files = sorted(f for f in os.listdir(folder) if f.lower().endswith('.csv'))
+        store.index_solargis_folder(folder, mtime_ns, _folder_month(folder), csv_files)
+        print(f"  Indexed [{os.path.basename(folder)}] {len(csv_files)} CSV files")
+        scanned += 1
+    return scanned
+
+
+def indexed_plant_files(
+    store,
+    plant_name: str,
+    fuzzy_threshold: float = 0.5,
+    solargis_folders: Optional[List[str]] = None
+) -> List[Tuple[str, str, float]]:
+    """
+    Files matched to a plant according to the SolarGIS index.
+    
+    Fuzzy scoring runs on distinct file names and is cached per plant; it is
+    only redone when the set of indexed names, the plant's exact-name mapping
+    or the threshold changes.  The cache keeps every fuzzy match plus the
+    exact names, and the exact-then-fuzzy choice of ``match_solargis_files``
+    is made among the files in ``solargis_folders`` (all indexed folders by
+    default), so an exact file in another month's folder does not hide the
+    fuzzy matches of the requested ones.
+    
+    Returns
+    -------
+    List[Tuple[str, str, float]]
+        (filepath, filename, score), best score first
+    """
+    exact_names = csv_names_for_plant(plant_name)
+    filenames = store.solargis_filenames()
+    fingerprint = hashlib.sha1(
+        json.dumps([SOLARGIS_MATCH_VERSION, fuzzy_threshold, exact_names, filenames]).encode('utf-8')
+    ).hexdigest()
+    if store.solargis_match_fingerprint(plant_name) != fingerprint:
+        candidates = [
+            (name, score)
+            for name, score in _fuzzy_scores(plant_name, filenames)
+            if score >= fuzzy_threshold or name in exact_names
+        ]
+        store.set_plant_solargis_matches(plant_name, fingerprint, candidates)
+    
+    entries = store.plant_solargis_files(plant_name, solargis_folders)
+    present = {entry['filename'] for entry in entries}
+    exact_name = next((name for name in exact_names if name in present), None)
+    if exact_name is not None:
+        entries = [dict(entry, score=1.0) for entry in entries if entry['filename'] == exact_name]
+    else:
+        entries = [entry for entry in entries if entry['score'] >= fuzzy_threshold]
+    return [
+        (os.path.join(entry['folder'], entry['filename']), entry['filename'], entry['score'])
+        for entry in entries
+    ]
+
+
+def load_weighted_poa_files(
+    matching_files: List[Tuple[str, str, float]],
+    start_date: str,
+    end_date: str
+) -> Optional[pd.DataFrame]:
+    """
+    Load matched SolarGIS files and compute capacity-weighted POA.
+    
+    Parameters
+    ----------
+    matching_files : List[Tuple[str, str, float]]
+        (filepath, filename, score) tuples, best matches first
+    start_date : str
+        Start date in YYYYMMDD format
+    end_date : str
+        End date in YYYYMMDD format
+    
+    Returns
+    -------
+    Optional[pd.DataFrame]
+        POA data with columns [timestamp, poa, azimuth, slope, capacity] or None
+    """
+    print(f"   Found {len(matching_files)} matching file(s):")
+    for filepath, filename, score in matching_files:
+        folder_name = os.path.basename(os.path.dirname(filepath))
+        print(f"    - [{folder_name}] {filename} (score: {score:.2f})")
+    
+    # Load all matching files
+    dfs_and_mappings = []
+    for filepath, filename, score in matching_files:
+        try:
+            df, mapping = load_solargis_csv(filepath)
+            dfs_and_mappings.append((df, mapping))
+        except Exception as e:
+            print(f"   Failed to load {filename}: {e}")
+    
+    if not dfs_and_mappings:
+        print(f"   Could not load any matching files")
+        return None
+    
+    # Calculate capacity-weighted POA
+    result = calculate_capacity_weighted_poa(dfs_and_mappings, start_date, end_date)
+    
+    return result if not result.empty else None
+
+
 def import_poa_for_plant_multi_folder(
     plant_name: str,
     plant_uid: str,
@@ -537,22 +943,25 @@ def import_poa_for_plant_multi_folder(
 ) -> Optional[pd.DataFrame]:
     """
     Import and process POA data for a specific plant from multiple folders.
-    Checks database for existing data and only imports new data.
+    
+    With a ``store`` the persistent SolarGIS file index is used (and updated
+    for any new or changed folders); without one the folders are listed and
+    matched directly.
     
     Parameters
     ----------
     plant_name : str
         Name of the plant
     plant_uid : str
-        Plant UID for database checks
+        Plant UID (for logging)
     solargis_folders : List[str]
         Paths to folders containing SolarGIS CSV files
     start_date : str
         Start date in YYYYMMDD format
     end_date : str
         End date in YYYYMMDD format
-    store : PlantStore
-        Database store for checking existing data
+    store : PlantStore or None
+        Database store holding the SolarGIS file index
     fuzzy_threshold : float
         Minimum similarity score for filename matching
     
@@ -565,6 +974,14 @@ def import_poa_for_plant_multi_folder(
     print(f"  Searching in {len(solargis_folders)} folder(s)")
     print(f"  Date range: {start_date} to {end_date}")
     
+    if store is not None:
+        update_solargis_index(store, solargis_folders)
+        matching_files = indexed_plant_files(store, plant_name, fuzzy_threshold, solargis_folders)
+        if not matching_files:
+            _print_closest_matches(plant_name, store.solargis_filenames(), fuzzy_threshold)
+            return None
+        return load_weighted_poa_files(matching_files, start_date, end_date)
+    
     # Collect all CSV files from all folders
     all_files_with_paths = []
     for folder in solargis_folders:
@@ -585,85 +1002,19 @@ def import_poa_for_plant_multi_folder(
     
     print(f"  Total CSV files found: {len(all_files_with_paths)}")
     
-    # Manual exact mapping for problem plants (one CSV per site per month)
-    exact_csv_names = {
-        'Man City FC Training Ground': 'City_Football_Group_Phase_1.csv',
-        'Finlay Beverages': 'Finlay_Beverages.csv',
-        'Blachford UK': 'Blachford.csv',
-        'Cromwell Tools': 'Cromwell_Tools.csv',
-        'Metrocentre': 'Metro_Centre.csv',
-        'Merry Hill Shopping Centre': 'Merry_Hill_Shopping_Centre.csv',
-        'Hibernian Stadium': 'Hibernian_Stadium.csv',
-        'Hibernian Training Ground': 'Hibernian_Training_Ground.csv',
-        'Parfetts Birmingham': 'Parfetts.csv',
-        "Sheldons Motor Books": "Sheldons_Bakery.csv",
-        "Smithy's Mushrooms": "Smithys_Mushrooms.csv",
-        "Smithy's Mushrooms PH2": "Smithy's_Mushrooms_Phase_2.csv",
-    }
-    
-    # Try exact match first
-    matching_files = []
-    if plant_name in exact_csv_names:
-        target_csv = exact_csv_names[plant_name]
-        for filepath, filename in all_files_with_paths:
-            if filename == target_csv:
-                matching_files.append((filepath, filename, 1.0))
-    
-    # Fall back to fuzzy matching if no exact match
-    if not matching_files:
-        plant_name_normalized = plant_name.lower().replace("_", " ").replace("-", " ")
-        
-        for filepath, filename in all_files_with_paths:
-            score = SequenceMatcher(
-                None,
-                plant_name_normalized,
-                filename.lower().replace("_", " ").replace("-", " ")
-            ).ratio()
-            
-            if score >= fuzzy_threshold:
-                matching_files.append((filepath, filename, score))
-    
+    scores = dict(match_solargis_files(plant_name, [name for _, name in all_files_with_paths], fuzzy_threshold))
+    matching_files = [
+        (filepath, filename, scores[filename])
+        for filepath, filename in all_files_with_paths
+        if filename in scores
+    ]
     if not matching_files:
-        print(f"   No matching files found for '{plant_name}'")
-        print(f"   Try lowering fuzzy_threshold (current: {fuzzy_threshold})")
-        
-        # Show top 5 closest matches for debugging
-        print(f"   Closest matches:")
-        scored = []
-        for filepath, filename in all_files_with_paths[:20]:  # Sample first 20
-            score = SequenceMatcher(None, plant_name_normalized, filename.lower().replace("_", " ")).ratio()
-            scored.append((filename, score))
-        scored.sort(key=lambda x: x[1], reverse=True)
-        for fname, sc in scored[:5]:
-            print(f"    - {fname} (score: {sc:.2f})")
-        
+        _print_closest_matches(plant_name, [name for _, name in all_files_with_paths], fuzzy_threshold)
         return None
     
     # Sort by score (best matches first)
     matching_files.sort(key=lambda x: x[2], reverse=True)
-    
-    print(f"   Found {len(matching_files)} matching file(s):")
-    for filepath, filename, score in matching_files:
-        folder_name = os.path.basename(os.path.dirname(filepath))
-        print(f"    - [{folder_name}] {filename} (score: {score:.2f})")
-    
-    # Load all matching files
-    dfs_and_mappings = []
-    for filepath, filename, score in matching_files:
-        try:
-            df, mapping = load_solargis_csv(filepath)
-            dfs_and_mappings.append((df, mapping))
-        except Exception as e:
-            print(f"   Failed to load {filename}: {e}")
-    
-    if not dfs_and_mappings:
-        print(f"   Could not load any matching files")
-        return None
-    
-    # Calculate capacity-weighted POA
-    result = calculate_capacity_weighted_poa(dfs_and_mappings, start_date, end_date)
-    
-    return result if not result.empty else None
+    return load_weighted_poa_files(matching_files, start_date, end_date)
 
 
 def import_poa_for_plant(
@@ -753,6 +1104,17 @@ def import_poa_for_plant(
     return result if not result.empty else None
 
 
+POA_UNIT = 'W/m²'
+
+
+def _print_poa_stats(poa: np.ndarray, indent: str) -> None:
+    """Print average/min/max of a POA array (NaN-aware)."""
+    print(f"{indent}POA Statistics:")
+    print(f"{indent}  Average: {np.nanmean(poa):.1f} W/m")
+    print(f"{indent}  Min: {np.nanmin(poa):.1f} W/m")
+    print(f"{indent}  Max: {np.nanmax(poa):.1f} W/m")
+
+
 def store_poa_in_db(store, plant_uid: str, poa_df: pd.DataFrame) -> None:
     """
     Store POA data in the database with separate EMIG IDs for each orientation.
@@ -780,30 +1142,23 @@ def store_poa_in_db(store, plant_uid: str, poa_df: pd.DataFrame) -> None:
     total_dc_capacity = 0.0
     
     if has_orientation:
-        # Group by orientation and store separately
+        # Group by orientation and store separately.  Each series goes to the
+        # database straight from its arrays (no per-row dicts).
         orientations = poa_df.groupby(['azimuth', 'slope'])
         
         total_records = 0
         orientation_capacities = {}
         
         for (azimuth, slope), group in orientations:
-            # Create readings for this orientation
-            readings = []
-            for _, row in group.iterrows():
-                readings.append({
-                    'ts': row['timestamp'],
-                    'poaIrradiance': {'value': row['poa'], 'unit': 'W/m²'}
-                })
+            ts = group['timestamp'].to_numpy()
+            poa = group['poa'].to_numpy(dtype=float)
             
             # Store with orientation-specific EMIG ID (overwrites existing)
             poa_emig_id = f"POA:SOLARGIS:AZ{int(azimuth)}:SL{int(slope)}"
-            store.store_readings(plant_uid, poa_emig_id, readings)
+            n_records = store.store_metric_series(plant_uid, poa_emig_id, ts, poa, 'poaIrradiance', POA_UNIT)
             
-            total_records += len(readings)
-            avg_poa = group['poa'].mean()
-            min_poa = group['poa'].min()
-            max_poa = group['poa'].max()
-            date_range = f"{group['timestamp'].iloc[0]} to {group['timestamp'].iloc[-1]}"
+            total_records += n_records
+            date_range = f"{ts[0]} to {ts[-1]}"
             
             # Extract capacity from the dataframe if available
             capacity = group['capacity'].iloc[0] if 'capacity' in group.columns else 0.0
@@ -813,81 +1168,44 @@ def store_poa_in_db(store, plant_uid: str, poa_df: pd.DataFrame) -> None:
             print(f"  Orientation: Azimuth={int(azimuth)}, Slope={int(slope)}")
             print(f"    EMIG ID: {poa_emig_id}")
             print(f"    DC Capacity: {capacity:.1f} kW")
-            print(f"    Records: {len(readings)} (30-minute intervals)")
+            print(f"    Records: {n_records} (30-minute intervals)")
             print(f"    Date Range: {date_range}")
-            print(f"    POA Statistics:")
-            print(f"      Average: {avg_poa:.1f} W/m")
-            print(f"      Min: {min_poa:.1f} W/m")
-            print(f"      Max: {max_poa:.1f} W/m")
+            _print_poa_stats(poa, indent="    ")
             print(f"  {'-'*60}")
         
         print(f"   Total: {total_records} POA records stored across {len(orientations)} orientation(s)")
         print(f"   Total DC Capacity: {total_dc_capacity:.1f} kW")
         
-        # Calculate and store capacity-weighted POA (OPTIMIZED)
+        # Calculate and store capacity-weighted POA
         if total_dc_capacity > 0 and len(orientations) > 1:
             print(f"\n   Calculating Capacity-Weighted POA...")
             
-            # OPTIMIZED: Use vectorized operations instead of nested loops
-            # Add weight column (capacity / total_capacity)
-            poa_df['weight'] = poa_df['capacity'] / total_dc_capacity
-            
-            # Calculate weighted POA: POA  weight
-            poa_df['weighted_poa'] = poa_df['poa'] * poa_df['weight']
-            
-            # Group by timestamp and sum the weighted values
-            weighted_result = poa_df.groupby('timestamp')['weighted_poa'].sum().reset_index()
-            weighted_result.columns = ['timestamp', 'poa']
-            
-            # Create readings list
-            weighted_poa_records = [
-                {
-                    'ts': row['timestamp'],
-                    'poaIrradiance': {'value': row['poa'], 'unit': 'W/m²'}
-                }
-                for _, row in weighted_result.iterrows()
-            ]
+            # Weighted POA per timestamp: sum(poa * capacity / total_capacity)
+            weighted_poa = poa_df['poa'] * (poa_df['capacity'] / total_dc_capacity)
+            weighted_result = weighted_poa.groupby(poa_df['timestamp']).sum()
+            ts = weighted_result.index.to_numpy()
+            poa = weighted_result.to_numpy(dtype=float)
             
             # Store weighted POA with special EMIG ID
             weighted_emig_id = "POA:SOLARGIS:WEIGHTED"
-            store.store_readings(plant_uid, weighted_emig_id, weighted_poa_records)
-            
-            # Calculate statistics for weighted POA
-            weighted_poas = [r['poaIrradiance']['value'] for r in weighted_poa_records]
-            avg_weighted = sum(weighted_poas) / len(weighted_poas)
-            min_weighted = min(weighted_poas)
-            max_weighted = max(weighted_poas)
-            
-            # Get date range from the weighted result
-            first_ts = weighted_result['timestamp'].iloc[0]
-            last_ts = weighted_result['timestamp'].iloc[-1]
+            n_records = store.store_metric_series(plant_uid, weighted_emig_id, ts, poa, 'poaIrradiance', POA_UNIT)
             
             print(f"  Capacity-Weighted POA:")
             print(f"    EMIG ID: {weighted_emig_id}")
-            print(f"    Records: {len(weighted_poa_records)} (30-minute intervals)")
-            print(f"    Date Range: {first_ts} to {last_ts}")
-            print(f"    POA Statistics:")
-            print(f"      Average: {avg_weighted:.1f} W/m")
-            print(f"      Min: {min_weighted:.1f} W/m")
-            print(f"      Max: {max_weighted:.1f} W/m")
+            print(f"    Records: {n_records} (30-minute intervals)")
+            print(f"    Date Range: {ts[0]} to {ts[-1]}")
+            _print_poa_stats(poa, indent="    ")
             print(f"   Capacity-weighted POA stored successfully")
             print(f"  {'-'*60}")
     else:
         # No orientation data - store as single POA device
-        readings = []
-        for _, row in poa_df.iterrows():
-            readings.append({
-                'ts': row['timestamp'],
-                'poaIrradiance': {'value': row['poa'], 'unit': 'W/m²'}
-            })
+        ts = poa_df['timestamp'].to_numpy()
+        poa = poa_df['poa'].to_numpy(dtype=float)
         
         poa_emig_id = "POA:SOLARGIS"
-        store.store_readings(plant_uid, poa_emig_id, readings)
+        n_records = store.store_metric_series(plant_uid, poa_emig_id, ts, poa, 'poaIrradiance', POA_UNIT)
         
-        avg_poa = poa_df['poa'].mean()
-        min_poa = poa_df['poa'].min()
-        max_poa = poa_df['poa'].max()
-        date_range = f"{poa_df['timestamp'].iloc[0]} to {poa_df['timestamp'].iloc[-1]}"
+        date_range = f"{ts[0]} to {ts[-1]}"
         
         # Extract capacity if available
         total_dc_capacity = poa_df['capacity'].iloc[0] if 'capacity' in poa_df.columns else 0.0
@@ -895,12 +1213,9 @@ def store_poa_in_db(store, plant_uid: str, poa_df: pd.DataFrame) -> None:
         print(f"  EMIG ID: {poa_emig_id}")
         if total_dc_capacity > 0:
             print(f"  DC Capacity: {total_dc_capacity:.1f} kW")
-        print(f"  Records: {len(readings)} (30-minute intervals)")
+        print(f"  Records: {n_records} (30-minute intervals)")
         print(f"  Date Range: {date_range}")
-        print(f"  POA Statistics:")
-        print(f"    Average: {avg_poa:.1f} W/m")
-        print(f"    Min: {min_poa:.1f} W/m")
-        print(f"    Max: {max_poa:.1f} W/m")
+        _print_poa_stats(poa, indent="  ")
         print(f"   Stored successfully")
     
     # Update plant DC capacity in registry
@@ -923,10 +1238,149 @@ def store_poa_in_db(store, plant_uid: str, poa_df: pd.DataFrame) -> None:
     print(f"  {'='*60}")
 
 
+def _import_plant_worker(
+    plant_name: str,
+    plant_uid: str,
+    matching_files: List[Tuple[str, str, float]],
+    start_date: str,
+    end_date: str,
+) -> Tuple[Optional[pd.DataFrame], float, Optional[str], str]:
+    """
+    Process-pool task: read and process one plant's SolarGIS files.
+    
+    Runs without a database handle (SQLite connections cannot cross process
+    boundaries); the files were already resolved from the SolarGIS index by
+    the parent.  Returns (poa_df or None, elapsed seconds, error, captured
+    output) so the parent can store the result and report on it.
+    """
+    started = time.perf_counter()
+    log = io.StringIO()
+    try:
+        with redirect_stdout(log):
+            print(f"\n--- Importing POA for '{plant_name}' ({plant_uid}) ---")
+            print(f"  Date range: {start_date} to {end_date}")
+            poa_df = load_weighted_poa_files(matching_files, start_date, end_date)
+        return poa_df, time.perf_counter() - started, None, log.getvalue()
+    except Exception as e:
+        return None, time.perf_counter() - started, f"{type(e).__name__}: {e}", log.getvalue()
+
+
+def reimport_poa_parallel(
+    store,
+    plants: List[Tuple[str, str]],
+    solargis_folders: List[str],
+    start_date: str,
+    end_date: str,
+    max_workers: Optional[int] = None,
+    fuzzy_threshold: float = 0.5,
+    delete_existing: bool = True,
+    verbose: bool = False,
+) -> List[Dict[str, any]]:
+    """
+    Re-import POA for many plants, reading/processing them in a process pool.
+    
+    The SolarGIS file index is brought up to date once and each plant's
+    files are resolved from it up front; plants without matching files are
+    reported as 'no_data' without starting a worker.  Each remaining plant's
+    CSV files are loaded and processed in a worker process; the calling
+    process is the only database writer and stores each plant's result (via
+    ``store_poa_in_db``) as soon as it completes.  Existing ``POA:%`` devices
+    are deleted just before the new data is written, and only if the worker
+    did not fail.  Prints one timing line per plant.
+    
+    Parameters
+    ----------
+    store : PlantStore
+        Database store (used only in the calling process)
+    plants : List[Tuple[str, str]]
+        (plant_name, plant_uid) pairs
+    solargis_folders : List[str]
+        Paths to folders containing SolarGIS CSV files
+    start_date, end_date : str
+        Date range in YYYYMMDD format
+    max_workers : int, optional
+        Worker processes (default: number of CPUs)
+    fuzzy_threshold : float
+        Minimum similarity score for filename matching
+    delete_existing : bool
+        Remove existing POA devices for a plant before storing
+    verbose : bool
+        Echo the per-plant import/store output instead of suppressing it
+    
+    Returns
+    -------
+    List[Dict]
+        One entry per plant: alias, plant_uid, status ('ok', 'no_data' or
+        'error'), records, orientations, deleted, read_s, write_s, error
+    """
+    results: List[Dict[str, any]] = []
+    if not plants:
+        return results
+    
+    total_start = time.perf_counter()
+    update_solargis_index(store, solargis_folders)
+    plant_files = {
+        (name, uid): indexed_plant_files(store, name, fuzzy_threshold, solargis_folders)
+        for name, uid in plants
+    }
+    
+    def finish(i, name, uid, poa_df, read_s, error):
+        entry = {
+            'alias': name, 'plant_uid': uid, 'status': 'error', 'records': 0,
+            'orientations': 0, 'deleted': 0, 'read_s': read_s, 'write_s': 0.0, 'error': error,
+        }
+        if error is None:
+            write_start = time.perf_counter()
+            try:
+                if delete_existing:
+                    entry['deleted'] = store.delete_devices_by_pattern(uid, 'POA:%')
+                if poa_df is not None and not poa_df.empty:
+                    with redirect_stdout(sys.stdout if verbose else io.StringIO()):
+                        store_poa_in_db(store, uid, poa_df)
+                    entry['status'] = 'ok'
+                    entry['records'] = len(poa_df)
+                    if 'azimuth' in poa_df.columns and 'slope' in poa_df.columns:
+                        entry['orientations'] = len(poa_df[['azimuth', 'slope']].drop_duplicates())
+                else:
+                    entry['status'] = 'no_data'
+            except Exception as e:
+                entry['error'] = f"{type(e).__name__}: {e}"
+            entry['write_s'] = time.perf_counter() - write_start
+        results.append(entry)
+        
+        status = entry['status'] if entry['status'] != 'error' else f"ERROR ({entry['error']})"
+        print(
+            f"  [{i}/{len(plants)}] {name}: {status}, {entry['records']} records, "
+            f"read {entry['read_s']:.1f}s, write {entry['write_s']:.1f}s"
+        )
+    
+    done = 0
+    for (name, uid), files in plant_files.items():
+        if not files:
+            done += 1
+            finish(done, name, uid, None, 0.0, None)
+    
+    to_read = [(key, files) for key, files in plant_files.items() if files]
+    if to_read:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(_import_plant_worker, name, uid, files, start_date, end_date): (name, uid)
+                for (name, uid), files in to_read
+            }
+            for future in as_completed(futures):
+                name, uid = futures[future]
+                poa_df, read_s, error, log = future.result()
+                if verbose and log:
+                    print(log, end="")
+                done += 1
+                finish(done, name, uid, poa_df, read_s, error)
+    
+    print(f"  POA re-import of {len(plants)} plant(s) took {time.perf_counter() - total_start:.1f}s")
+    return results
+
+
 if __name__ == "__main__":
     # Test the module
-    import sys
-    
     if len(sys.argv) < 4:
         print("Usage: python solargis_poa_import.py <plant_name> <solargis_folder> <start_date> <end_date>")
         print("Example: python solargis_poa_import.py 'City Football Group' './Monthly SolarGIS data/August 2025' 20250801 20250831")
@@ -4,8 +4,6 @@ Summary of monthly POA values in database - for user verification
 """
 
 import pandas as pd
-import sqlite3
-import json
 from plant_store import PlantStore
 
 def calculate_monthly_poa(store, plant_uid):
@@ -15,33 +13,19 @@ def calculate_monthly_poa(store, plant_uid):
     if not weighted_poa:
         return None
     
-    conn = sqlite3.connect(store.db_path)
-    try:
-        cur = conn.execute(
-            "SELECT ts, payload FROM readings WHERE plant_uid = ? AND emig_id = ? ORDER BY ts",
-            (plant_uid, weighted_poa[0])
-        )
-        
-        data = []
-        for ts, payload_json in cur.fetchall():
-            payload = json.loads(payload_json)
-            poa_irr = payload.get('poaIrradiance', {})
-            poa = poa_irr.get('value', 0) if isinstance(poa_irr, dict) else 0
-            data.append({
-                'timestamp': pd.to_datetime(ts),
-                'poa_kwh': poa * 0.5 / 1000.0
-            })
-    finally:
-        conn.close()
+    # Monthly insolation from the rollup table (Wh/m² -> kWh/m²)
+    _, rows = store.load_rollups(plant_uid, 'month', emig_ids=weighted_poa[:1], metrics=['poaIrradiance'])
+    if not rows:
+        store.rebuild_rollups(plant_uid)
+        _, rows = store.load_rollups(plant_uid, 'month', emig_ids=weighted_poa[:1], metrics=['poaIrradiance'])
     
-    if not data:
+    if not rows:
         return None
     
-    df = pd.DataFrame(data)
-    df.set_index('timestamp', inplace=True)
-    monthly = df['poa_kwh'].resample('ME').sum()
-    
-    return {date.strftime('%b-%y'): value for date, value in monthly.items()}
+    return {
+        pd.Timestamp(bucket, unit='s').strftime('%b-%y'): energy / 1000.0
+        for _, bucket, _, _, _, _, _, energy in rows
+    }
 
 def main():
     print("="*100)
@@ -87,7 +71,8 @@ def main():
     print("\n" + "="*100)
     print("NOTES:")
     print("  - These are MONTHLY totals calculated from 30-minute weighted POA readings")
-    print("  - Formula: Sum of (POA_W/m² × 0.5 hours / 1000) for all readings in month")
+    print("  - Formula: Sum of (POA_W/m² × interval hours / 1000) for all readings in month")
+    print("  - Months are calendar months in UTC, not the local date of each reading")
     print("  - Data period: June 2025 through October 2025")
     print("  - All sites show 100% data completeness for available months")
     print("="*100)
@@ -0,0 +1,70 @@
+"""
+CSV / Parquet I/O for plant datasets.
+
+Files ending in ``.parquet``/``.pq`` are read and written through pandas'
+pyarrow engine; everything else is treated as CSV, so callers can accept
+either format from the same path argument.  Readers that know which columns
+they use look at the header first (``table_columns``) and pass the selection
+to ``read_table``: Parquet then only decodes those columns and CSV parses
+them as ``usecols``.  pyarrow is optional: CSV keeps working without it.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+PARQUET_SUFFIXES: Tuple[str, ...] = (".parquet", ".pq")
+
+# Rows per Parquet row group: small enough to bound reader memory per group,
+# large enough to keep per-group overhead negligible.
+DEFAULT_ROW_GROUP_SIZE = 64_000
+
+
+def is_parquet(path: str) -> bool:
+    return str(path).lower().endswith(PARQUET_SUFFIXES)
+
+
+def table_columns(path: str) -> List[str]:
+    """Column names of a CSV or Parquet file, read from its header/schema only."""
+    if is_parquet(path):
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return [str(col) for col in pd.read_csv(path, nrows=0).columns]
+
+
+def read_table(path: str, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Read a plant dataset from CSV or Parquet.
+
+    Parameters
+    ----------
+    path : str
+        CSV or Parquet file (chosen by suffix)
+    columns : Sequence[str], optional
+        Only load these columns (in file order for CSV)
+    """
+    columns = list(columns) if columns is not None else None
+    if is_parquet(path):
+        return pd.read_parquet(path, engine="pyarrow", columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def write_table(
+    df: pd.DataFrame,
+    path: str,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> str:
+    """
+    Write a plant dataset as CSV or Parquet (chosen by suffix).
+
+    Parquet files are written in row groups of ``row_group_size`` rows.
+    Returns ``path``.
+    """
+    if is_parquet(path):
+        df.to_parquet(path, engine="pyarrow", index=False, row_group_size=row_group_size)
+    else:
+        df.to_csv(path, index=False)
+    return path
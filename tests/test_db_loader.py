@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from inverter_pipeline import load_db_dataframe, load_db_frame, query_db_day
+from plant_store import PlantStore
+
+
+def _store_with_two_devices() -> PlantStore:
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    store = PlantStore(path)
+    store.save("alias1", "ERS:00001", ["INV:1", "INV:2"], None)
+    store.store_readings(
+        "ERS:00001",
+        "INV:1",
+        [
+            {"ts": "2025-01-01T00:00:00Z", "apparentPower": {"value": 100.0, "unit": "VA"}, "stateCode": 3},
+            {"ts": "2025-01-01T00:30:00Z", "apparentPower": {"value": 200.0, "unit": "VA"}},
+        ],
+    )
+    store.store_readings(
+        "ERS:00001",
+        "INV:2",
+        [{"ts": "2025-01-01T00:00:00Z", "importEnergy": {"value": 123456789.0, "unit": "Wh"}}],
+    )
+    return store
+
+
+def test_load_db_dataframe_flattens_all_devices():
+    store = _store_with_two_devices()
+    df = load_db_dataframe(store, "alias1", "20250101", "20250101")
+    assert len(df) == 3
+    assert set(df["emigId"].cat.categories) == {"INV:1", "INV:2"}
+    assert df["apparentPower"].tolist()[:2] == [100.0, 200.0]
+    assert np.isnan(df["apparentPower"].iloc[2])
+    assert df["stateCode"].notna().sum() == 1
+    assert len(query_db_day(store, "alias1", "20250101", ["INV:2"])) == 1
+
+
+def test_load_db_frame_typed_columns():
+    store = _store_with_two_devices()
+    df = load_db_frame(store, "alias1", "20250101", "20250101")
+    assert isinstance(df.index.dtype, pd.DatetimeTZDtype)
+    assert str(df.index.tz) == "UTC"
+    assert df["emigId"].dtype == "category"
+    assert df["apparentPower"].dtype == np.float32
+    assert df["importEnergy"].dtype == np.float64
+    assert df["importEnergy"].dropna().iloc[0] == 123456789.0
+    assert "dcCurrent" not in df.columns
+
+    only_power = load_db_frame(store, "alias1", "20250101", "20250101", ["INV:1"], ["apparentPower"])
+    assert list(only_power.columns) == ["emigId", "apparentPower"]
+    assert len(only_power) == 2
+
+
+def test_load_db_frame_backfills_unmigrated_plant():
+    store = _store_with_two_devices()
+    # Databases written before readings_typed existed only hold payloads
+    store._connection().execute("DELETE FROM readings_typed")
+    store._connection().commit()
+    df = load_db_frame(store, "alias1", "20250101", "20250101", metrics=["apparentPower"])
+    assert df["apparentPower"].dropna().tolist() == [100.0, 200.0]
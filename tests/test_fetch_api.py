@@ -1,8 +1,21 @@
 from unittest import mock
 
+import pytest
+import requests
 import responses
 
-from fetch_inverter_data import BASE_URL, Config, fetch_readings_for_period
+from fetch_inverter_data import (
+    BASE_URL,
+    CombinedCsvAppender,
+    Config,
+    JuggleClient,
+    RateLimiter,
+    fetch_all_readings,
+    fetch_readings_for_period,
+    iter_fetch_many,
+    write_combined_csv,
+    plan_segments,
+)
 
 
 @responses.activate
@@ -37,3 +50,160 @@ def test_fetch_readings_handles_http_error():
         assert "500" in str(exc)
     else:
         assert False, "Expected exception on HTTP 500"
+
+
+@responses.activate
+def test_fetch_readings_retries_on_429_then_succeeds():
+    cfg = Config(api_key="testkey", plant_uid="ERS:00001", start_date="20250101", end_date="20250102")
+    emig_id = "INVERT:001"
+    expected_url = f"{BASE_URL}/meter/{emig_id}/readings"
+    responses.add(responses.GET, expected_url, status=429, headers={"Retry-After": "2"})
+    responses.add(responses.GET, expected_url, json={"readings": [{"ts": "2025-01-01T00:00:00"}]}, status=200)
+
+    with mock.patch("fetch_inverter_data.time.sleep") as sleep:
+        out = fetch_readings_for_period(cfg, emig_id, cfg.start_date, cfg.end_date, limiter=RateLimiter(1000, burst=2))
+    assert len(out) == 1
+    assert len(responses.calls) == 2
+    sleep.assert_called_once_with(2.0)
+
+
+@responses.activate
+def test_fetch_readings_retries_dropped_connections_and_timeouts():
+    cfg = Config(api_key="testkey", plant_uid="ERS:00001", start_date="20250101", end_date="20250102")
+    emig_id = "INVERT:001"
+    expected_url = f"{BASE_URL}/meter/{emig_id}/readings"
+    responses.add(responses.GET, expected_url, body=requests.ConnectionError("connection reset by peer"))
+    responses.add(responses.GET, expected_url, body=requests.ReadTimeout("read timed out"))
+    responses.add(responses.GET, expected_url, json={"readings": [{"ts": "2025-01-01T00:00:00"}]}, status=200)
+
+    with mock.patch("fetch_inverter_data.time.sleep") as sleep:
+        out = fetch_readings_for_period(cfg, emig_id, cfg.start_date, cfg.end_date, limiter=RateLimiter(1000, burst=3))
+    assert len(out) == 1
+    assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+
+    # Still failing after max_retries: the error reaches the caller
+    responses.replace(responses.GET, expected_url, body=requests.ConnectionError("connection refused"))
+    with mock.patch("fetch_inverter_data.time.sleep"), pytest.raises(requests.ConnectionError):
+        fetch_readings_for_period(cfg, emig_id, cfg.start_date, cfg.end_date, limiter=RateLimiter(1000, burst=4))
+
+
+@responses.activate
+def test_iter_fetch_many_fetches_all_segments_per_device():
+    # 200 days at half-hourly resolution spans two 104-day segments
+    cfg = Config(api_key="testkey", plant_uid="ERS:00001", start_date="20250101", end_date="20250720")
+    ids = ["INVERT:001", "INVERT:002"]
+    for emig_id in ids:
+        responses.add(
+            responses.GET,
+            f"{BASE_URL}/meter/{emig_id}/readings",
+            json={"readings": [{"ts": "2025-01-01T00:00:00"}]},
+            status=200,
+        )
+
+    results = {e: (rows, exc) for e, rows, exc in iter_fetch_many(cfg, ids, max_workers=4, limiter=RateLimiter(1000))}
+    assert set(results) == set(ids)
+    for rows, exc in results.values():
+        assert exc is None
+        assert len(rows) == 2
+    assert len(responses.calls) == 4
+
+
+@responses.activate
+def test_client_session_is_reused_with_auth_gzip_and_timeout():
+    cfg = Config(api_key="testkey", plant_uid="ERS:00001", start_date="20250101", end_date="20250720")
+    emig_id = "INVERT:001"
+    responses.add(
+        responses.GET,
+        f"{BASE_URL}/meter/{emig_id}/readings",
+        json={"readings": [{"ts": "2025-01-01T00:00:00"}]},
+        status=200,
+    )
+
+    with JuggleClient("testkey", timeout=(3, 7)) as client:
+        with mock.patch.object(client.session, "get", wraps=client.session.get) as get:
+            with mock.patch("fetch_inverter_data.DEFAULT_LIMITER", RateLimiter(1000)):
+                rows = fetch_all_readings(cfg, emig_id, client)
+    assert len(rows) == 2
+    assert get.call_count == 2
+    assert all(call.kwargs["timeout"] == (3, 7) for call in get.call_args_list)
+    headers = responses.calls[0].request.headers
+    assert headers["Authorization"] == "token testkey"
+    assert "gzip" in headers["Accept-Encoding"]
+
+
+def test_plan_segments_coalesces_nearby_gaps_and_splits_long_ones():
+    assert plan_segments([("20250101", "20250110"), ("20250201", "20250205")], 1800) == [("20250101", "20250205")]
+    assert plan_segments([("20250101", "20250110"), ("20250801", "20250805")], 1800) == [
+        ("20250101", "20250110"),
+        ("20250801", "20250805"),
+    ]
+    assert plan_segments([("20250101", "20250601")], 1800) == [("20250101", "20250414"), ("20250415", "20250601")]
+
+
+@responses.activate
+def test_run_fetch_streams_segments_to_db_and_csv(tmp_path):
+    import argparse
+    import csv
+
+    from inverter_pipeline import run_fetch
+    from plant_store import PlantStore
+
+    emig_id = "INVERT:001"
+    responses.add(
+        responses.GET,
+        f"{BASE_URL}/meter/{emig_id}/readings",
+        json={"readings": [{"ts": "2025-01-01T00:00:00", "activePower": {"value": 5, "unit": "W"}}]},
+        status=200,
+    )
+    db_path = str(tmp_path / "store.sqlite")
+    out = tmp_path / "out.csv"
+    args = argparse.Namespace(
+        list_plants=False, plant_alias=None, plant_uid="ERS:00001", api_key="testkey", weather_id=None,
+        min_interval_s=1800, start_date="20250101", end_date="20250720", inverter_ids=emig_id,
+        fetch_devices=False, include_weather=False, force_download=False, output=str(out),
+        save_plant=None, db_path=db_path, workers=2,
+    )
+    with mock.patch("fetch_inverter_data.DEFAULT_LIMITER", RateLimiter(1000)):
+        run_fetch(args)
+
+    # Two 104-day segments, each stored and recorded separately
+    assert len(responses.calls) == 2
+    with PlantStore(db_path) as store:
+        assert store.fetch_coverage("ERS:00001", emig_id) == [("20250101", "20250720")]
+        assert len(store.load_readings("ERS:00001", emig_id, "2025-01-01", "2025-01-02")) == 1
+    with open(out, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert rows[0]["emigId"] == emig_id and rows[0]["activePower"] == "5"
+
+    # Nothing is missing any more, so a second run makes no requests
+    with mock.patch("fetch_inverter_data.DEFAULT_LIMITER", RateLimiter(1000)):
+        run_fetch(args)
+    assert len(responses.calls) == 2
+
+
+def test_write_combined_csv_keeps_fields_outside_schema_across_chunks(tmp_path, capsys):
+    import csv
+
+    readings = [
+        {"ts": "2025-01-01T00:00:00", "emigId": "INV:1", "activePower": {"value": 5, "unit": "W"}, "stateCode": 1},
+        {"ts": "2025-01-01T00:30:00", "emigId": "INV:1", "activePower": 6.5, "stateCode": 2},
+        {"ts": "2025-01-01T00:00:00", "emigId": "WETH:1", "poaIrradiance": {"value": 120.0, "unit": "W/m²"}, "customField": 2},
+    ]
+    out = tmp_path / "combined.csv"
+    write_combined_csv(readings, str(out), fieldnames=["poaIrradiance", "activePower", "stateCode"], chunk_rows=2)
+
+    # A field outside the schema arriving in a later chunk is kept as an extra column
+    with open(out, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["timestamp", "emigId", "activePower", "poaIrradiance", "stateCode", "customField"]
+    assert rows[1:] == [
+        ["2025-01-01T00:00:00", "INV:1", "5", "", "1", ""],
+        ["2025-01-01T00:30:00", "INV:1", "6.5", "", "2", ""],
+        ["2025-01-01T00:00:00", "WETH:1", "", "120.0", "", "2"],
+    ]
+    assert "customField" in capsys.readouterr().out
+
+
+def test_combined_csv_default_schema_keeps_state_code():
+    assert "stateCode" in CombinedCsvAppender("unused.csv").fieldnames
@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from fouling_batch import FLEET_COLUMNS, run_fleet_fouling
+from fouling_daily import update_plant_fouling
+from plant_store import PlantStore
+
+
+def _store_soiled_plant(store: PlantStore, alias: str, plant_uid: str, soiled_factor: float) -> None:
+    # Ten half-hourly days; the first three clean, the rest at soiled_factor
+    ts = pd.date_range("2025-06-01", periods=10 * 48, freq="30min")
+    hours = ts.hour + ts.minute / 60
+    poa = np.clip(900 * np.sin((hours - 6) / 12 * np.pi), 0, None)
+    factor = np.where(ts < pd.Timestamp("2025-06-04"), 1.0, soiled_factor)
+    power_kw = 100.0 * poa / 1000 * 0.8 * factor
+    iso = ts.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    store.save(alias, plant_uid, ["INVERT:1"], None, 100.0)
+    store.store_metric_series(plant_uid, "INVERT:1", iso, np.cumsum(power_kw * 1000 * 0.5), "importEnergy")
+    store.store_metric_series(plant_uid, "POA:SOLARGIS:WEIGHTED", iso, poa / 2000, "poaIrradiance")
+
+
+def test_run_fleet_fouling_consolidates_plants_across_workers():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        _store_soiled_plant(store, "clean", "ERS:00001", 1.0)
+        _store_soiled_plant(store, "soiled", "ERS:00002", 0.85)
+        store.save("empty", "ERS:00003", [], None, 50.0)
+
+    table = run_fleet_fouling(["soiled", "empty", "clean"], "20250601", "20250610", db_path=path, max_workers=2)
+
+    assert list(table.columns) == FLEET_COLUMNS
+    assert table["alias"].tolist() == ["soiled", "empty", "clean"]
+    rows = table.set_index("alias")
+    assert rows.loc["clean", "status"] == "ok" and rows.loc["clean", "fouling_level"] == "Clean"
+    assert rows.loc["soiled", "status"] == "ok"
+    assert abs(rows.loc["soiled", "fouling_index"] - 0.15) < 0.01
+    assert rows.loc["soiled", "energy_loss_kwh_per_day"] > 0
+    assert rows.loc["soiled", "clean_end"] < "2025-06-04"
+    assert rows.loc["empty", "status"] == "no_data"
+
+
+def test_run_fleet_fouling_reuses_stored_baseline_until_clean_data_changes():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        _store_soiled_plant(store, "soiled", "ERS:00002", 0.85)
+
+    first = run_fleet_fouling(["soiled"], "20250601", "20250610", db_path=path).iloc[0]
+    assert first["baseline_refit"] and first["baseline_version"] == 1
+
+    # Unchanged clean days: the stored model is reused, also for a window without them
+    again = run_fleet_fouling(["soiled"], "20250601", "20250610", db_path=path).iloc[0]
+    assert not again["baseline_refit"] and again["baseline_version"] == 1
+    assert again["fouling_index"] == first["fouling_index"]
+    later = run_fleet_fouling(["soiled"], "20250605", "20250610", db_path=path).iloc[0]
+    assert not later["baseline_refit"] and later["clean_start"] == first["clean_start"]
+
+    # Re-imported POA on a clean day changes the data hash and forces a refit
+    with PlantStore(path) as store:
+        store.store_metric_series("ERS:00002", "POA:SOLARGIS:WEIGHTED", ["2025-06-02T12:00:00"], [0.3], "poaIrradiance")
+    refit = run_fleet_fouling(["soiled"], "20250601", "20250610", db_path=path).iloc[0]
+    assert refit["baseline_refit"] and refit["baseline_version"] == 2
+    with PlantStore(path) as store:
+        assert [v["version"] for v in store.clean_baseline_versions("ERS:00002")] == [1, 2]
+
+
+def test_run_fleet_fouling_refits_when_stored_baseline_does_not_parse():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        _store_soiled_plant(store, "soiled", "ERS:00002", 0.85)
+        # A bare POA-bin baseline is not a CleanBaselineModel record
+        store.save_clean_baseline("ERS:00002", {"bin_width": 50.0, "expected_kw": [1.0], "expected_pr": [0.8]})
+        assert update_plant_fouling(store, "soiled", "20250610")["status"] == "no_baseline"
+
+    row = run_fleet_fouling(["soiled"], "20250601", "20250610", db_path=path).iloc[0]
+    assert row["status"] == "ok" and row["baseline_refit"] and row["baseline_version"] == 2
@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from build_fouling_dataset import fouling_frame
+from fouling_batch import run_fleet_fouling
+from fouling_daily import main, update_plant_fouling
+from Fouling_analysis import CleanBaselineModel, FoulingConfig, run_fouling_analysis
+from plant_store import PlantStore
+from test_fouling_batch import _store_soiled_plant
+
+
+def test_update_plant_fouling_appends_only_new_days_and_matches_full_run():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        _store_soiled_plant(store, "soiled", "ERS:00002", 0.85)
+        assert update_plant_fouling(store, "soiled", "20250610")["status"] == "no_baseline"
+    run_fleet_fouling(["soiled"], "20250601", "20250610", db_path=path)
+
+    with PlantStore(path) as store:
+        first = update_plant_fouling(store, "soiled", "20250607")
+        assert first["status"] == "ok" and first["days_added"] == 7 and first["last_day"] == "2025-06-07"
+        second = update_plant_fouling(store, "soiled", "20250610")
+        assert second["days_added"] == 3 and second["days_updated"] == 6 and second["last_day"] == "2025-06-10"
+        again = update_plant_fouling(store, "soiled", "20250610")
+        assert again["days_added"] == 0 and again["days_updated"] == 3
+        assert update_plant_fouling(store, "soiled", "20250606", reprocess_days=0)["status"] == "up_to_date"
+
+        history = store.load_fouling_history("ERS:00002")
+        assert [row["day"] for row in history] == [f"2025-06-{d:02d}" for d in range(1, 11)]
+        assert all(row["baseline_version"] == 1 for row in history)
+
+        # The rolling state reproduces a full recompute over the last 7 days
+        model = CleanBaselineModel.from_dict(store.load_clean_baseline("ERS:00002"))
+        full = run_fouling_analysis(
+            fouling_frame(store, "soiled", "20250601", "20250610"), None, FoulingConfig(dc_size_kw=100.0), clean_model=model
+        )
+    assert np.isclose(second["fouling_index"], full["fouling_index"])
+    assert np.isclose(second["energy_loss_kwh_per_day"], full["energy_loss_kwh_per_day"])
+    assert second["fouling_level"] == full["fouling_level"]
+
+
+def test_update_plant_fouling_fills_in_a_day_whose_data_arrived_late(capsys):
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        _store_soiled_plant(store, "soiled", "ERS:00002", 0.85)
+    run_fleet_fouling(["soiled"], "20250601", "20250610", db_path=path)
+
+    # POA for 2025-06-09 is missing when the job first runs
+    late = pd.date_range("2025-06-09", periods=48, freq="30min")
+    iso = late.strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    hours = late.hour + late.minute / 60
+    poa = np.clip(900 * np.sin((hours - 6) / 12 * np.pi), 0, None) / 2000
+    with PlantStore(path) as store:
+        store.store_metric_series("ERS:00002", "POA:SOLARGIS:WEIGHTED", iso, [np.nan] * 48, "poaIrradiance")
+        update_plant_fouling(store, "soiled", "20250610")
+        assert "2025-06-09" not in [row["day"] for row in store.load_fouling_history("ERS:00002")]
+
+        store.store_metric_series("ERS:00002", "POA:SOLARGIS:WEIGHTED", iso, poa, "poaIrradiance")
+        entry = update_plant_fouling(store, "soiled", "20250610")
+        assert entry["days_added"] == 0
+        history = store.load_fouling_history("ERS:00002")
+        assert "2025-06-09" in [row["day"] for row in history]
+
+        model = CleanBaselineModel.from_dict(store.load_clean_baseline("ERS:00002"))
+        full = run_fouling_analysis(
+            fouling_frame(store, "soiled", "20250601", "20250610"), None, FoulingConfig(dc_size_kw=100.0), clean_model=model
+        )
+    assert np.isclose(entry["fouling_index"], full["fouling_index"])
+
+    # An unknown alias is reported without stopping the other plants
+    main(["--plants", "missing,soiled", "--end", "20250610", "--db-path", path])
+    out = capsys.readouterr().out
+    assert "missing: ERROR" in out
+    assert "soiled: " in out and "soiled: ERROR" not in out
@@ -64,3 +64,70 @@ def test_fouling_index_and_classification():
     level = classify_fouling_level(idx)
     assert 0 <= idx <= 1
     assert level in {"Clean", "Light Soiling", "Moderate", "Severe"}
+
+
+def test_pipeline_steps_add_columns_in_place_without_touching_inputs():
+    from Fouling_analysis import run_fouling_analysis
+
+    cfg = FoulingConfig(dc_size_kw=10.0)
+    df = pd.DataFrame(
+        {
+            "Time": pd.date_range("2025-01-01", periods=4, freq="h").astype(str),
+            "AC kW": [9.5, 9.0, 8.5, 8.0],
+            "POA W/m2": [1000.0, 950.0, 900.0, 850.0],
+        }
+    )
+    original = df.copy()
+    work = df.rename(columns={"AC kW": "ac_power", "POA W/m2": "poa"})
+    assert calculate_pr(work, cfg, copy=False) is work
+    assert estimate_clean_baseline_poa_matched(work, cfg, clean_df=work, copy=False) is work
+    assert {"pr", "poa_bin", "expected_clean_power", "expected_clean_pr"} <= set(work.columns)
+
+    result = run_fouling_analysis(df, clean_df=df, cfg=cfg)
+    pd.testing.assert_frame_equal(df, original)
+    assert result["fouling_index"] == 0.0
+    assert {"timestamp", "ac_power", "poa", "pr", "cleaning_event"} <= set(result["df"].columns)
+
+
+def test_poa_baseline_lookup_round_trips_through_plant_store():
+    import os
+    import tempfile
+
+    from Fouling_analysis import PoaBaseline, fit_poa_baseline, run_fouling_analysis
+    from plant_store import PlantStore
+
+    cfg = FoulingConfig(dc_size_kw=10.0)
+    clean = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2025-01-01", periods=4, freq="h"),
+            "ac_power": [4.0, 5.0, 9.0, 11.0],
+            "poa": [450.0, 480.0, 950.0, 990.0],
+        }
+    )
+    baseline = fit_poa_baseline(calculate_pr(clean, cfg), cfg)
+    assert len(baseline.expected_power) == 10
+    assert baseline.expected_power[4] == 4.5 and baseline.expected_power[9] == 10.0
+    assert np.isnan(baseline.expected_power[5])
+    power, _ = baseline.lookup([460.0, 999.0, 550.0, 1500.0, np.nan, -5.0])
+    assert power[:2].tolist() == [4.5, 10.0] and np.isnan(power[2:]).all()
+
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        store.save_clean_baseline("ERS:00001", baseline.to_dict())
+        restored = PoaBaseline.from_dict(store.load_clean_baseline("ERS:00001"))
+        assert store.load_clean_baseline("ERS:00002") is None
+
+    df = clean.assign(ac_power=clean["ac_power"] * 0.9)
+    fitted = run_fouling_analysis(df, clean_df=clean, cfg=cfg)
+    reused = run_fouling_analysis(df, clean_df=None, cfg=cfg, baseline=restored)
+    assert np.isclose(reused["fouling_index"], fitted["fouling_index"])
+    np.testing.assert_array_equal(reused["df"]["expected_clean_power"], fitted["df"]["expected_clean_power"])
+
+
+def test_date_window_applies_to_utc_frames_from_the_db():
+    from Fouling_analysis import filter_by_date_range
+
+    df = pd.DataFrame({"timestamp": pd.date_range("2025-06-01", periods=4, freq="h", tz="UTC"), "poa": range(4)})
+    out = filter_by_date_range(df, FoulingConfig(), pd.Timestamp("2025-06-01 01:00"), pd.Timestamp("2025-06-01 02:00"))
+    assert out["poa"].tolist() == [1, 2]
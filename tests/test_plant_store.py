@@ -1,7 +1,11 @@
 import os
+import sqlite3
 import tempfile
+import threading
 
-from plant_store import PlantStore
+import pytest
+
+from plant_store import PlantStore, plant_shard_key
 
 
 def test_save_and_load_with_dc_size():
@@ -30,3 +34,291 @@ def test_store_and_query_readings():
     assert len(fetched) == 2
     spans = store.emig_date_spans("ERS:00001")
     assert spans and spans[0]["emig_id"] == "INV:1"
+
+
+def test_typed_readings_written_and_backfilled():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    store = PlantStore(path)
+    readings = [
+        {"ts": "2025-01-01T00:00:00Z", "apparentPower": {"value": 1500.0, "unit": "VA"}, "stateCode": 3},
+        {"ts": "2025-01-01T00:30:00Z", "apparentPower": {"value": 1600.0, "unit": "VA"}, "dcCurrent": 2},
+        # Numeric strings are read like CAST(... AS REAL); other text stays NULL
+        {"ts": "2025-01-01T01:00:00Z", "apparentPower": {"value": "1700.5", "unit": "VA"}, "dcCurrent": "n/a"},
+    ]
+    store.store_readings("ERS:00001", "INV:1", readings)
+
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT ts_epoch, apparentPower, dcCurrent FROM readings_typed ORDER BY ts_epoch"
+        ).fetchall()
+        assert rows == [(1735689600, 1500.0, None), (1735691400, 1600.0, 2.0), (1735693200, 1700.5, None)]
+
+        # Simulate a database written before the typed table existed
+        conn.execute("DELETE FROM readings_typed")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert store.backfill_typed_readings() == 3
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT ts_epoch, apparentPower, dcCurrent FROM readings_typed ORDER BY ts_epoch"
+        ).fetchall()
+    finally:
+        conn.close()
+    assert rows == [(1735689600, 1500.0, None), (1735691400, 1600.0, 2.0), (1735693200, 1700.5, None)]
+
+    # Timestamps that cannot be parsed would be invisible to epoch queries
+    with pytest.raises(ValueError, match="unparseable"):
+        store.store_readings("ERS:00001", "INV:1", [{"ts": "01/02/2025 10:00", "apparentPower": 1.0}])
+    with pytest.raises(ValueError, match="unparseable"):
+        store.store_metric_series("ERS:00001", "POA:A", ["yesterday"], [1.0], "poaIrradiance")
+    assert store.load_readings("ERS:00001", "INV:1", "2025-01-01", "2025-01-02")[-1]["ts"] == "2025-01-01T01:00:00Z"
+
+
+def test_connection_is_reused_in_wal_mode_and_closed():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        conn = store._connection()
+        assert store._connection() is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        store.save("alias1", "ERS:00001", ["INV:1"], None)
+
+        # Other threads get their own connection to the same database
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(store.load("alias1")))
+        worker.start()
+        worker.join()
+        assert seen[0]["plant_uid"] == "ERS:00001"
+        assert len(store._connections) == 2
+
+    assert store._connections == []
+    # The store reopens lazily after close()
+    assert store.load("alias1")["inverter_ids"] == ["INV:1"]
+    store.close()
+
+
+def test_missing_ranges_merges_fetch_coverage():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        store.record_fetch("ERS:00001", "INV:1", "20250101", "20250331")
+        store.record_fetch("ERS:00001", "INV:1", "20250401", "20251031")
+        assert store.fetch_coverage("ERS:00001", "INV:1") == [("20250101", "20251031")]
+        assert store.missing_ranges("ERS:00001", "INV:1", "20250101", "20251130") == [("20251101", "20251130")]
+
+        # A range fetched on its own end date only counts up to the day before
+        conn = store._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO fetch_cache (plant_uid, emig_id, start_date, end_date, saved_at) "
+                "VALUES ('ERS:00001', 'INV:2', '20251101', '20251115', '2025-11-15 12:00:00')"
+            )
+        assert store.missing_ranges("ERS:00001", "INV:2", "20251020", "20251116") == [
+            ("20251020", "20251031"),
+            ("20251115", "20251116"),
+        ]
+
+
+def test_store_metric_series_matches_store_readings():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    ts = ["2025-01-01T00:00:00", "2025-01-01T00:30:00"]
+    with PlantStore(path) as store:
+        store.store_readings(
+            "ERS:00001", "POA:A", [{"ts": t, "poaIrradiance": {"value": v, "unit": "W/m²"}} for t, v in zip(ts, [1.5, 2.5])]
+        )
+        assert store.store_metric_series("ERS:00001", "POA:B", ts, [1.5, float("nan")], "poaIrradiance", "W/m²") == 2
+
+        a = store.load_readings("ERS:00001", "POA:A", "2025-01-01", "2025-01-02")
+        b = store.load_readings("ERS:00001", "POA:B", "2025-01-01", "2025-01-02")
+        assert b[0] == a[0]
+        assert b[1]["poaIrradiance"]["value"] is None
+
+        cols, rows = store.load_typed_readings("ERS:00001", ["POA:A", "POA:B"], ts[0], ts[-1], ["poaIrradiance"])
+        assert [r[2:] for r in rows] == [(1735689600, 1.5), (1735691400, 2.5), (1735689600, 1.5), (1735691400, None)]
+
+
+def test_month_partitioned_layout_routes_reads_writes_and_drops():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    os.remove(path)
+    ts = ["2025-07-31T23:30:00", "2025-08-01T00:00:00", "2025-08-01T00:30:00"]
+    with PlantStore(path, layout="plant_month") as store:
+        store.store_readings("ERS:00001", "INV:1", [{"ts": t, "activePower": 1.0} for t in ts])
+        store.store_metric_series("ERS:00001", "POA:A", ts, [10.0, 20.0, 30.0], "poaIrradiance")
+        store.store_readings("ERS:00002", "INV:9", [{"ts": ts[1], "activePower": 5.0}])
+        assert [s["month"] for s in store.reading_shards("ERS:00001")] == ["2025-07", "2025-08"]
+        assert len(store.reading_shards()) == 3
+
+        assert [r["ts"] for r in store.load_readings("ERS:00001", "INV:1", ts[0], ts[-1])] == ts
+        cols, rows = store.load_typed_readings("ERS:00001", ["INV:1", "POA:A"], ts[0], ts[-1], ["poaIrradiance"])
+        assert [r[3] for r in rows] == [None, None, None, 10.0, 20.0, 30.0]
+        assert store.date_span("ERS:00001") == {"min": ts[0], "max": ts[-1]}
+        assert store.list_emig_ids("ERS:00001") == ["INV:1", "POA:A"]
+
+        # Each plant's shards stay queryable through its own views, and raw
+        # SQL through the all-shard ones
+        conn = store._connection()
+        key = plant_shard_key("ERS:00001")
+        assert conn.execute(f"SELECT COUNT(*) FROM readings_{key}").fetchone()[0] == 6
+        assert conn.execute("SELECT COUNT(*) FROM readings_typed").fetchone()[0] == 7
+
+        assert store.drop_month("2025-08", "ERS:00001", "POA:%") == 2
+        assert store.drop_month("2025-08", "ERS:00001") == 2
+        assert [s["month"] for s in store.reading_shards("ERS:00001")] == ["2025-07"]
+        assert store.load_readings("ERS:00002", "INV:9", ts[0], ts[-1])[0]["activePower"] == 5.0
+        assert store.delete_devices_by_pattern("ERS:00001", "POA:%") == 1
+
+    # The layout is stored in the database file
+    with PlantStore(path) as store:
+        assert store.layout == "plant_month"
+        key = plant_shard_key("ERS:00002")
+        assert store._connection().execute(f"SELECT COUNT(*) FROM readings_typed_{key}").fetchone()[0] == 1
+    with pytest.raises(ValueError):
+        PlantStore(path, layout="month")
+
+
+def test_plant_month_layout_handles_more_shards_than_a_compound_select_allows():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    os.remove(path)
+    months = [f"{2023 + m // 12}-{m % 12 + 1:02d}-15T12:00:00" for m in range(24)]
+    plants = [f"ERS:{i:05d}" for i in range(22)]
+    with PlantStore(path, layout="plant_month") as store:
+        for uid in plants:
+            store.store_metric_series(uid, "POA:A", months, [1.0] * len(months), "poaIrradiance")
+        assert len(store.reading_shards()) == 528
+
+        assert store.date_span(plants[-1]) == {"min": months[0], "max": months[-1]}
+        # Fleet-wide reads over every shard nest the UNION ALL terms
+        assert store.rebuild_rollups() == len(plants)
+        conn = store._connection()
+        source = store._readings_source("readings_typed")
+        assert conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0] == 528
+        assert conn.execute("SELECT COUNT(*) FROM readings_typed WHERE plant_uid = ?", (plants[3],)).fetchone()[0] == 24
+
+
+def test_range_span_and_season_queries_use_epoch_timestamps():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        # Mixed ISO formats for the same UTC timeline
+        ts = ["2024-07-01T10:00:00+00:00", "2025-06-30T23:00:00Z", "2025-07-01T01:00:00+02:00", "2025-12-01T00:00:00"]
+        store.store_readings("ERS:00001", "INV:1", [{"ts": t, "activePower": i} for i, t in enumerate(ts)])
+
+        assert store.date_span("ERS:00001") == {"min": ts[0], "max": ts[-1]}
+        assert store.season_range("ERS:00001", ["06", "07", "08"]) == {
+            "start": "20250630",
+            "end": "20250630",
+            "year": "2025",
+        }
+        loaded = store.load_readings("ERS:00001", "INV:1", "2025-06-30T22:00:00", "2025-06-30T23:30:00")
+        assert [r["activePower"] for r in loaded] == [1, 2]
+
+        conn = store._connection()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT ts_year, MIN(ts_epoch) FROM readings "
+            "WHERE plant_uid = ? AND ts_month IN (6, 7) GROUP BY ts_year",
+            ("ERS:00001",),
+        ).fetchall()
+        assert "idx_readings_season" in plan[0][3]
+
+
+def test_rollups_follow_writes_deletes_and_rebuilds():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    # Two days of half-hourly readings, 100 W on day one and 200 W on day two
+    ts = [f"2025-06-{d:02d}T{h:02d}:{m:02d}:00" for d in (1, 2) for h in range(24) for m in (0, 30)]
+    values = [100.0] * 48 + [200.0] * 48
+    with PlantStore(path) as store:
+        store.store_metric_series("ERS:00001", "POA:A", ts, values, "poaIrradiance")
+        store.store_readings("ERS:00001", "INV:1", [{"ts": t, "activePower": v} for t, v in zip(ts, values)])
+
+        cols, rows = store.load_rollups("ERS:00001", "day", emig_ids=["INV:1"])
+        assert cols == ["emig_id", "bucket", "metric", "n", "total", "min_value", "max_value", "energy"]
+        assert [r[3:] for r in rows] == [(48, 4800.0, 100.0, 100.0, 2400.0), (48, 9600.0, 200.0, 200.0, 4800.0)]
+        _, rows = store.load_rollups("ERS:00001", "month", by_device=False)
+        assert [r[1:] for r in rows] == [
+            ("activePower", 96, 14400.0, 100.0, 200.0, 7200.0),
+            ("poaIrradiance", 96, 14400.0, 100.0, 200.0, 7200.0),
+        ]
+
+        # Rewriting one day refreshes that day and the month
+        store.store_readings("ERS:00001", "INV:1", [{"ts": t, "activePower": 0.0} for t in ts[48:]])
+        _, rows = store.load_rollups("ERS:00001", "month", emig_ids=["INV:1"])
+        assert rows[0][4] == 4800.0
+
+        store.delete_devices_by_pattern("ERS:00001", "POA:%")
+        assert store.load_rollups("ERS:00001", "hour", metrics=["poaIrradiance"])[1] == []
+
+        conn = store._connection()
+        with conn:
+            conn.execute("DELETE FROM readings_rollup")
+        assert store.rebuild_rollups("ERS:00001", "20250601", "20250601") == 1
+        _, rows = store.load_rollups("ERS:00001", "month")
+        assert rows[0][3:5] == (96, 4800.0)
+
+
+def test_backfilling_the_end_of_a_day_refreshes_the_next_days_first_hour():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    with PlantStore(path) as store:
+        # 31 May 23:00 and 1 June 00:00 are an hour apart: the June reading counts for 3600 s
+        store.store_readings(
+            "ERS:00001",
+            "INV:1",
+            [{"ts": "2025-05-31T23:00:00Z", "activePower": 100.0}, {"ts": "2025-06-01T00:00:00Z", "activePower": 100.0}],
+        )
+        _, rows = store.load_rollups("ERS:00001", "month", emig_ids=["INV:1"])
+        assert [r[-1] for r in rows] == [50.0, 100.0]
+
+        # The late 23:30 reading shortens that gap to 1800 s in June's rollups too
+        store.store_readings("ERS:00001", "INV:1", [{"ts": "2025-05-31T23:30:00Z", "activePower": 100.0}])
+        for period in ("hour", "day", "month"):
+            _, rows = store.load_rollups("ERS:00001", period, emig_ids=["INV:1"])
+            assert rows[-1][-1] == 50.0, period
+        conn = store._connection()
+        with conn:
+            conn.execute("DELETE FROM readings_rollup")
+        store.rebuild_rollups("ERS:00001")
+        assert store.load_rollups("ERS:00001", "month", emig_ids=["INV:1"])[1] == rows
+
+
+def test_epoch_upgrade_of_older_tables_waits_for_migrate_schema():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE readings (plant_uid TEXT NOT NULL, emig_id TEXT NOT NULL, ts TEXT NOT NULL, "
+        "payload BLOB NOT NULL, PRIMARY KEY (plant_uid, emig_id, ts))"
+    )
+    conn.executemany(
+        "INSERT INTO readings VALUES ('ERS:1', 'INV:1', ?, ?)",
+        [
+            ("2025-01-01T00:00:00Z", '{"ts": "2025-01-01T00:00:00Z", "energy": {"value": 1}}'),
+            ("2025-01-01T00:30:00+01:00", '{"ts": "2025-01-01T00:30:00+01:00", "energy": {"value": 2}}'),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    store = PlantStore(path)
+    assert store.pending_migration == [""]
+    columns = {row[1] for row in store._connection().execute("PRAGMA table_xinfo(readings)")}
+    assert "ts_epoch" not in columns
+    with pytest.raises(RuntimeError, match="db migrate"):
+        store.load_readings("ERS:1", "INV:1", "2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z")
+
+    assert store.migrate_schema() == 1
+    assert store.pending_migration == []
+    epochs = [row[0] for row in store._connection().execute("SELECT ts_epoch FROM readings ORDER BY ts_epoch")]
+    assert epochs == [1735687800, 1735689600]
+    assert store.backfill_typed_readings("ERS:1") == 2
+    rows = store.load_readings("ERS:1", "INV:1", "2024-12-31T00:00:00Z", "2025-01-02T00:00:00Z")
+    assert [r["energy"]["value"] for r in rows] == [2, 1]
+    assert PlantStore(path).pending_migration == []
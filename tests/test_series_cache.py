@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+import numpy as np
+
+from plant_store import PlantStore
+from series_cache import SeriesCache
+
+
+def test_series_cache_builds_slices_and_refreshes_changed_months():
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    cache_dir = tempfile.mkdtemp()
+    june = [f"2025-06-{d:02d}T{h:02d}:00:00" for d in (1, 2) for h in range(24)]
+    with PlantStore(path) as store:
+        store.store_metric_series("ERS:00001", "POA:A", june, [float(i) for i in range(48)], "poaIrradiance")
+        cache = SeriesCache(store, cache_dir)
+
+        full = cache.series("ERS:00001", "POA:A", "poaIrradiance")
+        assert isinstance(full.values, np.memmap) and not full.values.flags.writeable
+        assert len(full.values) == 30 * 48
+        assert full.values[2] == 1.0 and np.isnan(full.values[1])
+        assert np.count_nonzero(~np.isnan(full.values)) == 48
+
+        day2 = cache.series("ERS:00001", "POA:A", "poaIrradiance", "2025-06-02T00:00:00", "2025-06-02T23:59:59")
+        assert str(day2.times()[0]) == "2025-06-02T00:00:00"
+        assert len(day2.values) == 48 and day2.values[0] == 24.0
+        assert cache.refresh("ERS:00001", "POA:A", "poaIrradiance") == 0
+
+        # Re-importing June shifted by an hour (same values) is picked up too
+        shifted = [f"2025-06-{1 + (h + 1) // 24:02d}T{(h + 1) % 24:02d}:00:00" for h in range(48)]
+        store.delete_device_readings("ERS:00001", "POA:A")
+        store.store_metric_series("ERS:00001", "POA:A", shifted, [float(i) for i in range(48)], "poaIrradiance")
+        assert cache.refresh("ERS:00001", "POA:A", "poaIrradiance") == 1
+        shifted_day2 = cache.series("ERS:00001", "POA:A", "poaIrradiance", "2025-06-02T00:00:00", "2025-06-02T23:59:59")
+        assert shifted_day2.values[0] == 23.0
+
+        # Appending July grows the file; only the new month is read
+        store.store_metric_series("ERS:00001", "POA:A", ["2025-07-01T12:00:00"], [5.0], "poaIrradiance")
+        assert cache.refresh("ERS:00001", "POA:A", "poaIrradiance") == 1
+        # Rewriting a June value is picked up through the month fingerprint
+        store.store_metric_series("ERS:00001", "POA:A", ["2025-06-01T01:00:00"], [99.0], "poaIrradiance")
+        assert cache.refresh("ERS:00001", "POA:A", "poaIrradiance") == 1
+
+        series = cache.series("ERS:00001", "POA:A", "poaIrradiance", refresh=False).to_series()
+        assert len(series) == 61 * 48
+        assert series["2025-06-01 01:00:00+00:00"] == 99.0
+        assert series["2025-07-01 12:00:00+00:00"] == 5.0
+
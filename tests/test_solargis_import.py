@@ -0,0 +1,157 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import solargis_poa_import
+from solargis_poa_import import load_solargis_csv, sniff_solargis_csv
+
+
+def _write_csv(path, gti):
+    pd.DataFrame(
+        {
+            "Date": ["2025-08-01 00:00:00", "2025-08-01 00:30:00"],
+            "Azimuth": [180, 180],
+            "Slope": [20, 20],
+            "Array_capacity": [100, 100],
+            "GTI": gti,
+        }
+    ).to_csv(path, index=False)
+
+
+def test_parsed_file_is_cached_and_invalidated_on_change(tmp_path, monkeypatch):
+    csv_path = tmp_path / "Site.csv"
+    cache_dir = tmp_path / "cache"
+    _write_csv(csv_path, [1.0, 2.0])
+
+    df, mapping = load_solargis_csv(str(csv_path), cache_dir=str(cache_dir))
+    assert mapping["timestamp"] == "Date"
+    assert len(os.listdir(cache_dir)) == 1
+
+    # Unchanged file: served from the cache without touching read_csv
+    def _no_parse(*args, **kwargs):
+        raise AssertionError("CSV should not be parsed")
+
+    monkeypatch.setattr(solargis_poa_import.pd, "read_csv", _no_parse)
+    cached_df, cached_mapping = load_solargis_csv(str(csv_path), cache_dir=str(cache_dir))
+    pd.testing.assert_frame_equal(cached_df, df)
+    assert cached_mapping == mapping
+    monkeypatch.undo()
+
+    # Rewriting the file changes its size/mtime and forces a re-parse
+    _write_csv(csv_path, [10.5, 20.5])
+    fresh_df, _ = load_solargis_csv(str(csv_path), cache_dir=str(cache_dir))
+    assert fresh_df["GTI"].tolist() == [10.5, 20.5]
+
+
+def test_cache_entries_round_trip_text_columns_without_pickle(tmp_path):
+    csv_path = tmp_path / "Site.csv"
+    cache_dir = tmp_path / "cache"
+    with open(csv_path, "w") as f:
+        f.write("Date,Name,Azimuth,Slope,Array_capacity,GTI\n")
+        f.write("2025-08-01 00:00,Roof A,180,20,100,0.1\n")
+        f.write("2025-08-01 00:30,,180,20,100,0.2\n")
+
+    df, mapping = load_solargis_csv(str(csv_path), cache_dir=str(cache_dir))
+    (entry,) = os.listdir(cache_dir)
+    assert entry.endswith(".npz")
+    with np.load(cache_dir / entry, allow_pickle=False) as archive:
+        assert "meta" in archive.files
+
+    cached_df, cached_mapping = load_solargis_csv(str(csv_path), cache_dir=str(cache_dir))
+    pd.testing.assert_frame_equal(cached_df, df)
+    assert cached_mapping == mapping
+    assert cached_df["Name"].isna().tolist() == [False, True]
+
+
+def test_sniffer_finds_preamble_delimiter_and_needed_columns(tmp_path):
+    csv_path = tmp_path / "Site.csv"
+    with open(csv_path, "w", encoding="latin1") as f:
+        f.write("SolarGIS export\nSite: Ré\n")
+        f.write("Date;Name;Azimuth;Slope;Array_capacity;GTI;GTI_low;Comment\n")
+        f.write("2025-08-01 00:00;Ré;180;20;100;0.1;0.0;x\n")
+        f.write("2025-08-01 00:00;Ré;90;10;300;0.2;0.0;x\n")
+
+    layout = sniff_solargis_csv(str(csv_path))
+    assert layout["encoding"] == "latin1"
+    assert layout["skiprows"] == 2
+    assert layout["sep"] == ";"
+    assert layout["usecols"] == ["Date", "Name", "Azimuth", "Slope", "Array_capacity", "GTI"]
+
+    df, mapping = load_solargis_csv(str(csv_path), use_cache=False)
+    assert list(df.columns) == layout["usecols"]
+    assert mapping["split_by_orientation"]
+    assert len(mapping["orientations"]) == 2
+
+
+def test_non_utf8_byte_past_the_sniffed_sample_falls_back_to_latin1(tmp_path):
+    csv_path = tmp_path / "Site.csv"
+    rows = ["Date,Name,Azimuth,Slope,Array_capacity,GTI"]
+    rows += [f"2025-08-01 {i // 60:02d}:{i % 60:02d},Roof,180,20,100,0.5" for i in range(3000)]
+    rows.append("2025-08-03 02:00,Café,180,20,100,0.5")
+    csv_path.write_bytes(("\n".join(rows) + "\n").encode("latin1"))
+    assert os.path.getsize(csv_path) > solargis_poa_import.SNIFF_BYTES
+    assert sniff_solargis_csv(str(csv_path))["encoding"] == "utf-8"
+
+    df, mapping = load_solargis_csv(str(csv_path), cache_dir=str(tmp_path / "cache"))
+    assert len(df) == 3001
+    assert df["Name"].iloc[-1] == "Café"
+    cached_df, _ = load_solargis_csv(str(csv_path), cache_dir=str(tmp_path / "cache"))
+    assert cached_df["Name"].iloc[-1] == "Café"
+
+
+def test_file_index_matches_plants_and_rescans_only_changed_folders(tmp_path):
+    from plant_store import PlantStore
+
+    aug = tmp_path / "August 2025"
+    sep = tmp_path / "September 2025"
+    aug.mkdir()
+    sep.mkdir()
+    _write_csv(aug / "Finlay_Beverages.csv", [1.0, 2.0])
+    _write_csv(aug / "Unrelated_Farm.csv", [1.0, 2.0])
+    _write_csv(sep / "Finlay_Beverages.csv", [3.0, 4.0])
+    folders = [str(aug), str(sep)]
+
+    store = PlantStore(str(tmp_path / "registry.sqlite"))
+    assert solargis_poa_import.update_solargis_index(store, folders) == 2
+    assert solargis_poa_import.update_solargis_index(store, folders) == 0
+
+    files = solargis_poa_import.indexed_plant_files(store, "Finlay Beverages")
+    assert [(os.path.basename(os.path.dirname(p)), name, score) for p, name, score in files] == [
+        ("August 2025", "Finlay_Beverages.csv", 1.0),
+        ("September 2025", "Finlay_Beverages.csv", 1.0),
+    ]
+    assert store.plant_solargis_files("Finlay Beverages")[0]["month"] == "2025-08"
+
+    # Adding a file only rescans that folder and the fuzzy match picks it up
+    _write_csv(sep / "Oakfield_Dairy.csv", [5.0, 6.0])
+    os.utime(sep, ns=(os.stat(sep).st_mtime_ns + 10**9,) * 2)
+    assert solargis_poa_import.update_solargis_index(store, folders) == 1
+    files = solargis_poa_import.indexed_plant_files(store, "Oakfield Dairy")
+    assert [name for _, name, _ in files] == ["Oakfield_Dairy.csv"]
+
+
+def test_exact_file_in_unrequested_folder_does_not_hide_fuzzy_matches(tmp_path):
+    from plant_store import PlantStore
+
+    aug = tmp_path / "August 2025"
+    sep = tmp_path / "September 2025"
+    aug.mkdir()
+    sep.mkdir()
+    _write_csv(aug / "Finlay_Beverages.csv", [1.0, 2.0])
+    _write_csv(sep / "Finlay_Beverage_Ltd.csv", [3.0, 4.0])
+    store = PlantStore(str(tmp_path / "registry.sqlite"))
+    solargis_poa_import.update_solargis_index(store, [str(aug), str(sep)])
+
+    files = solargis_poa_import.indexed_plant_files(store, "Finlay Beverages", solargis_folders=[str(sep)])
+    assert [name for _, name, _ in files] == ["Finlay_Beverage_Ltd.csv"]
+    assert files[0][2] < 1.0
+    files = solargis_poa_import.indexed_plant_files(store, "Finlay Beverages")
+    assert [name for _, name, _ in files] == ["Finlay_Beverages.csv"]
+
+    # Names from PLANT_FILE_MAPPING are fuzzy-matched like any other file
+    _write_csv(sep / "Sofina_Haverhill.csv", [5.0, 6.0])
+    os.utime(sep, ns=(os.stat(sep).st_mtime_ns + 10**9,) * 2)
+    solargis_poa_import.update_solargis_index(store, [str(aug), str(sep)])
+    files = solargis_poa_import.indexed_plant_files(store, "Sofina Foods")
+    assert [(name, score) for _, name, score in files] == [("Sofina_Haverhill.csv", 0.5)]
@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from Fouling_analysis import FoulingConfig, fouling_input_columns
+from table_io import read_table, table_columns, write_table
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "ts": ["2025-06-01T00:00:00Z", "2025-06-01T00:30:00Z", "2025-06-01T00:00:00Z"],
+            "emigId": ["INVERT:1", "INVERT:1", "WETH:1"],
+            "activePower": [1.0, 2.0, None],
+        }
+    )
+
+
+def test_csv_read_loads_only_requested_columns(tmp_path):
+    path = str(tmp_path / "plant.csv")
+    write_table(_frame(), path)
+    assert table_columns(path) == ["ts", "emigId", "activePower"]
+    df = read_table(path, columns=["ts", "activePower"])
+    assert list(df.columns) == ["ts", "activePower"]
+    assert df["activePower"].tolist()[:2] == [1.0, 2.0]
+
+
+def test_parquet_round_trip_reads_selected_columns(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "plant.parquet")
+    write_table(_frame(), path, row_group_size=2)
+    assert table_columns(path) == ["ts", "emigId", "activePower"]
+    df = read_table(path, columns=["emigId", "activePower"])
+    assert list(df.columns) == ["emigId", "activePower"]
+    assert df["emigId"].tolist() == ["INVERT:1", "INVERT:1", "WETH:1"]
+
+
+def test_fouling_input_columns_follow_the_header_guessing():
+    columns = ["Time", "Site", "AC kW", "POA W/m2", "Comment"]
+    assert fouling_input_columns(columns, FoulingConfig()) == ["Time", "AC kW", "POA W/m2"]
@@ -359,11 +359,11 @@ with tab_fouling:
                     try:
                         # 1. Load Analysis Data
                         st.text(f"Loading analysis data ({ana_start} to {ana_end})...")
-                        df_analysis = inverter_pipeline.load_db_dataframe(
+                        df_analysis = inverter_pipeline.load_db_frame(
                             store, foul_plant_alias, 
                             ana_start.strftime("%Y%m%d"), 
                             ana_end.strftime("%Y%m%d")
-                        )
+                        ).reset_index()
                         
                         if df_analysis.empty:
                             st.error("No data found for the Analysis Period.")
@@ -373,11 +373,11 @@ with tab_fouling:
                         df_clean = pd.DataFrame()
                         if not use_auto_clean:
                             st.text(f"Loading clean data ({clean_start} to {clean_end})...")
-                            df_clean = inverter_pipeline.load_db_dataframe(
+                            df_clean = inverter_pipeline.load_db_frame(
                                 store, foul_plant_alias,
                                 clean_start.strftime("%Y%m%d"),
                                 clean_end.strftime("%Y%m%d")
-                            )
+                            ).reset_index()
                             if df_clean.empty:
                                 st.error("No data found for the Clean Period.")
                                 st.stop()
@@ -493,18 +493,18 @@ with tab_shading:
                     
                     try:
                         st.text("Loading Summer data...")
-                        df_summer = inverter_pipeline.load_db_dataframe(
+                        df_summer = inverter_pipeline.load_db_frame(
                             store, shade_plant_alias,
                             sum_start.strftime("%Y%m%d"),
                             sum_end.strftime("%Y%m%d")
-                        )
+                        ).reset_index()
                         
                         st.text("Loading Winter data...")
-                        df_winter = inverter_pipeline.load_db_dataframe(
+                        df_winter = inverter_pipeline.load_db_frame(
                             store, shade_plant_alias,
                             win_start.strftime("%Y%m%d"),
                             win_end.strftime("%Y%m%d")
-                        )
+                        ).reset_index()
                         
                         if df_summer.empty or df_winter.empty:
                             st.error("Data missing for one or both periods.")